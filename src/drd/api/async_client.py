@@ -0,0 +1,33 @@
+import asyncio
+import weakref
+
+# Async HTTP clients hold connections bound to the event loop that created them,
+# so keep one client per running loop instead of a single module-level instance.
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+def get_loop_client(name, factory):
+    loop = asyncio.get_running_loop()
+    clients = _loop_clients.setdefault(loop, {})
+    if name not in clients:
+        clients[name] = factory()
+    return clients[name]
+
+
+async def close_loop_clients():
+    """Close the clients opened on the running loop."""
+    clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        # httpx clients have aclose(), the OpenAI SDK's async clients close()
+        close = getattr(client, 'aclose', None) or client.close
+        await close()
+
+
+def run_async(coro):
+    """asyncio.run() that closes the loop's clients before the loop goes away."""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_loop_clients()
+    return asyncio.run(main())
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Optional
+from ..utils.utils import print_debug
+from ..utils.file_utils import match_file_mode
+
+CACHE_DIR = os.path.join('.drd', 'cache')
+DEFAULT_MAX_SIZE_MB = 100
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds
+
+_cache = None
+_cache_enabled = None
+_cache_lock = threading.Lock()
+
+
+class ResponseCache:
+    """Content-addressed store of raw LLM responses, one JSON file per key.
+
+    Entry mtimes double as last-access times, so eviction drops the least
+    recently used entries once the directory grows past max_size bytes.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE_MB * 1024 * 1024, ttl=DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider, model, instruction_prompt, query):
+        digest = hashlib.sha256()
+        for part in (provider, model, instruction_prompt or '', query):
+            digest.update((part or '').encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._record(hit=False)
+            return None
+
+        if time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(path)
+            self._record(hit=False)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record(hit=True)
+        return entry.get('response')
+
+    def set(self, key, response):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key)
+        payload = json.dumps({'created': time.time(), 'response': response})
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            match_file_mode(tmp_path, path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(payload.encode('utf-8')) - previous
+            over_limit = self._size > self.max_size
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                self._remove(path)
+                total -= size
+            self._size = total
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    self._remove(entry.path)
+        with self._lock:
+            self._size = 0
+
+    def _scan_size(self):
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                   if entry.name.endswith('.json'))
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def is_cache_enabled():
+    if _cache_enabled is not None:
+        return _cache_enabled
+    return os.getenv('DRAVID_CACHE', '').lower() in ('1', 'true', 'yes')
+
+
+def configure_cache(enabled=None):
+    global _cache_enabled
+    _cache_enabled = enabled
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _cache
+    if not is_cache_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_size_mb = float(
+                    os.getenv('DRAVID_CACHE_MAX_MB', DEFAULT_MAX_SIZE_MB))
+                ttl = float(os.getenv('DRAVID_CACHE_TTL', DEFAULT_TTL))
+                _cache = ResponseCache(
+                    os.path.join(os.getcwd(), CACHE_DIR),
+                    max_size=int(max_size_mb * 1024 * 1024),
+                    ttl=ttl
+                )
+    return _cache
+
+
+def print_cache_stats():
+    if _cache is None:
+        return
+    print_debug(
+        f"Response cache: {_cache.hits} hit(s), {_cache.misses} miss(es)")
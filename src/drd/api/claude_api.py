@@ -1,17 +1,31 @@
 import requests
+import httpx
 import os
 import json
+import threading
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional, List
 from ..utils.parser import extract_and_parse_xml, parse_dravid_response
 from ..utils.file_utils import convert_to_base64
 from typing import Dict, Any, Optional, List, Generator
+from typing import AsyncGenerator
 import xml.etree.ElementTree as ET
 import click
+from .async_client import get_loop_client
 
 API_URL = 'https://api.anthropic.com/v1/messages'
 MODEL = 'claude-3-5-sonnet-20240620'
 MAX_TOKENS = 8000
 
+# Keep the pool in step with MAX_CONCURRENT_REQUESTS in metadata/rate_limit_handler.py
+# so every in-flight metadata request can hold its own keep-alive connection.
+POOL_SIZE = int(os.getenv('DRAVID_MAX_CONCURRENT_REQUESTS', '10'))
+CONNECT_TIMEOUT = float(os.getenv('DRAVID_CONNECT_TIMEOUT', '10'))
+READ_TIMEOUT = float(os.getenv('DRAVID_READ_TIMEOUT', '300'))
+
+_session = None
+_session_lock = threading.Lock()
+
 
 def get_api_key() -> str:
     api_key = os.getenv('CLAUDE_API_KEY')
@@ -29,9 +43,37 @@ def get_headers(api_key: str) -> Dict[str, str]:
     }
 
 
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=POOL_SIZE, pool_block=True)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
 def make_api_call(data: Dict[str, Any], headers: Dict[str, str], stream: bool = False) -> requests.Response:
-    response = requests.post(
-        API_URL, json=data, headers=headers, stream=stream)
+    response = get_session().post(
+        API_URL, json=data, headers=headers, stream=stream,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    response.raise_for_status()
+    return response
+
+
+def get_async_client() -> httpx.AsyncClient:
+    return get_loop_client('claude', lambda: httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=POOL_SIZE,
+                            max_keepalive_connections=POOL_SIZE),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    ))
+
+
+async def async_make_api_call(data: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+    response = await get_async_client().post(API_URL, json=data, headers=headers)
     response.raise_for_status()
     return response
 
@@ -45,43 +87,18 @@ def parse_response(response: str) -> str:
         return response
 
 
-def call_claude_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
-    api_key = get_api_key()
-    headers = get_headers(api_key)
-    full_response = ""
-
-    data = {
+def get_request_data(query: str, instruction_prompt: Optional[str] = None) -> Dict[str, Any]:
+    return {
         'model': MODEL,
         'system': instruction_prompt or "",
         'messages': [{'role': 'user', 'content': query}],
         'max_tokens': MAX_TOKENS
     }
 
-    while True:
-        response = make_api_call(data, headers)
-        resp = response.json()
-        full_response += resp['content'][0]['text']
-
-        if 'stop_reason' in resp and resp['stop_reason'] == 'max_tokens':
-            # If the response was truncated, continue the conversation
-            data['messages'].append(
-                {'role': 'assistant', 'content': full_response})
-            data['messages'].append(
-                {'role': 'user', 'content': 'Please continue.'})
-        else:
-            break
-
-    return parse_response(full_response)
-
-
-def call_claude_vision_api_with_pagination(query: str, image_path: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
-    api_key = get_api_key()
-    headers = get_headers(api_key)
 
+def get_vision_request_data(query: str, image_path: str, instruction_prompt: Optional[str] = None) -> Dict[str, Any]:
     mime_type, image_data = convert_to_base64(image_path)
-
-    full_response = ""
-    data = {
+    return {
         'model': MODEL,
         'system': instruction_prompt or "",
         'messages': [
@@ -106,45 +123,108 @@ def call_claude_vision_api_with_pagination(query: str, image_path: str, include_
         'max_tokens': MAX_TOKENS
     }
 
+
+def continue_if_truncated(data: Dict[str, Any], resp: Dict[str, Any], full_response: str) -> bool:
+    if 'stop_reason' in resp and resp['stop_reason'] == 'max_tokens':
+        # If the response was truncated, continue the conversation
+        data['messages'].append(
+            {'role': 'assistant', 'content': full_response})
+        data['messages'].append(
+            {'role': 'user', 'content': 'Please continue.'})
+        return True
+    return False
+
+
+def paginate(data: Dict[str, Any], headers: Dict[str, str]) -> str:
+    full_response = ""
     while True:
         response = make_api_call(data, headers)
         resp = response.json()
         full_response += resp['content'][0]['text']
-
-        if 'stop_reason' in resp and resp['stop_reason'] == 'max_tokens':
-            # If the response was truncated, continue the conversation
-            data['messages'].append(
-                {'role': 'assistant', 'content': full_response})
-            data['messages'].append(
-                {'role': 'user', 'content': 'Please continue.'})
-        else:
+        if not continue_if_truncated(data, resp, full_response):
             break
+    return parse_response(full_response)
+
 
+async def async_paginate(data: Dict[str, Any], headers: Dict[str, str]) -> str:
+    full_response = ""
+    while True:
+        response = await async_make_api_call(data, headers)
+        resp = response.json()
+        full_response += resp['content'][0]['text']
+        if not continue_if_truncated(data, resp, full_response):
+            break
     return parse_response(full_response)
 
 
+def call_claude_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    headers = get_headers(get_api_key())
+    return paginate(get_request_data(query, instruction_prompt), headers)
+
+
+def call_claude_vision_api_with_pagination(query: str, image_path: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    headers = get_headers(get_api_key())
+    return paginate(get_vision_request_data(query, image_path, instruction_prompt), headers)
+
+
+async def async_call_claude_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    headers = get_headers(get_api_key())
+    return await async_paginate(get_request_data(query, instruction_prompt), headers)
+
+
+async def async_call_claude_vision_api_with_pagination(query: str, image_path: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    headers = get_headers(get_api_key())
+    return await async_paginate(get_vision_request_data(query, image_path, instruction_prompt), headers)
+
+
+def parse_stream_line(line: str) -> Optional[Dict[str, Any]]:
+    if line.startswith('data: '):
+        return json.loads(line[6:])
+    return None
+
+
 def stream_claude_response(query: str, instruction_prompt: Optional[str] = None) -> Generator[str, None, None]:
     api_key = get_api_key()
     headers = get_headers(api_key)
     headers['Accept'] = 'text/event-stream'
 
-    data = {
-        'model': MODEL,
-        'system': instruction_prompt or "",
-        'messages': [{'role': 'user', 'content': query}],
-        'max_tokens': MAX_TOKENS,
-        'stream': True
-    }
+    data = get_request_data(query, instruction_prompt)
+    data['stream'] = True
 
     response = make_api_call(data, headers, stream=True)
 
-    for line in response.iter_lines():
-        if line:
-            line = line.decode('utf-8')
-            if line.startswith('data: '):
-                data = json.loads(line[6:])
-                if data['type'] == 'content_block_delta':
-                    chunk = data['delta']['text']
-                    yield chunk
-                elif data['type'] == 'message_stop':
+    try:
+        for line in response.iter_lines():
+            if line:
+                event = parse_stream_line(line.decode('utf-8'))
+                if event is None:
+                    continue
+                if event['type'] == 'content_block_delta':
+                    yield event['delta']['text']
+                elif event['type'] == 'message_stop':
                     break
+    finally:
+        # Close the stream even if we stopped reading early; an unread body
+        # means the connection is discarded rather than reused
+        response.close()
+
+
+async def async_stream_claude_response(query: str, instruction_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
+    headers = get_headers(get_api_key())
+    headers['Accept'] = 'text/event-stream'
+
+    data = get_request_data(query, instruction_prompt)
+    data['stream'] = True
+
+    async with get_async_client().stream('POST', API_URL, json=data, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = parse_stream_line(line)
+            if event is None:
+                continue
+            if event['type'] == 'content_block_delta':
+                yield event['delta']['text']
+            elif event['type'] == 'message_stop':
+                break
@@ -0,0 +1,59 @@
+import queue
+import threading
+import click
+from ..utils.parser import StreamingResponseParser
+
+_DONE = object()
+
+
+class CommandStream:
+    """Commands of a streamed response, available as soon as each step is complete.
+
+    The response is read on a background thread, so the network keeps
+    flowing while the caller executes (and asks the user to confirm) the
+    steps that have already arrived. Iterate it on the main thread; an
+    error raised while streaming is re-raised there once the commands
+    received before it have been consumed.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.response = ''
+        self.commands = []
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        parser = StreamingResponseParser()
+        try:
+            for chunk in self.chunks:
+                self.response += chunk
+                for command in parser.feed(chunk):
+                    self._queue.put(command)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self):
+        while True:
+            command = self._queue.get()
+            if command is _DONE:
+                break
+            self.commands.append(command)
+            if command['type'] == 'explanation':
+                click.echo(click.style("\nExplanation:", fg="green", bold=True), nl=False)
+                click.echo(f" {command['content']}")
+            yield command
+        # Let later iterations and drain() see the end of the stream too
+        self._queue.put(_DONE)
+        if self.error is not None:
+            raise self.error
+
+    def drain(self):
+        """Wait for the rest of the response; return every command received."""
+        for _ in self:
+            pass
+        return self.commands
@@ -1,7 +1,12 @@
 import os
 import click
 from .claude_api import call_claude_api_with_pagination, call_claude_vision_api_with_pagination, stream_claude_response
-from .openai_api import call_api_with_pagination, call_vision_api_with_pagination, stream_response
+from .claude_api import async_call_claude_api_with_pagination, async_call_claude_vision_api_with_pagination, async_stream_claude_response
+from .claude_api import MODEL as CLAUDE_MODEL
+from .openai_api import call_api_with_pagination, call_vision_api_with_pagination, stream_response, get_model
+from .openai_api import async_call_api_with_pagination, async_call_vision_api_with_pagination, async_stream_response
+from .cache import get_response_cache
+from .command_stream import CommandStream
 from ..utils import print_debug, print_info
 from ..utils.loader import Loader
 from ..utils.pretty_print_stream import pretty_print_xml_stream
@@ -9,8 +14,18 @@ from ..utils.parser import parse_dravid_response
 import xml.etree.ElementTree as ET
 
 
+def get_llm_type():
+    return os.getenv('DRAVID_LLM', 'claude').lower()
+
+
+def get_model_name():
+    if get_llm_type() == 'claude':
+        return CLAUDE_MODEL
+    return get_model()
+
+
 def get_api_functions():
-    llm_type = os.getenv('DRAVID_LLM', 'claude').lower()
+    llm_type = get_llm_type()
     if llm_type == 'claude':
         return call_claude_api_with_pagination, call_claude_vision_api_with_pagination, stream_claude_response
     elif llm_type in ['openai', 'azure', 'custom', 'ollama']:
@@ -19,6 +34,16 @@ def get_api_functions():
         raise ValueError(f"Unsupported LLM type: {llm_type}")
 
 
+def get_async_api_functions():
+    llm_type = get_llm_type()
+    if llm_type == 'claude':
+        return async_call_claude_api_with_pagination, async_call_claude_vision_api_with_pagination, async_stream_claude_response
+    elif llm_type in ['openai', 'azure', 'custom', 'ollama']:
+        return async_call_api_with_pagination, async_call_vision_api_with_pagination, async_stream_response
+    else:
+        raise ValueError(f"Unsupported LLM type: {llm_type}")
+
+
 def stream_dravid_api(query, include_context=False, instruction_prompt=None, print_chunk=False):
     _, _, stream_response = get_api_functions()
 
@@ -46,6 +71,12 @@ def stream_dravid_api(query, include_context=False, instruction_prompt=None, pri
         return xml_buffer
 
 
+def stream_dravid_commands(query, include_context=False, instruction_prompt=None):
+    """Start streaming a response; iterate the result to get each step as it completes."""
+    _, _, stream_response = get_api_functions()
+    return CommandStream(stream_response(query, instruction_prompt))
+
+
 def call_dravid_api(query, include_context=False, instruction_prompt=None):
     call_api, _, _ = get_api_functions()
     response = call_api(query, include_context, instruction_prompt)
@@ -59,9 +90,42 @@ def call_dravid_vision_api(query, image_path, include_context=False, instruction
     return parse_dravid_response(response)
 
 
+def get_cached_response(query, instruction_prompt):
+    cache = get_response_cache()
+    if cache is None:
+        return None, None, None
+    cache_key = cache.make_key(
+        get_llm_type(), get_model_name(), instruction_prompt, query)
+    return cache, cache_key, cache.get(cache_key)
+
+
 def call_dravid_api_with_pagination(query, include_context=False, instruction_prompt=None):
+    cache, cache_key, cached_response = get_cached_response(
+        query, instruction_prompt)
+    if cached_response is not None:
+        return cached_response
+
     call_api, _, _ = get_api_functions()
     response = call_api(query, include_context, instruction_prompt)
+
+    if cache is not None:
+        cache.set(cache_key, response)
+    return response
+
+
+async def async_call_dravid_api_with_pagination(query, include_context=False, instruction_prompt=None, use_cache=True):
+    cache, cache_key, cached_response = None, None, None
+    if use_cache:
+        cache, cache_key, cached_response = get_cached_response(
+            query, instruction_prompt)
+    if cached_response is not None:
+        return cached_response
+
+    call_api, _, _ = get_async_api_functions()
+    response = await call_api(query, include_context, instruction_prompt)
+
+    if cache is not None:
+        cache.set(cache_key, response)
     return response
 
 
@@ -1,6 +1,8 @@
 import requests
-from typing import Dict, Any, Generator, Optional
+import httpx
+from typing import Dict, Any, Generator, AsyncGenerator, Optional
 import json
+from .async_client import get_loop_client
 
 OLLAMA_ENDPOINT = "http://localhost:11434/api"
 
@@ -11,6 +13,12 @@ def get_ollama_client():
     return None
 
 
+def get_async_ollama_client() -> httpx.AsyncClient:
+    # Local generation can take arbitrarily long, so only bound the connect phase
+    return get_loop_client('ollama', lambda: httpx.AsyncClient(
+        timeout=httpx.Timeout(None, connect=10.0)))
+
+
 def call_ollama_api(model: str, prompt: str, system_prompt: str = "") -> str:
     data = {
         "model": model,
@@ -41,10 +49,42 @@ def stream_ollama_response(model: str, prompt: str, system_prompt: str = "") ->
                 yield chunk["response"]
 
 
+async def async_call_ollama_api(model: str, prompt: str, system_prompt: str = "") -> str:
+    data = {
+        "model": model,
+        "prompt": prompt,
+        "system": system_prompt,
+        "stream": False
+    }
+    response = await get_async_ollama_client().post(f"{OLLAMA_ENDPOINT}/generate", json=data)
+    response.raise_for_status()
+    return response.json()["response"]
+
+
+async def async_stream_ollama_response(model: str, prompt: str, system_prompt: str = "") -> AsyncGenerator[str, None]:
+    data = {
+        "model": model,
+        "prompt": prompt,
+        "system": system_prompt,
+        "stream": True
+    }
+    async with get_async_ollama_client().stream("POST", f"{OLLAMA_ENDPOINT}/generate", json=data) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line:
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+
+
 def call_ollama_api_with_pagination(query: str, model: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
     full_response = call_ollama_api(model, query, instruction_prompt or "")
     return full_response
 
+
+async def async_call_ollama_api_with_pagination(query: str, model: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    return await async_call_ollama_api(model, query, instruction_prompt or "")
+
 # Note: Ollama doesn't have built-in support for image input like OpenAI.
 # For vision-related tasks, we'd need to use a different approach or model.
 
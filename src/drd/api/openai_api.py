@@ -1,13 +1,15 @@
 import os
 import json
 import base64
-from typing import Dict, Any, Optional, List, Generator
-from openai import OpenAI, AzureOpenAI
+from typing import Dict, Any, Optional, List, Generator, AsyncGenerator
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI
 from ..utils.parser import extract_and_parse_xml, parse_dravid_response
 from ..utils.file_utils import convert_to_base64
 import xml.etree.ElementTree as ET
 import click
 from .ollama_api import get_ollama_client, call_ollama_api_with_pagination, stream_ollama_response
+from .ollama_api import async_call_ollama_api_with_pagination, async_stream_ollama_response
+from .async_client import get_loop_client
 
 DEFAULT_MODEL = "gpt-4o-2024-05-13"
 MAX_TOKENS = 4000
@@ -41,6 +43,28 @@ def get_client():
         raise ValueError(f"Unsupported LLM type: {llm_type}")
 
 
+def create_async_client(llm_type: str):
+    if llm_type == 'azure':
+        return AsyncAzureOpenAI(
+            api_key=get_env_variable("AZURE_OPENAI_API_KEY"),
+            api_version=get_env_variable("AZURE_OPENAI_API_VERSION"),
+            azure_endpoint=get_env_variable("AZURE_OPENAI_ENDPOINT")
+        )
+    elif llm_type == 'openai':
+        return AsyncOpenAI()
+    elif llm_type == 'custom':
+        api_key = get_env_variable("DRAVID_LLM_API_KEY")
+        api_base = get_env_variable("DRAVID_LLM_ENDPOINT")
+        return AsyncOpenAI(api_key=api_key, base_url=api_base)
+    else:
+        raise ValueError(f"Unsupported LLM type: {llm_type}")
+
+
+def get_async_client():
+    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
+    return get_loop_client(f'openai:{llm_type}', lambda: create_async_client(llm_type))
+
+
 def get_model():
     llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
     if llm_type == 'azure':
@@ -60,20 +84,38 @@ def parse_response(response: str) -> str:
         return response
 
 
-def call_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
-    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
-    model = get_model()
+def get_messages(query: str, instruction_prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+    return [
+        {"role": "system", "content": instruction_prompt or ""},
+        {"role": "user", "content": query}
+    ]
 
-    if llm_type == 'ollama':
-        return call_ollama_api_with_pagination(query, model, include_context, instruction_prompt)
 
-    client = get_client()
-    full_response = ""
-    messages = [
+def get_vision_messages(query: str, image_path: str, instruction_prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+    mime_type, image_data = convert_to_base64(image_path)
+    return [
         {"role": "system", "content": instruction_prompt or ""},
-        {"role": "user", "content": query}
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": query},
+                {"type": "image_url", "image_url": {
+                    "url": f"data:image/{mime_type};base64,{image_data}"}}
+            ]
+        }
     ]
 
+
+def continue_if_truncated(messages: List[Dict[str, Any]], response, full_response: str) -> bool:
+    if response.choices[0].finish_reason != 'length':
+        return False
+    messages.append({"role": "assistant", "content": full_response})
+    messages.append({"role": "user", "content": "Please continue."})
+    return True
+
+
+def paginate(client, model: str, messages: List[Dict[str, Any]]) -> str:
+    full_response = ""
     while True:
         response = client.chat.completions.create(
             model=model,
@@ -81,16 +123,36 @@ def call_api_with_pagination(query: str, include_context: bool = False, instruct
             max_tokens=MAX_TOKENS
         )
         full_response += response.choices[0].message.content
-
-        if response.choices[0].finish_reason != 'length':
+        if not continue_if_truncated(messages, response, full_response):
             break
+    return parse_response(full_response)
 
-        messages.append({"role": "assistant", "content": full_response})
-        messages.append({"role": "user", "content": "Please continue."})
 
+async def async_paginate(client, model: str, messages: List[Dict[str, Any]]) -> str:
+    full_response = ""
+    while True:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=MAX_TOKENS
+        )
+        full_response += response.choices[0].message.content
+        if not continue_if_truncated(messages, response, full_response):
+            break
     return parse_response(full_response)
 
 
+def call_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
+    model = get_model()
+
+    if llm_type == 'ollama':
+        return call_ollama_api_with_pagination(query, model, include_context, instruction_prompt)
+
+    client = get_client()
+    return paginate(client, model, get_messages(query, instruction_prompt))
+
+
 def call_vision_api_with_pagination(query: str, image_path: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
     llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
     if llm_type == 'ollama':
@@ -99,36 +161,29 @@ def call_vision_api_with_pagination(query: str, image_path: str, include_context
 
     client = get_client()
     model = get_model()
+    return paginate(client, model, get_vision_messages(query, image_path, instruction_prompt))
 
-    mime_type, image_data = convert_to_base64(image_path)
-    full_response = ""
-    messages = [
-        {"role": "system", "content": instruction_prompt or ""},
-        {
-            "role": "user",
-            "content": [
-                {"type": "text", "text": query},
-                {"type": "image_url", "image_url": {
-                    "url": f"data:image/{mime_type};base64,{image_data}"}}
-            ]
-        }
-    ]
 
-    while True:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_tokens=MAX_TOKENS
-        )
-        full_response += response.choices[0].message.content
+async def async_call_api_with_pagination(query: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
+    model = get_model()
 
-        if response.choices[0].finish_reason != 'length':
-            break
+    if llm_type == 'ollama':
+        return await async_call_ollama_api_with_pagination(query, model, include_context, instruction_prompt)
 
-        messages.append({"role": "assistant", "content": full_response})
-        messages.append({"role": "user", "content": "Please continue."})
+    client = get_async_client()
+    return await async_paginate(client, model, get_messages(query, instruction_prompt))
 
-    return parse_response(full_response)
+
+async def async_call_vision_api_with_pagination(query: str, image_path: str, include_context: bool = False, instruction_prompt: Optional[str] = None) -> str:
+    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
+    if llm_type == 'ollama':
+        raise NotImplementedError(
+            "Vision API is not supported for Ollama models")
+
+    client = get_async_client()
+    model = get_model()
+    return await async_paginate(client, model, get_vision_messages(query, image_path, instruction_prompt))
 
 
 def stream_response(query: str, instruction_prompt: Optional[str] = None) -> Generator[str, None, None]:
@@ -140,10 +195,7 @@ def stream_response(query: str, instruction_prompt: Optional[str] = None) -> Gen
         return
 
     client = get_client()
-    messages = [
-        {"role": "system", "content": instruction_prompt or ""},
-        {"role": "user", "content": query}
-    ]
+    messages = get_messages(query, instruction_prompt)
 
     response = client.chat.completions.create(
         model=model,
@@ -155,3 +207,25 @@ def stream_response(query: str, instruction_prompt: Optional[str] = None) -> Gen
     for chunk in response:
         if chunk.choices and chunk.choices[0].delta.content is not None:
             yield chunk.choices[0].delta.content
+
+
+async def async_stream_response(query: str, instruction_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
+    llm_type = get_env_variable('DRAVID_LLM', 'openai').lower()
+    model = get_model()
+
+    if llm_type == 'ollama':
+        async for chunk in async_stream_ollama_response(model, query, instruction_prompt or ""):
+            yield chunk
+        return
+
+    client = get_async_client()
+    response = await client.chat.completions.create(
+        model=model,
+        messages=get_messages(query, instruction_prompt),
+        max_tokens=MAX_TOKENS,
+        stream=True
+    )
+
+    async for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content is not None:
+            yield chunk.choices[0].delta.content
@@ -2,14 +2,14 @@ import click
 import sys
 from ..api import stream_dravid_api, call_dravid_api_with_pagination
 from ..utils.utils import print_error, print_info
+from ..utils.content_cache import get_content_cache
 from ..metadata.project_metadata import ProjectMetadataManager
 import os
 
 
 def read_file_content(file_path):
     try:
-        with open(file_path, 'r') as file:
-            return file.read()
+        return get_content_cache().read(file_path)
     except FileNotFoundError:
         return None
 
@@ -23,7 +23,7 @@ def suggest_file_alternative(file_path, project_metadata):
 def handle_ask_command(ask, file, debug):
     context = ""
     metadata_manager = ProjectMetadataManager(os.getcwd())
-    project_metadata = metadata_manager.get_project_context()
+    project_metadata = metadata_manager.get_project_context(ask)
 
     for file_path in file:
         content = read_file_content(file_path)
@@ -2,14 +2,17 @@ import click
 import sys
 import ast
 import os
-import asyncio
 from dotenv import load_dotenv
 from .query import execute_dravid_command
 from ..prompts.instructions import get_instruction_prompt
 from .monitor import run_dev_server_with_monitoring
 from ..metadata.initializer import initialize_project_metadata
+from ..metadata.watcher import watch_project_metadata
 from ..metadata.updater import update_metadata_with_dravid
-from ..utils.utils import print_error
+from ..metadata.project_metadata import ProjectMetadataManager
+from ..utils.utils import print_error, print_success
+from ..api.cache import configure_cache, print_cache_stats
+from ..api.async_client import run_async
 from .ask_handler import handle_ask_command
 
 VERSION = "0.13.9"  # Update this as you release new versions
@@ -38,20 +41,37 @@ def handle_query_command(query, image, debug):
     execute_dravid_command(query, image, debug, instruction_prompt, warn=True)
 
 
-def dravid_cli_logic(command, do, image, debug, meta_add, meta_init, ask, file, version):
+def dravid_cli_logic(command, do, image, debug, meta_add, meta_init, ask, file, version, no_cache=False, meta_export=False, fast=False, resume=False, watch_meta=False):
     if version:
         click.echo(f"Dravid CLI version {VERSION}")
         return
 
-    if meta_add:
+    if no_cache:
+        configure_cache(enabled=False)
+
+    try:
+        run_cli_command(command, do, image, debug,
+                        meta_add, meta_init, ask, file, meta_export, fast, resume, watch_meta)
+    finally:
+        if debug:
+            print_cache_stats()
+
+
+def run_cli_command(command, do, image, debug, meta_add, meta_init, ask, file, meta_export=False, fast=False, resume=False, watch_meta=False):
+    if meta_export:
+        path = ProjectMetadataManager(os.getcwd()).export_metadata()
+        print_success(f"Project metadata exported to {path}")
+    elif meta_add:
         update_metadata_with_dravid(meta_add, os.getcwd())
     elif meta_init:
-        asyncio.run(initialize_project_metadata(os.getcwd()))
+        run_async(initialize_project_metadata(os.getcwd(), fast=fast, resume=resume))
     elif ask or file:
         handle_ask_command(ask, file, debug)
     elif do is not None:
         handle_query_command(do, image, debug)
     elif command:
-        run_dev_server_with_monitoring(command)
+        run_dev_server_with_monitoring(command, watch_meta=watch_meta)
+    elif watch_meta:
+        watch_project_metadata(os.getcwd())
     else:
         click.echo("Please provide a command to run or use --do for queries.")
@@ -17,12 +17,17 @@ load_dotenv()
 @click.option('--debug', is_flag=True, help='Print more information on how this coding assistant executes your instruction')
 @click.option('--meta-add', '--a', help='Update metadata based on the provided description')
 @click.option('--meta-init', '--i', is_flag=True, help='Initialize project metadata')
+@click.option('--resume', is_flag=True, help='With --meta-init, continue an interrupted run from its checkpoint')
+@click.option('--fast', is_flag=True, help='With --meta-init, extract file metadata locally without calling the LLM')
+@click.option('--watch-meta', is_flag=True, help='Keep project metadata up to date as files change; combine with a command to watch while it runs')
+@click.option('--meta-export', is_flag=True, help='Write project metadata from the configured backend to drd.json')
 @click.option('--ask', help='Ask an open-ended question and get a streamed response from Claude')
 @click.option('--file', type=click.Path(), multiple=True, help='Read content from specified file(s) and include in the context')
 @click.option('--version', is_flag=True, help='Show the version of the tool')
-def dravid_cli(command, do, image, debug, meta_add, meta_init, ask, file, version):
+@click.option('--no-cache', is_flag=True, help='Bypass the on-disk LLM response cache for this run')
+def dravid_cli(command, do, image, debug, meta_add, meta_init, resume, fast, watch_meta, meta_export, ask, file, version, no_cache):
     dravid_cli_logic(command, do, image, debug, meta_add,
-                     meta_init, ask, file, version)
+                     meta_init, ask, file, version, no_cache, meta_export, fast, resume, watch_meta)
 
 
 if __name__ == '__main__':
@@ -5,7 +5,7 @@ from ...utils.utils import print_error, print_success, print_info, print_prompt
 from ...utils.loader import run_with_loader
 from ...prompts.monitor_error_resolution import get_error_resolution_prompt
 from ..query.file_operations import get_files_to_modify
-from ...utils.file_utils import get_file_content
+from ...utils.excerpts import get_file_excerpt
 from ...utils.input import confirm_with_user
 
 
@@ -17,7 +17,8 @@ def monitoring_handle_error_with_dravid(error, line, monitor):
     error_trace = ''.join(traceback.format_exception(
         type(error), error, error.__traceback__))
 
-    project_context = monitor.metadata_manager.get_project_context()
+    project_context = monitor.get_metadata_manager().get_project_context(
+        f"{error_message} {line}")
 
     print_info("Identifying relevant files for error context...")
     error_details = f"error_msg: {error_message}, error_type: {error_type}, error_trace: {error_trace}"
@@ -30,7 +31,8 @@ def monitoring_handle_error_with_dravid(error, line, monitor):
 
     file_contents = {}
     for file in files_to_check:
-        content = get_file_content(file)
+        content = get_file_excerpt(
+            file, query=error_message, trace=f"{error_trace}\n{line}")
         if content:
             file_contents[file] = content
             print_info(f"  - Read content of {file}")
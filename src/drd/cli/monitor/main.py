@@ -5,14 +5,15 @@ from .error_resolver import monitoring_handle_error_with_dravid
 from ...utils import print_info
 
 
-def run_dev_server_with_monitoring(command: str):
+def run_dev_server_with_monitoring(command: str, watch_meta: bool = False):
     error_handlers = {
         r"(?:Cannot find module|Module not found|ImportError|No module named)": handle_module_not_found,
         r"(?:SyntaxError|Expected|Unexpected token)": handle_syntax_error,
         r"(?:Error:|Failed to compile)": handle_general_error,
     }
     current_dir = os.getcwd()
-    monitor = DevServerMonitor(current_dir, error_handlers, command)
+    monitor = DevServerMonitor(
+        current_dir, error_handlers, command, watch_meta)
     try:
         monitor.start()
         print_info("👓 server monitor started. Press Ctrl+C to stop.")
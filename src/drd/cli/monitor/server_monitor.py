@@ -6,13 +6,14 @@ from .input_handler import InputHandler
 from .output_monitor import OutputMonitor
 from ...utils import print_info, print_success, print_error, print_header, print_prompt
 from ...metadata.project_metadata import ProjectMetadataManager
+from ...metadata.watcher import MetadataWatcher
 
 
 MAX_RETRIES = 3
 
 
 class DevServerMonitor:
-    def __init__(self, project_dir: str, error_handlers: dict, command: str):
+    def __init__(self, project_dir: str, error_handlers: dict, command: str, watch_meta: bool = False):
         self.project_dir = project_dir
         self.error_handlers = error_handlers
         self.command = command
@@ -26,6 +27,11 @@ class DevServerMonitor:
         self.output_monitor = OutputMonitor(self)
         self.retry_count = 0
         self.metadata_manager = ProjectMetadataManager(project_dir)
+        self.metadata_changed = threading.Event()
+        # Re-describes files in drd.json as they change while the server runs.
+        # The watcher thread has its own manager; ours is reloaded before its next use.
+        self.metadata_watcher = MetadataWatcher(
+            project_dir, on_refresh=lambda paths: self.metadata_changed.set()) if watch_meta else None
 
     def start(self):
         self.should_stop.clear()
@@ -35,6 +41,8 @@ class DevServerMonitor:
         try:
             self.process = start_process(self.command, self.project_dir)
             self.output_monitor.start()
+            if self.metadata_watcher:
+                self.metadata_watcher.start()
             self._main_loop()
         except Exception as e:
             print_error(f"Failed to start server process: {str(e)}")
@@ -52,6 +60,12 @@ class DevServerMonitor:
         finally:
             self.stop()
 
+    def get_metadata_manager(self):
+        if self.metadata_changed.is_set():
+            self.metadata_changed.clear()
+            self.metadata_manager.reload()
+        return self.metadata_manager
+
     def request_restart(self):
         self.restart_requested.set()
 
@@ -81,6 +95,8 @@ class DevServerMonitor:
 
     def stop(self):
         self.should_stop.set()
+        if self.metadata_watcher:
+            self.metadata_watcher.stop()
         if self.process:
             self.process.terminate()
             self.process.wait()
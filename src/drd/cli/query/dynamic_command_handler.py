@@ -1,57 +1,161 @@
 import traceback
 import click
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from ...api.main import call_dravid_api
 import xml.etree.ElementTree as ET
 from ...utils import print_error, print_success, print_info, print_step, print_debug
 from ...metadata.common_utils import generate_file_description
 from ...prompts.error_resolution_prompt import get_error_resolution_prompt
+from .step_planner import StepPlanner, STEP_WORKERS, runs_in_background
 
 
 def execute_commands(commands, executor, metadata_manager, is_fix=False, debug=False):
+    if STEP_WORKERS > 1:
+        return execute_commands_in_parallel(
+            commands, executor, metadata_manager, is_fix, debug)
     all_outputs = []
-    total_steps = len(commands)
+    # Commands still streaming in have no known total yet
+    total_steps = len(commands) if hasattr(commands, '__len__') else None
+    completed = 0
 
     for i, cmd in enumerate(commands, 1):
         step_description = "fix" if is_fix else "command"
+        step = f"{i}/{total_steps}" if total_steps is not None else f"{i}"
 
-        if cmd['type'] == 'explanation':
-            all_outputs.append(
-                f"Step {i}/{total_steps}: Explanation - {cmd['content']}")
+        if cmd['type'] == 'explanation' or cmd.get('completed'):
+            record_step_output(all_outputs, step, cmd, None)
         else:
             try:
-                if cmd['type'] == 'shell':
-                    output = handle_shell_command(cmd, executor)
-                elif cmd['type'] == 'file':
-                    output = handle_file_operation(
-                        cmd, executor, metadata_manager)
-                elif cmd['type'] == 'metadata':
-                    output = handle_metadata_operation(cmd, metadata_manager)
-                elif cmd['type'] == 'requires_restart':
-                    output = 'requires restart if the server is running'
-                else:
-                    raise ValueError(f"Unknown command type: {cmd['type']}")
+                output = run_command(cmd, executor, metadata_manager)
+                record_step_output(all_outputs, step, cmd, output)
+            except Exception as e:
+                return step_failure(all_outputs, i, step, step_description, cmd, e)
 
-                if isinstance(output, str) and output.startswith("Skipping"):
-                    print_info(f"Step {i}/{total_steps}: {output}")
-                    all_outputs.append(f"Step {i}/{total_steps}: {output}")
+        if debug:
+            print_debug(f"Completed step {step}")
+        completed = i
+
+    return True, completed, None, "\n".join(all_outputs)
+
+
+def execute_commands_in_parallel(commands, executor, metadata_manager, is_fix=False, debug=False, workers=None):
+    """execute_commands, with independent shell steps running in a worker pool.
+
+    Steps are still confirmed one at a time and in order on this thread, and
+    their output is reported in step order. A step starts once the earlier
+    steps it depends on (see StepPlanner) have finished. After a failure no
+    further steps are started; later steps that had already finished are
+    marked completed so that retrying the remaining commands skips them.
+    """
+    total_steps = len(commands) if hasattr(commands, '__len__') else None
+    step_description = "fix" if is_fix else "command"
+    planner = StepPlanner()
+    # (number, label, command, future, finish) per command, in order
+    entries = []
+    all_outputs = []
+    reported = 0
+
+    def report(block):
+        """Report finished steps in order; return a failure result if one failed."""
+        nonlocal reported
+        while reported < len(entries):
+            i, step, cmd, future, finish = entries[reported]
+            if not block and not future.done():
+                return None
+            try:
+                output = finish(cmd, future.result())
+            except Exception as e:
+                wait([entry[3] for entry in entries])
+                for _, _, later, later_future, _ in entries[reported + 1:]:
+                    if later['type'] != 'explanation' and later_future.exception() is None:
+                        later['completed'] = True
+                return step_failure(all_outputs, i, step, step_description, cmd, e)
+            record_step_output(all_outputs, step, cmd, output)
+            if debug:
+                print_debug(f"Completed step {step}")
+            reported += 1
+        return None
+
+    pool = ThreadPoolExecutor(max_workers=workers or STEP_WORKERS)
+    try:
+        for i, cmd in enumerate(commands, 1):
+            step = f"{i}/{total_steps}" if total_steps is not None else f"{i}"
+            dependencies, effects = planner.add(cmd)
+            wait([entries[index][3] for index in dependencies])
+            if any(entries[index][3].exception() for index in dependencies):
+                return report(block=True)
+            failure = report(block=False)
+            if failure:
+                return failure
+
+            future = Future()
+            finish = keep_output
+            if cmd['type'] == 'explanation' or cmd.get('completed'):
+                future.set_result(None)
+            elif runs_in_background(cmd, effects):
+                if executor.confirm_shell_command(cmd['command']):
+                    future = pool.submit(executor.execute_shell_command,
+                                         cmd['command'], confirmed=True, echo=False)
+                    finish = shell_command_result
                 else:
-                    all_outputs.append(
-                        f"Step {i}/{total_steps}: {cmd['type'].capitalize()} command - {cmd.get('command', '')} {cmd.get('operation', '')}\nOutput: {output}")
+                    print_info("Command execution cancelled by user.")
+                    future.set_result(shell_command_result(cmd, 'Skipping this step...'))
+            else:
+                try:
+                    future.set_result(run_command(cmd, executor, metadata_manager))
+                except Exception as e:
+                    future.set_exception(e)
+            entries.append((i, step, cmd, future, finish))
 
-            except Exception as e:
-                error_message = f"Step {i}/{total_steps}: Error executing {step_description}: {cmd}\nError details: {str(e)}"
-                print_error(error_message)
-                all_outputs.append(error_message)
-                return False, i, str(e), "\n".join(all_outputs)
+        return report(block=True) or (True, len(entries), None, "\n".join(all_outputs))
+    finally:
+        pool.shutdown(wait=True)
 
-        if debug:
-            print_debug(f"Completed step {i}/{total_steps}")
 
-    return True, total_steps, None, "\n".join(all_outputs)
+def keep_output(cmd, output):
+    return output
+
+
+def run_command(cmd, executor, metadata_manager):
+    if cmd['type'] == 'shell':
+        return handle_shell_command(cmd, executor)
+    elif cmd['type'] == 'file':
+        return handle_file_operation(cmd, executor, metadata_manager)
+    elif cmd['type'] == 'metadata':
+        return handle_metadata_operation(cmd, metadata_manager)
+    elif cmd['type'] == 'requires_restart':
+        return 'requires restart if the server is running'
+    else:
+        raise ValueError(f"Unknown command type: {cmd['type']}")
+
+
+def record_step_output(all_outputs, step, cmd, output):
+    if cmd['type'] == 'explanation':
+        all_outputs.append(
+            f"Step {step}: Explanation - {cmd['content']}")
+    elif cmd.get('completed') and output is None:
+        all_outputs.append(f"Step {step}: Already completed")
+    elif isinstance(output, str) and output.startswith("Skipping"):
+        print_info(f"Step {step}: {output}")
+        all_outputs.append(f"Step {step}: {output}")
+    else:
+        all_outputs.append(
+            f"Step {step}: {cmd['type'].capitalize()} command - {cmd.get('command', '')} {cmd.get('operation', '')}\nOutput: {output}")
+
+
+def step_failure(all_outputs, i, step, step_description, cmd, error):
+    error_message = f"Step {step}: Error executing {step_description}: {cmd}\nError details: {str(error)}"
+    print_error(error_message)
+    all_outputs.append(error_message)
+    return False, i, str(error), "\n".join(all_outputs)
 
 
 def handle_shell_command(cmd, executor):
     output = executor.execute_shell_command(cmd['command'])
+    return shell_command_result(cmd, output)
+
+
+def shell_command_result(cmd, output):
     if isinstance(output, str) and output.startswith("Skipping"):
         print_info(output)
         return output
@@ -163,7 +267,8 @@ def handle_error_with_dravid(error, cmd, executor, metadata_manager, depth=0, pr
     error_trace = ''.join(traceback.format_exception(
         type(error), error, error.__traceback__))
 
-    project_context = metadata_manager.get_project_context()
+    project_context = metadata_manager.get_project_context(
+        f"{cmd} {error_message} {error_trace}")
     error_query = get_error_resolution_prompt(
         previous_context, cmd, error_type, error_message, error_trace, project_context
     )
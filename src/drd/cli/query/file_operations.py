@@ -5,6 +5,11 @@ from ...metadata.project_metadata import ProjectMetadataManager
 from ...prompts.file_operations import get_files_to_modify_prompt, find_file_prompt
 from ...utils.parser import parse_file_list_response,  parse_find_file_response
 
+# How files related to a query are found: 'local' uses only the BM25 index,
+# 'hybrid' lets the LLM choose among the index's top matches, 'llm' sends the
+# whole project context to the LLM
+FILE_SELECTION = os.getenv('DRAVID_FILE_SELECTION', 'hybrid').lower()
+
 
 def get_files_to_modify(query, project_context):
     file_query = get_files_to_modify_prompt(query, project_context)
@@ -13,15 +18,21 @@ def get_files_to_modify(query, project_context):
     return parse_file_list_response(response)
 
 
-def find_file_with_dravid(filename, project_context, max_retries=2, current_retry=0):
+def find_file_with_dravid(filename, project_context, max_retries=2, current_retry=0, metadata_manager=None):
     if os.path.exists(filename):
         return filename
     if current_retry >= max_retries:
         print_error(f"File not found after {max_retries} retries: {filename}")
         return None
 
-    metadata_manager = ProjectMetadataManager(os.getcwd())
-    project_metadata = metadata_manager.get_project_context()
+    # One manager for every attempt, so the project is only scanned once
+    metadata_manager = metadata_manager or ProjectMetadataManager(os.getcwd())
+    resolved = metadata_manager.resolve_file(filename)
+    if resolved:
+        print_info(f"Resolved {filename} to {resolved}")
+        return resolved
+
+    project_metadata = metadata_manager.get_project_context(filename)
     query = find_file_prompt(filename, project_context, project_metadata)
 
     response = call_dravid_api_with_pagination(query, include_context=True)
@@ -29,7 +40,8 @@ def find_file_with_dravid(filename, project_context, max_retries=2, current_retr
 
     if suggested_file:
         print_info(f"Dravid suggested an alternative file: {suggested_file}")
-        return find_file_with_dravid(suggested_file, project_context, max_retries, current_retry + 1)
+        return find_file_with_dravid(suggested_file, project_context, max_retries, current_retry + 1,
+                                     metadata_manager)
     else:
         print_error("Dravid couldn't suggest an alternative file.")
         return None
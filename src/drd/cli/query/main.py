@@ -1,12 +1,19 @@
+import os
 import click
-from ...api.main import stream_dravid_api, call_dravid_vision_api
+from ...api.main import stream_dravid_api, stream_dravid_commands, call_dravid_vision_api
 from ...utils.step_executor import Executor
 from ...metadata.project_metadata import ProjectMetadataManager
 from .dynamic_command_handler import handle_error_with_dravid, execute_commands
 from ...utils import print_error, print_success, print_info, print_debug, print_warning, print_step, print_header, run_with_loader
 from ...utils.file_utils import get_file_content, fetch_project_guidelines, is_directory_empty
-from .file_operations import get_files_to_modify
+from ...utils.excerpts import get_file_excerpt
+from .file_operations import get_files_to_modify, FILE_SELECTION
+from .prompt_budget import PromptAssembler, MAIN_FILE, DEPENDENCIES, REFERENCES, METADATA
 from ...utils.parser import parse_dravid_response
+from ...metadata.context import words
+
+# Execute each step as soon as it has streamed in, while the LLM is still writing the rest
+PIPELINE_STEPS = os.getenv('DRAVID_PIPELINE_STEPS', 'false').lower() == 'true'
 
 
 def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=None, reference_files=None):
@@ -21,18 +28,32 @@ def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=No
     metadata_manager = ProjectMetadataManager(executor.current_dir)
 
     try:
-        project_context = metadata_manager.get_project_context()
+        project_context = metadata_manager.get_project_context(query)
 
         files_info = None
         if project_context:
-            print_info("🔍 Identifying related files to the query...", indent=2)
-            print_info("(1 LLM call)", indent=4)
-            files_info = run_with_loader(
-                lambda: get_files_to_modify(query, project_context),
-                "Analyzing project files"
-            )
-
-            if debug:
+            candidates = metadata_manager.find_relevant_files(query)
+            if FILE_SELECTION == 'local' and candidates:
+                print_info("🔍 Ranked related files locally (no LLM call)", indent=2)
+                files_info = candidates
+            else:
+                selection_context = project_context
+                if FILE_SELECTION == 'hybrid' and candidates:
+                    # The LLM only chooses among the best local matches
+                    selection_context = metadata_manager.get_project_context(
+                        query, paths=candidates)
+                print_info("🔍 Identifying related files to the query...", indent=2)
+                print_info("(1 LLM call)", indent=4)
+                files_info = run_with_loader(
+                    lambda: get_files_to_modify(query, selection_context),
+                    "Analyzing project files"
+                )
+
+            if debug and isinstance(files_info, list):
+                print_info("Files related to the query:", indent=4)
+                for file in files_info:
+                    print_info(f"- {file}", indent=6)
+            elif debug:
                 print_info("Files and dependencies analysis:", indent=4)
                 if files_info['main_file']:
                     print_info(
@@ -49,10 +70,17 @@ def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=No
                 for file in files_info['file_contents_to_load']:
                     print_info(f"- {file}", indent=8)
 
+        file_symbols = None
+        if isinstance(files_info, list):
+            file_symbols = query_symbols(metadata_manager, files_info, query)
         full_query = construct_full_query(
-            query, executor, project_context, files_info, reference_files)
+            query, executor, project_context, files_info, reference_files, debug=debug,
+            summarize_context=lambda max_tokens: metadata_manager.get_project_context(
+                query, max_tokens=max_tokens),
+            file_symbols=file_symbols)
 
         print_info("💡 Preparing to send query to LLM...", indent=2)
+        executed = None
         if image_path:
             print_info(f"Processing image: {image_path}", indent=4)
             print_info("(1 LLM call)", indent=4)
@@ -61,6 +89,18 @@ def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=No
                     full_query, image_path, include_context=True, instruction_prompt=instruction_prompt),
                 "Analyzing image and generating response"
             )
+        elif PIPELINE_STEPS:
+            print_info("💬 Streaming response from LLM, running steps as they arrive...", indent=2)
+            print_info("(1 LLM call)", indent=4)
+            stream = stream_dravid_commands(
+                full_query, include_context=True, instruction_prompt=instruction_prompt)
+            executed = execute_commands(
+                stream, executor, metadata_manager, debug=debug)
+            # A failed step stops execution; the fix below needs the steps after it
+            commands = stream.drain()
+            xml_result = stream.response
+            if debug:
+                print_debug(f"Received {len(commands)} new command(s)")
         else:
             print_info("💬 Streaming response from LLM...", indent=2)
             print_info("(1 LLM call)", indent=4)
@@ -76,8 +116,10 @@ def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=No
             print_debug("Actual result: " + str(xml_result))
             return
 
-        success, step_completed, error_message, all_outputs = execute_commands(
-            commands, executor, metadata_manager, debug=debug)
+        if executed is None:
+            executed = execute_commands(
+                commands, executor, metadata_manager, debug=debug)
+        success, step_completed, error_message, all_outputs = executed
 
         if not success:
             print_error(
@@ -106,54 +148,94 @@ def execute_dravid_command(query, image_path, debug, instruction_prompt, warn=No
             traceback.print_exc()
 
 
-def construct_full_query(query, executor, project_context, files_info=None, reference_files=None):
+def query_symbols(metadata_manager, files, query):
+    """Exports of each file that share a word with query, from the project metadata.
+
+    Their definitions are what excerpts of large files quote; files without
+    a matching export are excerpted around lines matching the query instead.
+    """
+    query_words = words(query)
+    symbols = {}
+    for file in files:
+        entry = metadata_manager.get_file_metadata(file) or {}
+        matching = [name for name in entry.get('exports') or []
+                    if query_words & words(str(name).split(':')[-1])]
+        if matching:
+            symbols[file] = matching
+    return symbols
+
+
+def add_file_contents(prompt, files, main_file, read):
+    """Quote each of files; when the budget is short, main_file is the last to go."""
+    prompt.add("file contents header", "Current file contents:\n")
+    for file in files:
+        content = read(file)
+        if content:
+            print_info(f"  - Read content of {file}", indent=4)
+            tier = MAIN_FILE if file == main_file else DEPENDENCIES
+            prompt.add(file, f"Current content of {file}:\n{content}\n", tier)
+    prompt.add("file contents footer", "\n")
+
+
+def construct_full_query(query, executor, project_context, files_info=None, reference_files=None,
+                         debug=False, summarize_context=None, max_tokens=None, file_symbols=None):
+    prompt = PromptAssembler(max_tokens)
     is_empty = is_directory_empty(executor.current_dir)
     if is_empty:
         print_info(
             "Current directory is empty. Will create a new project.", indent=2)
-        full_query = f"Current directory is empty.\n\nUser query: {query}"
+        prompt.add("query", f"Current directory is empty.\n\nUser query: {query}")
     elif not project_context:
         print_info(
             "No current project context found, but directory is not empty.", indent=2)
-        full_query = f"Current directory is not empty, but no project context is available.\n\nUser query: {query}"
+        prompt.add(
+            "query", f"Current directory is not empty, but no project context is available.\n\nUser query: {query}")
     else:
         print_info(
             "Constructing query with project context and file information.", indent=2)
         project_guidelines = fetch_project_guidelines(executor.current_dir)
-        full_query = f"{project_context}\n\n"
-        full_query += f"Project Guidelines:\n{project_guidelines}\n\n"
-        if files_info and isinstance(files_info, dict):
+        summarize = None
+        if summarize_context:
+            def summarize(tokens):
+                return f"{summarize_context(tokens - 1)}\n\n"
+        prompt.add("project context", f"{project_context}\n\n", METADATA, summarize)
+        prompt.add("guidelines", f"Project Guidelines:\n{project_guidelines}\n\n")
+        if files_info and isinstance(files_info, list):
+            # Paths from file selection, best match first
+            file_symbols = file_symbols or {}
+            add_file_contents(
+                prompt, files_info, files_info[0],
+                lambda file: get_file_excerpt(file, query=query, symbols=file_symbols.get(file)))
+        elif files_info and isinstance(files_info, dict):
             if 'file_contents_to_load' in files_info:
-                file_contents = {}
-                for file in files_info['file_contents_to_load']:
-                    content = get_file_content(file)
-                    if content:
-                        file_contents[file] = content
-                        print_info(f"  - Read content of {file}", indent=4)
-                file_context = "\n".join(
-                    [f"Current content of {file}:\n{content}" for file, content in file_contents.items()])
-                full_query += f"Current file contents:\n{file_context}\n\n"
+                # Names other files use from each dependency mark what to quote of it
+                used_symbols = {dep['file']: dep.get('imports') or []
+                                for dep in files_info.get('dependencies') or []}
+                add_file_contents(
+                    prompt, files_info['file_contents_to_load'], files_info.get('main_file'),
+                    lambda file: get_file_excerpt(file, query=query, symbols=used_symbols.get(file)))
             if 'dependencies' in files_info:
                 dependency_context = "\n".join(
                     [f"Dependency {dep['file']} exports: {', '.join(dep['imports'])}" for dep in files_info['dependencies']])
-                full_query += f"Dependencies:\n{dependency_context}\n\n"
+                prompt.add("dependencies", f"Dependencies:\n{dependency_context}\n\n", DEPENDENCIES)
             if 'new_files' in files_info:
                 new_files_context = "\n".join(
                     [f"New file to create: {new_file['file']}" for new_file in files_info['new_files']])
-                full_query += f"New files to create:\n{new_files_context}\n\n"
+                prompt.add("new files", f"New files to create:\n{new_files_context}\n\n")
             if 'main_file' in files_info:
-                full_query += f"Main file to modify: {files_info['main_file']}\n\n"
-        full_query += "Current directory is not empty.\n\n"
-        full_query += f"User query: {query}"
+                prompt.add("main file", f"Main file to modify: {files_info['main_file']}\n\n")
+        prompt.add("query", f"Current directory is not empty.\n\nUser query: {query}")
     if reference_files:
         print_info("📄 Reading reference file contents...", indent=2)
-        reference_contents = {}
-        for file in reference_files:
+        prompt.add("reference header", "\n\nReference files:\n")
+        for index, file in enumerate(reference_files):
             content = get_file_content(file)
             if content:
-                reference_contents[file] = content
                 print_info(f"  - Read content of {file}", indent=4)
-        reference_context = "\n\n".join(
-            [f"Reference file {file}:\n{content}" for file, content in reference_contents.items()])
-        full_query += f"\n\nReference files:\n{reference_context}"
+                separator = "\n\n" if index < len(reference_files) - 1 else ""
+                prompt.add(file, f"Reference file {file}:\n{content}{separator}", REFERENCES)
+    full_query = prompt.assemble()
+    if debug:
+        for line in prompt.report():
+            print_debug(line)
     return full_query
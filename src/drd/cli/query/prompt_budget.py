@@ -0,0 +1,129 @@
+import os
+from ...api.main import get_model_name
+from ...metadata.batching import estimate_tokens, CHARS_PER_TOKEN
+
+# Fixed prompt budget in tokens; 0 derives it from the model's context window
+PROMPT_TOKENS = int(os.getenv('DRAVID_PROMPT_TOKENS', '0'))
+# Even with a large window, long prompts make the first streamed token slow
+MAX_PROMPT_TOKENS = int(os.getenv('DRAVID_MAX_PROMPT_TOKENS', '60000'))
+# Left free for the response
+OUTPUT_RESERVE_TOKENS = 4096
+# Context windows by model name prefix, most specific first
+MODEL_CONTEXT_TOKENS = (
+    ('gpt-4o', 128000), ('gpt-4-turbo', 128000), ('gpt-4-32k', 32768),
+    ('gpt-4', 8192), ('gpt-3.5', 16385), ('claude', 200000),
+)
+DEFAULT_CONTEXT_TOKENS = 32000
+# Below this a section is dropped rather than cut to a stub
+MIN_SECTION_TOKENS = 100
+
+# Priority tiers; when the budget runs out the highest number gives way first
+REQUIRED, MAIN_FILE, DEPENDENCIES, REFERENCES, METADATA = range(5)
+TIER_NAMES = ('required', 'main file', 'dependencies', 'references', 'metadata')
+
+
+def prompt_budget(model=None):
+    """Tokens the assembled prompt may take for the configured model."""
+    if PROMPT_TOKENS:
+        return PROMPT_TOKENS
+    if model is None:
+        try:
+            model = get_model_name()
+        except ValueError:
+            model = ''
+    model = (model or '').lower()
+    window = next((tokens for prefix, tokens in MODEL_CONTEXT_TOKENS
+                   if model.startswith(prefix)), DEFAULT_CONTEXT_TOKENS)
+    return min(window - OUTPUT_RESERVE_TOKENS, MAX_PROMPT_TOKENS)
+
+
+def truncate_lines(text, max_tokens):
+    """Keep whole lines from the start and end of text within max_tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    lines = text.splitlines()
+    # Room for the marker line
+    max_chars -= 64
+    head = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars * 2 // 3:
+            break
+        head.append(line)
+        used += len(line) + 1
+    tail = []
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > max_chars:
+            break
+        tail.append(line)
+        used += len(line) + 1
+    omitted = len(lines) - len(head) - len(tail)
+    marker = f"... [{omitted} lines omitted to fit the prompt] ..."
+    return '\n'.join(head + [marker] + tail[::-1]) + '\n'
+
+
+class PromptSection:
+    def __init__(self, name, text, tier=REQUIRED, summarize=None):
+        self.name = name
+        self.text = text
+        self.tier = tier
+        # Called with a token budget to produce a shorter version of text
+        self.summarize = summarize
+        self.tokens = estimate_tokens(text)
+        self.used = 0
+        self.status = None
+
+
+class PromptAssembler:
+    """Builds a prompt from sections without exceeding a token budget.
+
+    Sections are kept in the order they were added, but budget is handed out
+    by tier: required sections always go in full, then the main file,
+    dependencies, reference files and project metadata, each summarized,
+    truncated or dropped once what is left does not cover it.
+    """
+
+    def __init__(self, max_tokens=None):
+        self.max_tokens = max_tokens or prompt_budget()
+        self.sections = []
+
+    def add(self, name, text, tier=REQUIRED, summarize=None):
+        if text:
+            self.sections.append(PromptSection(name, text, tier, summarize))
+
+    def _fit(self, section, remaining):
+        if section.tier == REQUIRED or section.tokens <= remaining:
+            return section.text, 'full'
+        if remaining < MIN_SECTION_TOKENS:
+            return '', 'dropped'
+        if section.summarize:
+            text = section.summarize(remaining)
+            if text and estimate_tokens(text) <= remaining:
+                return text, 'summarized'
+            return '', 'dropped'
+        return truncate_lines(section.text, remaining), 'truncated'
+
+    def assemble(self):
+        remaining = self.max_tokens
+        texts = {}
+        for section in sorted(self.sections, key=lambda s: s.tier):
+            text, section.status = self._fit(section, remaining)
+            section.used = estimate_tokens(text) if text else 0
+            remaining -= section.used
+            texts[id(section)] = text
+        return ''.join(texts[id(section)] for section in self.sections)
+
+    @property
+    def used_tokens(self):
+        return sum(section.used for section in self.sections)
+
+    def report(self):
+        """Lines describing the token usage of each section, for --debug."""
+        lines = [f"Prompt tokens: ~{self.used_tokens} of {self.max_tokens}"]
+        for section in self.sections:
+            line = f"{section.name} [{TIER_NAMES[section.tier]}]: ~{section.used}"
+            if section.status != 'full':
+                line += f" of {section.tokens} ({section.status})"
+            lines.append(line)
+        return lines
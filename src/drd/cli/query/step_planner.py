@@ -0,0 +1,127 @@
+import os
+import re
+import shlex
+
+# Shell steps that may run at the same time; 1 runs every step in order
+STEP_WORKERS = int(os.getenv('DRAVID_STEP_WORKERS', '1'))
+
+# Matches every path
+EVERYTHING = '*'
+# Commands that change the executor's directory or environment for later steps
+STATEFUL_COMMAND = re.compile(r'^\s*(?:cd|chdir|source|\.|export|set)\b|^\s*\w+=')
+INSTALL_COMMAND = re.compile(
+    r'^\s*(npm|yarn|pnpm|pip3?|poetry|cargo|gem|bundle|composer|go)\s+(?:install|i|add|get)\b')
+# Files each package manager rewrites while installing
+INSTALL_TARGETS = {
+    'npm': ('package.json', 'package-lock.json', 'node_modules'),
+    'yarn': ('package.json', 'yarn.lock', 'node_modules'),
+    'pnpm': ('package.json', 'pnpm-lock.yaml', 'node_modules'),
+    'pip': ('requirements.txt', 'python-environment'),
+    'pip3': ('requirements.txt', 'python-environment'),
+    'poetry': ('pyproject.toml', 'poetry.lock', 'python-environment'),
+    'cargo': ('Cargo.toml', 'Cargo.lock'),
+    'gem': ('Gemfile', 'Gemfile.lock'),
+    'bundle': ('Gemfile', 'Gemfile.lock'),
+    'composer': ('composer.json', 'composer.lock', 'vendor'),
+    'go': ('go.mod', 'go.sum'),
+}
+# Commands whose only effect is on the paths given as arguments
+PATH_COMMANDS = {'mkdir', 'touch', 'cp', 'mv', 'rm', 'ln'}
+
+
+def normalize(path):
+    return os.path.normpath(path.strip())
+
+
+def paths_overlap(a, b):
+    if EVERYTHING in (a, b) or a == b:
+        return True
+    return a.startswith(b + os.sep) or b.startswith(a + os.sep)
+
+
+class StepEffects:
+    """What a step touches: paths it writes, and whether later steps must wait for it."""
+
+    def __init__(self, writes=(), barrier=False):
+        self.writes = set(writes)
+        self.barrier = barrier
+
+    def conflicts(self, other):
+        if self.barrier or other.barrier:
+            return True
+        return any(paths_overlap(a, b) for a in self.writes for b in other.writes)
+
+
+def shell_effects(command):
+    if STATEFUL_COMMAND.match(command) or '&&' in command or ';' in command:
+        return StepEffects(barrier=True)
+    install = INSTALL_COMMAND.match(command)
+    if install:
+        return StepEffects(INSTALL_TARGETS[install.group(1)])
+    try:
+        words = shlex.split(command)
+    except ValueError:
+        words = []
+    if words and words[0] in PATH_COMMANDS and '|' not in command:
+        return StepEffects(normalize(word) for word in words[1:] if not word.startswith('-'))
+    # Builds, scripts and generators may read or write anything
+    return StepEffects([EVERYTHING])
+
+
+def step_effects(cmd):
+    if cmd['type'] in ('explanation', 'requires_restart'):
+        return StepEffects()
+    if cmd['type'] == 'shell':
+        return shell_effects(cmd.get('command', ''))
+    if cmd['type'] == 'metadata':
+        return StepEffects(['drd.json'])
+    if cmd['type'] == 'file' and cmd.get('filename'):
+        return StepEffects([normalize(cmd['filename'])])
+    return StepEffects(barrier=True)
+
+
+def runs_in_background(cmd, effects):
+    """Whether a step may run on a worker thread while later steps start.
+
+    Only shell steps without side effects on the executor qualify. File
+    steps stay on the main thread: every CREATE and UPDATE shows a preview
+    and asks for confirmation, which cannot interleave with other prompts,
+    and its metadata update goes through the shared manager. They still
+    overlap with installs and builds running in the background.
+    """
+    return cmd['type'] == 'shell' and not effects.barrier
+
+
+def explicit_dependencies(cmd):
+    """Step numbers listed in <depends_on>, e.g. "1, 3"."""
+    return {int(number) for number in re.findall(r'\d+', cmd.get('depends_on') or '')}
+
+
+class StepPlanner:
+    """Builds the dependency graph of a step list as steps are added.
+
+    A step depends on every earlier step it conflicts with: one touching an
+    overlapping path (a file step and a shell step mentioning its directory,
+    two installs with the same package manager), any step changing the
+    directory or environment (cd, source, export), and the steps named in its
+    <depends_on> tag, counted from 1 over the <step> elements. Shell commands
+    with unknown effects conflict with everything, so they stay in order.
+    """
+
+    def __init__(self):
+        self.effects = []
+        # Position in the plan of each <step>, for <depends_on>
+        self.step_positions = []
+
+    def add(self, cmd):
+        """Record cmd; return the positions of the earlier commands it waits for."""
+        effects = step_effects(cmd)
+        dependencies = {index for index, earlier in enumerate(self.effects)
+                        if earlier.conflicts(effects)}
+        for number in explicit_dependencies(cmd):
+            if 0 < number <= len(self.step_positions):
+                dependencies.add(self.step_positions[number - 1])
+        if cmd['type'] not in ('explanation', 'requires_restart'):
+            self.step_positions.append(len(self.effects))
+        self.effects.append(effects)
+        return sorted(dependencies), effects
@@ -0,0 +1,59 @@
+import os
+
+# Small files are described several to a prompt so the project context that
+# precedes them is sent once per batch instead of once per file.
+METADATA_BATCH_TOKENS = int(os.getenv('DRAVID_METADATA_BATCH_TOKENS', '8000'))
+SMALL_FILE_TOKENS = int(os.getenv('DRAVID_SMALL_FILE_TOKENS', '1000'))
+MAX_FILES_PER_BATCH = int(os.getenv('DRAVID_MAX_FILES_PER_BATCH', '20'))
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Rough token count; good enough for packing prompts, not for billing."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_file_tokens(path):
+    return os.path.getsize(path) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(items, size_of, max_tokens=None, max_files=None):
+    """Split items into groups for one LLM call each.
+
+    Items estimated above SMALL_FILE_TOKENS always get a group of their own;
+    the rest are packed, in order, until the next one would exceed max_tokens
+    or max_files.
+    """
+    return list(iter_batches(items, size_of, max_tokens, max_files))
+
+
+def iter_batches(items, size_of, max_tokens=None, max_files=None):
+    """Lazy pack_batches: groups are yielded as soon as they are complete."""
+    max_tokens = max_tokens or METADATA_BATCH_TOKENS
+    max_files = max_files or MAX_FILES_PER_BATCH
+    current = []
+    current_tokens = 0
+    for item in items:
+        tokens = size_of(item)
+        if tokens > SMALL_FILE_TOKENS:
+            yield [item]
+            continue
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_files):
+            yield current
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        yield current
+
+
+def split_batch_response(root):
+    """Map each <metadata> block of a batch response to its <path>."""
+    results = {}
+    for metadata in root.findall('.//metadata'):
+        path = metadata.find('path')
+        if path is not None and path.text:
+            results[os.path.normpath(path.text.strip())] = metadata
+    return results
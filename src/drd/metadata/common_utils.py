@@ -1,75 +1,36 @@
 import os
-import re
 from ..api.main import call_dravid_api_with_pagination
 from ..utils.parser import extract_and_parse_xml
 from ..prompts.file_metada_desc_prompts import get_file_metadata_prompt
 from ..prompts.metadata_update_prompts import get_file_suggestion_prompt
 from ..utils import print_info, print_error
+from .ignore import IgnoreMatcher
+from .scanner import scan_project
 
 
 def parse_gitignore(gitignore_path):
-    ignore_patterns = []
+    """Matcher for the rules of a single .gitignore, without the default patterns."""
+    ignore_patterns = IgnoreMatcher(default_patterns=())
     if os.path.exists(gitignore_path):
-        with open(gitignore_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    pattern = line.replace('.', r'\.').replace(
-                        '*', '.*').replace('?', '.')
-                    if pattern.startswith('/'):
-                        pattern = '^' + pattern[1:]
-                    elif pattern.endswith('/'):
-                        pattern += '.*'
-                    else:
-                        pattern = '.*' + pattern
-                    try:
-                        ignore_patterns.append(re.compile(pattern))
-                        # Debug print
-                        print(
-                            f"ignoring file pattern part of gitignore: {pattern}")
-                    except re.error as e:
-                        # Debug print
-                        print(f"Error compiling pattern '{pattern}': {e}")
-    print(f"Total patterns: {len(ignore_patterns)}")  # Debug print
+        ignore_patterns.add_gitignore(gitignore_path)
     return ignore_patterns
 
 
-def should_ignore(path, ignore_patterns):
-    return any(pattern.search(path) for pattern in ignore_patterns)
+def should_ignore(path, ignore_patterns, is_dir=False):
+    return ignore_patterns.is_ignored(path, is_dir)
 
 
-def get_folder_structure(start_path, ignore_patterns):
-    structure = []
-    for root, dirs, files in os.walk(start_path):
-        level = root.replace(start_path, '').count(os.sep)
-        indent = ' ' * 4 * level
-        folder_name = os.path.basename(root)
-        rel_path = os.path.relpath(root, start_path)
-        rel_path = '' if rel_path == '.' else rel_path
-        if not should_ignore(rel_path, ignore_patterns):
-            structure.append(f"{indent}{folder_name}/")
-            sub_indent = ' ' * 4 * (level + 1)
-            for file in files:
-                file_path = os.path.join(rel_path, file)
-                if not should_ignore(file_path, ignore_patterns):
-                    structure.append(f"{sub_indent}{file}")
-        dirs[:] = [d for d in dirs if not should_ignore(
-            os.path.join(rel_path, d), ignore_patterns)]
-    return '\n'.join(structure)
+def get_folder_structure(start_path, ignore_patterns=None):
+    return scan_project(start_path, ignore_patterns).folder_structure
 
 
 def get_ignore_patterns(current_dir):
+    ignore_patterns = IgnoreMatcher()
     gitignore_path = os.path.join(current_dir, '.gitignore')
     if os.path.exists(gitignore_path):
-        ignore_patterns = parse_gitignore(gitignore_path)
-        ignore_patterns.append(re.compile('.git'))
+        ignore_patterns.add_gitignore(gitignore_path)
         return ignore_patterns, "Using .gitignore patterns for file exclusion."
-    else:
-        default_patterns = ['node_modules', 'dist',
-                            'build', 'venv', '.git', '__pycache__']
-        ignore_patterns = [re.compile(f'.*{pattern}.*')
-                           for pattern in default_patterns]
-        return ignore_patterns, "No .gitignore found. Using default ignore patterns."
+    return ignore_patterns, "No .gitignore found. Using default ignore patterns."
 
 
 def generate_file_description(filename, content, project_context, folder_structure):
@@ -107,7 +68,8 @@ def generate_file_description(filename, content, project_context, folder_structu
         return "unknown", f"Error generating description: {str(e)}", ""
 
 
-def find_file_with_dravid(filename, project_context, folder_structure, max_retries=2, current_retry=0):
+def find_file_with_dravid(filename, project_context, folder_structure, max_retries=2, current_retry=0,
+                          metadata_manager=None):
     if os.path.exists(filename):
         return filename
 
@@ -115,6 +77,12 @@ def find_file_with_dravid(filename, project_context, folder_structure, max_retri
         print_error(f"File not found after {max_retries} retries: {filename}")
         return None
 
+    if metadata_manager is not None:
+        resolved = metadata_manager.resolve_file(filename)
+        if resolved:
+            print_info(f"Resolved {filename} to {resolved}")
+            return resolved
+
     query = get_file_suggestion_prompt(
         filename, project_context, folder_structure)
     response = call_dravid_api_with_pagination(query, include_context=True)
@@ -125,7 +93,8 @@ def find_file_with_dravid(filename, project_context, folder_structure, max_retri
         if suggested_file and suggested_file.strip():
             print_info(
                 f"Dravid suggested an alternative file: {suggested_file}")
-            return find_file_with_dravid(suggested_file.strip(), project_context, folder_structure, max_retries, current_retry + 1)
+            return find_file_with_dravid(suggested_file.strip(), project_context, folder_structure, max_retries, current_retry + 1,
+                                         metadata_manager)
         else:
             print_info("Dravid couldn't suggest an alternative file.")
             return None
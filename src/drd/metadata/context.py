@@ -0,0 +1,169 @@
+import os
+import re
+import json
+from .batching import estimate_tokens
+
+# Upper bound for the project context pasted into prompts
+CONTEXT_TOKENS = int(os.getenv('DRAVID_CONTEXT_TOKENS', '8000'))
+
+LEGEND = ("files maps each directory to its file names; details maps a file path to "
+          "t=type, s=summary, e=exports, i=imports")
+# Metadata kept per file that only matters for incremental re-analysis
+INTERNAL_FIELDS = {'hash', 'size', 'mtime', 'analysis'}
+ENTRY_KEYS = {'type': 't', 'summary': 's', 'exports': 'e', 'imports': 'i'}
+# Section fields that change on every save; left out so that prompts, and the
+# response cache keys derived from them, stay the same for unchanged projects
+VOLATILE_FIELDS = {'last_updated'}
+
+WORD = re.compile(r'[a-z0-9]+')
+CAMEL_CASE = re.compile(r'([a-z0-9])([A-Z])')
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'into', 'file', 'files',
+    'add', 'make', 'use', 'can', 'should', 'please', 'all', 'new', 'are', 'not'
+}
+PATH_WEIGHT = 3
+EXPORT_WEIGHT = 2
+SUMMARY_WEIGHT = 1
+MAX_RENDERED = 32
+# Smallest serialized file detail; bounds the rows a budget can use
+MIN_DETAIL_TOKENS = 10
+
+
+def compact(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def tokenize(text):
+    """Lower-case words of text, with camelCase and snake_case split apart."""
+    text = CAMEL_CASE.sub(r'\1 \2', str(text or '')).lower()
+    return [word for word in WORD.findall(text)
+            if len(word) > 2 and word not in STOPWORDS]
+
+
+def words(text):
+    return set(tokenize(text))
+
+
+def stable_section(value):
+    if isinstance(value, dict):
+        return {key: item for key, item in value.items() if key not in VOLATILE_FIELDS}
+    return value
+
+
+def compact_entry(entry):
+    """A key_files entry with abbreviated keys and without empty or internal fields."""
+    result = {}
+    for key, value in entry.items():
+        if key == 'path' or key in INTERNAL_FIELDS or value in (None, '', []):
+            continue
+        result[ENTRY_KEYS.get(key, key)] = value
+    return result
+
+
+class ContextFile:
+    def __init__(self, entry):
+        self.path = entry['path']
+        self.serialized = f"{compact(self.path)}:{compact(compact_entry(entry))}"
+        self.tokens = estimate_tokens(self.serialized)
+        exports = ' '.join(str(name).split(':')[-1] for name in entry.get('exports') or [])
+        self.keywords = {}
+        for weight, text in ((SUMMARY_WEIGHT, entry.get('summary')),
+                             (EXPORT_WEIGHT, exports),
+                             (PATH_WEIGHT, self.path.replace(os.sep, ' '))):
+            for word in words(text):
+                self.keywords[word] = weight
+
+    def score(self, query_words):
+        return sum(self.keywords.get(word, 0) for word in query_words)
+
+
+class ProjectContext:
+    """Compact prompt serialization of one version of the project metadata.
+
+    Everything that does not depend on the query is serialized once here;
+    render() then only picks which file details fit the token budget.
+    """
+
+    def __init__(self, metadata, listing=None):
+        self.header = ','.join(
+            [f'"legend":{compact(LEGEND)}'] +
+            [f"{compact(name)}:{compact(stable_section(value))}"
+             for name, value in metadata.items() if name != 'key_files'])
+        self.files = [ContextFile(entry) for entry in sorted(
+            metadata.get('key_files', []), key=lambda entry: entry['path'])]
+        if listing is None:
+            listing = [context_file.path for context_file in self.files]
+        directories = {}
+        for path in sorted(listing):
+            directory, name = os.path.split(path)
+            directories.setdefault(directory or '.', []).append(name)
+        self.directories = [
+            (directory, f"{compact(directory)}:{compact(names)}",
+             f'{compact(directory)}:"{len(names)} files"')
+            for directory, names in directories.items()]
+        self._rendered = {}
+
+    @classmethod
+    def from_store(cls, store, query=None, max_tokens=None, paths=None):
+        """Context from a SQLite store, loading only the entries that may be detailed.
+
+        Every path is listed, but only the given paths, or the best matches
+        for the query as many as max_tokens could hold, are read in full.
+        """
+        if paths is None:
+            limit = (max_tokens or CONTEXT_TOKENS) // MIN_DETAIL_TOKENS
+            paths = store.rank_paths(
+                words(query), limit, (PATH_WEIGHT, EXPORT_WEIGHT, SUMMARY_WEIGHT))
+        metadata = dict(store.get_sections(), key_files=store.get_files_by_path(paths))
+        return cls(metadata, listing=store.list_paths())
+
+    def render(self, query=None, max_tokens=None, paths=None):
+        """Serialize within max_tokens; with paths, only those files are detailed."""
+        key = (query, max_tokens, tuple(paths) if paths is not None else None)
+        if key not in self._rendered:
+            if len(self._rendered) >= MAX_RENDERED:
+                self._rendered.clear()
+            self._rendered[key] = self._render(query, max_tokens or CONTEXT_TOKENS, paths)
+        return self._rendered[key]
+
+    def _render(self, query, max_tokens, paths=None):
+        query_words = words(query)
+        if paths is not None:
+            # Already ranked by the caller
+            by_path = {f.path: f for f in self.files}
+            ranked = [by_path[path] for path in paths if path in by_path]
+            scores = {f.path: len(ranked) - i for i, f in enumerate(ranked)}
+        else:
+            scores = {f.path: f.score(query_words) for f in self.files} if query_words else {}
+            # Relevant files first, best match first; the rest in path order
+            ranked = sorted(self.files, key=lambda f: -scores.get(f.path, 0))
+        relevant_dirs = {os.path.dirname(f.path) or '.'
+                         for f in ranked if scores.get(f.path)}
+
+        budget = max_tokens - estimate_tokens(self.header)
+        # The file listing may take at most half of what is left; directories
+        # without relevant files are collapsed to a count when it does not fit
+        listing_budget = budget // 2
+        order = sorted(range(len(self.directories)),
+                       key=lambda i: self.directories[i][0] not in relevant_dirs)
+        chosen = {}
+        for i in order:
+            directory, full, collapsed = self.directories[i]
+            tokens = estimate_tokens(full)
+            if tokens > listing_budget:
+                full, tokens = collapsed, estimate_tokens(collapsed)
+            chosen[i] = full
+            listing_budget -= tokens
+            budget -= tokens
+        listing = [chosen[i] for i in range(len(self.directories))]
+
+        details = []
+        for context_file in ranked:
+            if context_file.tokens > budget:
+                continue
+            details.append(context_file.serialized)
+            budget -= context_file.tokens
+
+        return ('{' + self.header +
+                ',"files":{' + ','.join(listing) + '}'
+                ',"details":{' + ','.join(details) + '}}')
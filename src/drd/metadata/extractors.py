@@ -0,0 +1,204 @@
+import os
+import re
+import ast
+import json
+
+# Extension -> extractor. Each extractor takes (path, content, project_files) and
+# returns a dict with 'type', 'exports' and 'imports' (and optionally
+# 'external_dependencies' and 'summary'), or None when it cannot make sense of
+# the file. project_files is the set of project-relative paths, or None when
+# the caller does not know them.
+EXTRACTORS = {}
+
+# Directories absolute Python imports are resolved from, besides the importing file's own
+PYTHON_SOURCE_ROOTS = ('', 'src', 'lib')
+
+# Files whose type is known from the extension but that have no exports/imports
+DATA_FILE_TYPES = {
+    '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.toml': 'toml',
+    '.ini': 'ini', '.cfg': 'ini', '.txt': 'text', '.csv': 'csv', '.xml': 'xml',
+    '.html': 'html', '.css': 'css', '.scss': 'scss', '.sql': 'sql', '.sh': 'shell'
+}
+
+
+def register_extractor(*extensions):
+    def decorator(func):
+        for extension in extensions:
+            EXTRACTORS[extension.lower()] = func
+        return func
+    return decorator
+
+
+def get_extractor(path):
+    name = os.path.basename(path).lower()
+    if name in EXTRACTORS:
+        return EXTRACTORS[name]
+    return EXTRACTORS.get(os.path.splitext(name)[1])
+
+
+def extract_file_info(path, content, project_files=None):
+    """Pull type, exports and imports out of a file without calling the LLM.
+
+    With project_files, imports are limited to the project's own modules.
+    Returns None when no extractor is registered for the file or it failed,
+    in which case the caller should fall back to the LLM.
+    """
+    extractor = get_extractor(path)
+    if extractor is None:
+        return None
+    try:
+        return extractor(path, content, project_files)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+
+
+def guess_file_type(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in DATA_FILE_TYPES:
+        return DATA_FILE_TYPES[extension]
+    return extension.lstrip('.') or 'unknown'
+
+
+def python_module_in_project(path, module, project_files):
+    """Whether an absolute import names a module of the project.
+
+    The module is looked up from the project root, the usual source roots
+    and the importing file's directory, as a module or a package.
+    """
+    base = module.replace('.', '/')
+    directory = os.path.dirname(path).replace(os.sep, '/')
+    for root in PYTHON_SOURCE_ROOTS + (directory,):
+        for candidate in (f'{base}.py', f'{base}.pyi', f'{base}/__init__.py'):
+            if (f'{root}/{candidate}' if root else candidate) in project_files:
+                return True
+    return False
+
+
+@register_extractor('.py', '.pyi')
+def extract_python(path, content, project_files=None):
+    tree = ast.parse(content)
+    exports = []
+    explicit = None
+    imports = []
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            exports.append(f"fun:{node.name}")
+        elif isinstance(node, ast.ClassDef):
+            exports.append(f"class:{node.name}")
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                if target.id == '__all__' and isinstance(node.value, (ast.List, ast.Tuple)):
+                    explicit = [elt.value for elt in node.value.elts
+                                if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+                else:
+                    exports.append(f"var:{target.id}")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append('.' * node.level + (node.module or ''))
+
+    if project_files is not None:
+        # Relative imports are always the project's; the standard library and
+        # installed packages are left to external_dependencies
+        imports = [name for name in imports if name.startswith('.')
+                   or python_module_in_project(path, name, project_files)]
+
+    if explicit is not None:
+        kinds = {name.split(':', 1)[1]: name for name in exports}
+        exports = [kinds.get(name, f"var:{name}") for name in explicit]
+    else:
+        exports = [name for name in exports if not name.split(':', 1)[1].startswith('_')]
+
+    info = {'type': 'python', 'exports': exports, 'imports': unique(imports)}
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        info['summary'] = docstring.strip().splitlines()[0]
+    return info
+
+
+JS_EXPORT_PATTERNS = [
+    (re.compile(r'^\s*export\s+(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)', re.M), 'fun'),
+    (re.compile(r'^\s*export\s+(?:default\s+)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)', re.M), 'class'),
+    (re.compile(r'^\s*export\s+(?:const|let|var)\s+([A-Za-z_$][\w$]*)', re.M), 'var'),
+    (re.compile(r'^\s*export\s+(?:declare\s+)?(?:interface|type|enum)\s+([A-Za-z_$][\w$]*)', re.M), 'type'),
+]
+JS_EXPORT_LIST = re.compile(r'^\s*export\s*(?:type\s*)?\{([^}]*)\}', re.M)
+JS_EXPORT_DEFAULT = re.compile(r'^\s*export\s+default\s+(?!async\b|function\b|class\b|abstract\b)([A-Za-z_$][\w$]*)', re.M)
+JS_COMMONJS_EXPORT = re.compile(r'^\s*(?:module\.)?exports\.([A-Za-z_$][\w$]*)\s*=', re.M)
+JS_IMPORTS = re.compile(
+    r'''(?:^\s*import\s+(?:[^'"]*?\s+from\s+)?|^\s*export\s+[^'"]*?\s+from\s+|\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"]+)['"]''', re.M)
+
+
+@register_extractor('.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx')
+def extract_javascript(path, content, project_files=None):
+    extension = os.path.splitext(path)[1].lower()
+    exports = []
+    for pattern, kind in JS_EXPORT_PATTERNS:
+        exports.extend(f"{kind}:{name}" for name in pattern.findall(content))
+    for names in JS_EXPORT_LIST.findall(content):
+        for name in names.split(','):
+            name = name.strip().split(' as ')[-1].strip()
+            if name:
+                exports.append(f"var:{name}")
+    exports.extend(f"var:{name}" for name in JS_EXPORT_DEFAULT.findall(content))
+    exports.extend(f"var:{name}" for name in JS_COMMONJS_EXPORT.findall(content))
+
+    file_type = 'typescript' if extension in ('.ts', '.tsx') else 'javascript'
+    return {'type': file_type, 'exports': unique(exports),
+            'imports': unique(JS_IMPORTS.findall(content))}
+
+
+GO_FUNC = re.compile(r'^func\s+(?:\([^)]*\)\s*)?([A-Z]\w*)', re.M)
+GO_TYPE = re.compile(r'^type\s+([A-Z]\w*)', re.M)
+GO_IMPORT_BLOCK = re.compile(r'^import\s*\((.*?)\)', re.M | re.S)
+GO_IMPORT_LINE = re.compile(r'^import\s+(?:\w+\s+)?"([^"]+)"', re.M)
+
+
+@register_extractor('.go')
+def extract_go(path, content, project_files=None):
+    imports = GO_IMPORT_LINE.findall(content)
+    for block in GO_IMPORT_BLOCK.findall(content):
+        imports.extend(re.findall(r'"([^"]+)"', block))
+    exports = [f"fun:{name}" for name in GO_FUNC.findall(content)]
+    exports += [f"type:{name}" for name in GO_TYPE.findall(content)]
+    return {'type': 'go', 'exports': unique(exports), 'imports': unique(imports)}
+
+
+@register_extractor('package.json')
+def extract_package_json(path, content, project_files=None):
+    package = json.loads(content)
+    dependencies = []
+    for section in ('dependencies', 'devDependencies'):
+        for name, version in (package.get(section) or {}).items():
+            dependencies.append(f"{name}@{version}")
+    info = {'type': 'json', 'exports': [], 'imports': [],
+            'external_dependencies': dependencies}
+    if package.get('description'):
+        info['summary'] = package['description']
+    return info
+
+
+@register_extractor('requirements.txt')
+def extract_requirements(path, content, project_files=None):
+    dependencies = [line.split('#', 1)[0].strip() for line in content.splitlines()]
+    dependencies = [dep for dep in dependencies if dep and not dep.startswith('-')]
+    return {'type': 'text', 'exports': [], 'imports': [],
+            'external_dependencies': dependencies}
+
+
+def extract_data_file(path, content, project_files=None):
+    return {'type': guess_file_type(path), 'exports': [], 'imports': []}
+
+
+for _extension in DATA_FILE_TYPES:
+    EXTRACTORS.setdefault(_extension, extract_data_file)
+
+
+def unique(items):
+    return list(dict.fromkeys(items))
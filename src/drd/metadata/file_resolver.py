@@ -0,0 +1,103 @@
+import os
+import difflib
+
+# Matches below this confidence are left to the LLM
+RESOLVE_CONFIDENCE = float(os.getenv('DRAVID_RESOLVE_CONFIDENCE', '0.8'))
+FUZZY_CUTOFF = 0.6
+
+EXACT = 1.0
+CASE_INSENSITIVE = 0.95
+BASENAME = 0.9
+SYMBOL = 0.85
+# Several candidates matched equally well
+AMBIGUOUS = 0.5
+
+
+def normalize_reference(reference, project_dir=None):
+    reference = reference.strip().strip('\'"`')
+    if project_dir and os.path.isabs(reference):
+        reference = os.path.relpath(reference, project_dir)
+    return os.path.normpath(reference) if reference else reference
+
+
+def common_suffix_length(path, reference):
+    """Number of trailing path components path and reference share."""
+    count = 0
+    for a, b in zip(reversed(path.lower().split(os.sep)), reversed(reference.lower().split(os.sep))):
+        if a != b:
+            break
+        count += 1
+    return count
+
+
+class FileResolver:
+    """Resolves a possibly misspelled or moved file reference to a project path.
+
+    Built from the project's file list and the exports recorded in key_files;
+    resolve() tries exact, case-insensitive, basename, exported-symbol and
+    fuzzy matches, in that order, and reports how confident the match is.
+    """
+
+    def __init__(self, paths, symbols=None):
+        self.paths = set(paths)
+        self.by_lower = {}
+        self.by_basename = {}
+        for path in sorted(self.paths):
+            basename = os.path.basename(path).lower()
+            self.by_lower.setdefault(path.lower(), []).append(path)
+            self.by_basename.setdefault(basename, []).append(path)
+        self.symbols = {}
+        for name, path in symbols or []:
+            self.symbols.setdefault(name.lower(), set()).add(path)
+
+    @classmethod
+    def from_project(cls, files, key_files):
+        paths = set(files) | {entry['path'] for entry in key_files}
+        symbols = [(str(name).split(':')[-1].strip(), entry['path'])
+                   for entry in key_files for name in entry.get('exports') or []
+                   if str(name).strip()]
+        return cls(paths, symbols)
+
+    def _best(self, candidates, reference, confidence):
+        """Pick among candidates by shared trailing directories; ties are ambiguous."""
+        candidates = sorted(candidates)
+        if len(candidates) == 1:
+            return candidates[0], confidence
+        ranked = sorted(candidates, key=lambda p: -common_suffix_length(p, reference))
+        if common_suffix_length(ranked[0], reference) > common_suffix_length(ranked[1], reference):
+            return ranked[0], confidence
+        return ranked[0], AMBIGUOUS
+
+    def resolve(self, reference):
+        """Return (path, confidence); path is None when nothing matched."""
+        if not reference:
+            return None, 0.0
+        if reference in self.paths:
+            return reference, EXACT
+        lower = reference.lower()
+        if lower in self.by_lower:
+            return self._best(self.by_lower[lower], reference, CASE_INSENSITIVE)
+
+        basename = os.path.basename(lower)
+        if basename in self.by_basename:
+            return self._best(self.by_basename[basename], reference, BASENAME)
+
+        stem = os.path.splitext(basename)[0]
+        if stem in self.symbols:
+            return self._best(self.symbols[stem], reference, SYMBOL)
+
+        return self._fuzzy(lower, basename)
+
+    def _fuzzy(self, lower, basename):
+        matches = difflib.get_close_matches(
+            basename, list(self.by_basename), n=2, cutoff=FUZZY_CUTOFF)
+        if not matches:
+            return None, 0.0
+        ratio = difflib.SequenceMatcher(None, basename, matches[0]).ratio()
+        candidates = self.by_basename[matches[0]]
+        if len(matches) > 1:
+            runner_up = difflib.SequenceMatcher(None, basename, matches[1]).ratio()
+            if runner_up == ratio:
+                return sorted(candidates)[0], AMBIGUOUS
+        path, confidence = self._best(candidates, lower, ratio * BASENAME)
+        return path, min(confidence, ratio * BASENAME)
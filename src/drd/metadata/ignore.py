@@ -0,0 +1,214 @@
+import os
+import re
+from ..utils.utils import print_warning
+
+# Written in .gitignore syntax and applied below every project's own rules
+DEFAULT_IGNORE_PATTERNS = [
+    '.git/', 'node_modules/', 'dist/', 'build/', '__pycache__/', '.venv/', 'venv/',
+    '.idea/', '.vscode/', '/.drd/', '/drd.json', '/drd.journal.jsonl',
+    '/drd.index.json', '.drd.json.*.tmp', '.drd.index.*.tmp'
+]
+
+
+class IgnoreRule:
+    def __init__(self, pattern, regex, negated, dir_only):
+        self.pattern = pattern
+        self.regex = regex
+        self.negated = negated
+        self.dir_only = dir_only
+
+    def matches(self, rel_path, is_dir=False):
+        return re.match(self.regex, rel_path + '/' if is_dir else rel_path) is not None
+
+
+def translate_pattern(line):
+    """Turn one .gitignore line into an IgnoreRule, or None for blanks and comments.
+
+    The regex is matched against paths relative to the .gitignore's directory,
+    with a trailing '/' appended for directories.
+    """
+    line = line.rstrip('\n')
+    if line.startswith('#'):
+        return None
+    line = re.sub(r'(?<!\\)\s+$', '', line)
+    if not line:
+        return None
+
+    pattern = line
+    negated = False
+    if line.startswith('!'):
+        negated = True
+        line = line[1:]
+    elif line.startswith(('\\!', '\\#')):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+    anchored = '/' in line
+    line = line.lstrip('/')
+
+    regex = ''
+    i = 0
+    n = len(line)
+    while i < n:
+        if line.startswith('**', i) and (i == 0 or line[i - 1] == '/') and (i + 2 == n or line[i + 2] == '/'):
+            if i + 2 == n:
+                # Trailing "/**" matches everything inside, but not the directory itself
+                regex += '.+' if i > 0 else '.*'
+                i += 2
+            else:
+                regex += '(?:.*/)?'
+                i += 3
+            continue
+        c = line[i]
+        if c == '*':
+            regex += '[^/]*'
+        elif c == '?':
+            regex += '[^/]'
+        elif c == '[':
+            j = i + 1
+            if j < n and line[j] in '!^':
+                j += 1
+            if j < n and line[j] == ']':
+                j += 1
+            while j < n and line[j] != ']':
+                j += 1
+            if j >= n:
+                regex += re.escape(c)
+            else:
+                content = line[i + 1:j].replace('\\', '\\\\')
+                if content.startswith('!'):
+                    content = '^' + content[1:]
+                regex += f"[{content}]"
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            regex += re.escape(line[i])
+        else:
+            regex += re.escape(c)
+        i += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    suffix = '/' if dir_only else '/?'
+    return IgnoreRule(pattern, f"{prefix}{regex}{suffix}$", negated, dir_only)
+
+
+class IgnoreRuleSet:
+    """Rules from a single .gitignore, compiled into a few alternation regexes.
+
+    Consecutive rules with the same polarity share one regex; runs are checked
+    from last to first so the last matching rule wins, as in git.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = list(rules or [])
+        self._runs = None
+
+    def add(self, rule):
+        self.rules.append(rule)
+        self._runs = None
+
+    def _compile(self):
+        runs = []
+        for rule in self.rules:
+            if runs and runs[-1][0] == rule.negated:
+                runs[-1][1].append(rule.regex)
+            else:
+                runs.append((rule.negated, [rule.regex]))
+        self._runs = [(negated, re.compile('(?:' + '|'.join(regexes) + ')'))
+                      for negated, regexes in runs]
+
+    def match(self, rel_path, is_dir=False):
+        """Return True (ignored), False (re-included) or None (no rule applies)."""
+        if self._runs is None:
+            self._compile()
+        subject = rel_path + '/' if is_dir else rel_path
+        for negated, regex in reversed(self._runs):
+            if regex.match(subject):
+                return not negated
+        return None
+
+
+class IgnoreMatcher:
+    """Ignore engine following git's rules for nested .gitignore files.
+
+    Rules from a deeper .gitignore take precedence over shallower ones, default
+    patterns have the lowest priority, and nothing below an ignored directory
+    can be re-included. Decisions for directories are cached.
+    """
+
+    def __init__(self, default_patterns=DEFAULT_IGNORE_PATTERNS):
+        self.defaults = IgnoreRuleSet(
+            rule for rule in map(translate_pattern, default_patterns) if rule)
+        self.scopes = {}
+        self.gitignore_files = []
+        self._dir_cache = {}
+
+    @staticmethod
+    def _normalize(path):
+        path = path.replace(os.sep, '/').strip('/')
+        return '' if path == '.' else path
+
+    def add_patterns(self, lines, base=''):
+        base = self._normalize(base)
+        rule_set = self.scopes.setdefault(base, IgnoreRuleSet())
+        for line in lines:
+            rule = translate_pattern(line)
+            if rule:
+                rule_set.add(rule)
+        self._invalidate(base)
+
+    def add_gitignore(self, gitignore_path, base=''):
+        if gitignore_path in self.gitignore_files:
+            return
+        try:
+            with open(gitignore_path, 'r') as f:
+                lines = f.readlines()
+        except OSError as e:
+            print_warning(f"Could not read {gitignore_path}: {str(e)}")
+            return
+        self.gitignore_files.append(gitignore_path)
+        self.add_patterns(lines, base)
+
+    def _invalidate(self, base):
+        if not base:
+            self._dir_cache.clear()
+            return
+        prefix = base + '/'
+        for path in [p for p in self._dir_cache if p == base or p.startswith(prefix)]:
+            del self._dir_cache[path]
+
+    def _match(self, rel_path, is_dir):
+        parts = rel_path.split('/')
+        # Deepest .gitignore first; the first one with an opinion decides
+        for depth in range(len(parts) - 1, -1, -1):
+            base = '/'.join(parts[:depth])
+            rule_set = self.scopes.get(base)
+            if rule_set is None:
+                continue
+            decision = rule_set.match('/'.join(parts[depth:]), is_dir)
+            if decision is not None:
+                return decision
+        return bool(self.defaults.match(rel_path, is_dir))
+
+    def _is_dir_ignored(self, rel_dir):
+        cached = self._dir_cache.get(rel_dir)
+        if cached is None:
+            parent = rel_dir.rpartition('/')[0]
+            cached = (bool(parent) and self._is_dir_ignored(parent)) or self._match(rel_dir, True)
+            self._dir_cache[rel_dir] = cached
+        return cached
+
+    def is_ignored(self, rel_path, is_dir=False):
+        rel_path = self._normalize(rel_path)
+        if not rel_path:
+            return False
+        if is_dir:
+            return self._is_dir_ignored(rel_path)
+        parent = rel_path.rpartition('/')[0]
+        if parent and self._is_dir_ignored(parent):
+            return True
+        return self._match(rel_path, False)
@@ -1,25 +1,16 @@
 import os
 import json
-import asyncio
 from datetime import datetime
 from .project_metadata import ProjectMetadataManager
 from ..utils.utils import print_info, print_success, print_error, print_warning
 from ..utils.loader import Loader
 from ..api.main import call_dravid_api_with_pagination
+from ..api.async_client import run_async
 from ..utils.parser import extract_and_parse_xml
 from ..prompts.get_project_info_prompts import get_project_info_prompt
 
 
-async def initialize_project_metadata(project_dir):
-    print_info("Initializing project metadata...")
-    builder = ProjectMetadataManager(project_dir)
-
-    # Get folder structure
-    folder_structure = builder.get_directory_structure(project_dir)
-    print_info("Current folder structure:")
-    print_info(json.dumps(folder_structure, indent=2))
-
-    # Get project info
+def fetch_project_info(builder, folder_structure):
     print_info("Fetching project information...")
     query = get_project_info_prompt(json.dumps(folder_structure, indent=2))
     loader = Loader("Analyzing project structure")
@@ -59,19 +50,50 @@ async def initialize_project_metadata(project_dir):
     finally:
         loader.stop()
 
+
+async def initialize_project_metadata(project_dir, fast=False, resume=False):
+    print_info("Initializing project metadata...")
+    builder = ProjectMetadataManager(project_dir)
+    if resume and builder.journal.exists():
+        print_info("Resuming from the previous run's checkpoint...")
+    else:
+        resume = False
+        builder.journal.clear()
+
+    # Get folder structure
+    folder_structure = builder.get_directory_structure(project_dir)
+    print_info("Current folder structure:")
+    print_info(json.dumps(folder_structure, indent=2))
+
+    # Get project info
+    if fast:
+        print_info("Fast mode: skipping LLM calls, metadata is extracted locally.")
+    elif resume and builder.journal.load()[0]:
+        print_info("Using project information from the checkpoint.")
+    else:
+        fetch_project_info(builder, folder_structure)
+        builder.journal.record_sections({
+            name: builder.metadata[name]
+            for name in ('project_info', 'environment', 'dev_server', 'directory_structure')})
+
     # Build metadata
     print_info("Analyzing project files...")
     loader = Loader("Processing files")
     loader.start()
     try:
-        metadata = await builder.build_metadata(loader)
+        metadata = await builder.build_metadata(loader, fast=fast, checkpoint=True)
+    except BaseException:
+        builder.journal.close()
+        print_warning(
+            "Metadata initialization stopped. Run 'drd --meta-init --resume' to continue where it left off.")
+        raise
     finally:
         loader.stop()
 
     # Save metadata to drd.json
     drd_path = os.path.join(project_dir, 'drd.json')
-    with open(drd_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    builder.save_metadata()
+    builder.journal.clear()
 
     print_success(
         f"Project metadata initialized successfully. Saved to {drd_path}")
@@ -82,4 +104,4 @@ async def initialize_project_metadata(project_dir):
 
 
 def initialize_project_metadata_sync(current_dir):
-    asyncio.run(initialize_project_metadata(current_dir))
+    run_async(initialize_project_metadata(current_dir))
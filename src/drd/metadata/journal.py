@@ -0,0 +1,60 @@
+import os
+import json
+
+
+class MetadataJournal:
+    """Append-only checkpoint log of a running meta-init, kept next to drd.json.
+
+    Each line is a JSON record: either a finished key_files entry or a set of
+    top-level sections (project_info, environment, ...). Lines are flushed as
+    they are written, so an interrupted run loses at most the file in progress
+    and other processes can read the partial results.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _write(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def record_file(self, entry):
+        self._write({'kind': 'file', 'entry': entry})
+
+    def record_sections(self, sections):
+        self._write({'kind': 'sections', 'sections': sections})
+
+    def load(self):
+        """Return (sections, entries by path); later records win."""
+        sections = {}
+        entries = {}
+        if not self.exists():
+            return sections, entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                if record.get('kind') == 'file':
+                    entries[record['entry']['path']] = record['entry']
+                elif record.get('kind') == 'sections':
+                    sections.update(record['sections'])
+        return sections, entries
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self):
+        self.close()
+        if self.exists():
+            os.remove(self.path)
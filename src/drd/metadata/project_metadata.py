@@ -1,28 +1,99 @@
 import os
 import json
+import tempfile
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-import fnmatch
 import xml.etree.ElementTree as ET
 import mimetypes
-from ..prompts.file_metada_desc_prompts import get_file_metadata_prompt
-from ..api import call_dravid_api_with_pagination
+from ..prompts.file_metada_desc_prompts import get_file_metadata_prompt, get_file_summary_prompt, get_files_metadata_prompt
+from ..api import async_call_dravid_api_with_pagination
+from ..api.main import get_cached_response
+from .rate_limit_handler import get_rate_limiter, run_worker_pool
+from .scanner import scan_project
+from .ignore import IgnoreMatcher
+from .sqlite_store import SqliteMetadataStore
+from .journal import MetadataJournal
+from .context import ProjectContext
+from .search_index import SearchIndex, FILE_CANDIDATES
+from .file_resolver import FileResolver, RESOLVE_CONFIDENCE, normalize_reference
+from .extractors import extract_file_info, guess_file_type
+from .sniffing import read_head, looks_binary, generated_reason, read_for_analysis
+from .batching import pack_batches, estimate_tokens, estimate_file_tokens, split_batch_response
+from ..utils.parser import extract_and_parse_xml
 from ..utils.utils import print_info, print_warning
+from ..utils.file_utils import compute_file_hash, match_file_mode
+
+ANALYSIS_ERROR_SUMMARY = "Error occurred during analysis"
 
 
 class ProjectMetadataManager:
-    def __init__(self, project_dir):
+    def __init__(self, project_dir, backend=None):
         self.project_dir = os.path.abspath(project_dir)
 
         self.metadata_file = os.path.join(self.project_dir, 'drd.json')
-        self.metadata = self.load_metadata()
-        self.ignore_patterns = self.get_ignore_patterns()
+        self.journal = MetadataJournal(
+            os.path.join(self.project_dir, 'drd.journal.jsonl'))
+        self.search_index = SearchIndex(
+            os.path.join(self.project_dir, 'drd.index.json'))
+        self._index_key = None
+        self._resolver = None
+        self._resolver_key = None
+        self.backend = (backend or os.getenv(
+            'DRAVID_METADATA_BACKEND', 'json')).lower()
+        self.store = None
+        if self.backend == 'sqlite':
+            self.store = SqliteMetadataStore(
+                os.path.join(self.project_dir, '.drd', 'metadata.db'))
+        self._store_ready = False
+        # Loaded on first access, so constructing a manager reads nothing
+        self._metadata = None
+        self._synced_files = None
+        self._file_index = None
+        self._indexed_files = None
+        self._batch_depth = 0
+        self._dirty = False
+        self._scan = None
+        self._project_files = None
+        self._project_files_scan = None
+        # Bumped on every change so the prompt context is only rebuilt when needed
+        self._version = 0
+        self._context = None
+        self._context_key = None
+        self._ignore_patterns = None
+        self._ignore_matcher = None
         self.binary_extensions = {
             '.pyc', '.pyo', '.so', '.dll', '.exe', '.bin'}
         self.image_extensions = {'.jpg', '.jpeg',
                                  '.png', '.gif', '.bmp', '.svg', '.ico'}
 
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = self.load_metadata()
+            self._synced_files = self._metadata['key_files']
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata):
+        self._metadata = metadata
+        self._version += 1
+
     def load_metadata(self):
-        if os.path.exists(self.metadata_file):
+        metadata = self.load_saved_metadata()
+        if self.journal.exists():
+            # An interrupted or still running meta-init has checkpointed results
+            sections, entries = self.journal.load()
+            metadata.update(sections)
+            key_files = [entries.pop(entry['path'], entry)
+                         for entry in metadata['key_files']]
+            metadata['key_files'] = key_files + list(entries.values())
+        return metadata
+
+    def load_saved_metadata(self):
+        if self.store is not None:
+            if self._prepare_store():
+                return self.store.export_metadata()
+        elif os.path.exists(self.metadata_file):
             with open(self.metadata_file, 'r') as f:
                 return json.load(f)
 
@@ -48,30 +119,155 @@ class ProjectMetadataManager:
         }
         return new_metadata
 
+    def _prepare_store(self):
+        """Seed an empty SQLite store from drd.json; True once it holds metadata."""
+        if not self._store_ready:
+            if self.store.is_empty() and os.path.exists(self.metadata_file):
+                with open(self.metadata_file, 'r') as f:
+                    self.store.import_metadata(json.load(f))
+            self._store_ready = not self.store.is_empty()
+        return self._store_ready
+
+    def _reads_from_store(self):
+        # Single-file operations go straight to SQLite until something needs
+        # the whole metadata dictionary.
+        return self.store is not None and self._metadata is None and self._prepare_store()
+
+    def reload(self):
+        """Forget the in-memory metadata so the next access reads it again."""
+        self._metadata = None
+        self._file_index = None
+        self._version += 1
+
     def save_metadata(self):
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        self._version += 1
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write_metadata()
+
+    def _write_metadata(self):
+        if self._metadata is None:
+            self._dirty = False
+            return
+        if self.store is not None:
+            with self.store.transaction():
+                self.store.set_sections(self._metadata)
+                if self._metadata['key_files'] is not self._synced_files:
+                    self.store.replace_files(self._metadata['key_files'])
+                    self._synced_files = self._metadata['key_files']
+            self._store_ready = True
+        else:
+            self._write_json(self.metadata_file, self._metadata)
+        self._dirty = False
+
+    def _write_json(self, path, metadata):
+        # Write to a sibling temp file and rename it into place, so an
+        # interrupted save leaves the previous file intact.
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(metadata, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            match_file_mode(tmp_path, path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def export_metadata(self, path=None):
+        """Write the metadata in drd.json format, to drd.json unless path is given."""
+        path = path or self.metadata_file
+        if self._reads_from_store():
+            metadata = self.store.export_metadata()
+        else:
+            metadata = self.metadata
+        self._write_json(os.path.abspath(path), metadata)
+        return path
+
+    def import_metadata(self, path=None):
+        """Replace the current metadata with the contents of a drd.json file."""
+        with open(path or self.metadata_file, 'r') as f:
+            metadata = json.load(f)
+        self._metadata = metadata
+        self._synced_files = None
+        self.save_metadata()
+
+    @contextmanager
+    def batch(self):
+        """Coalesce every save_metadata call made inside the block into one write.
+
+        Batches nest; drd.json is written once when the outermost block exits
+        cleanly. If the block raises, nothing is written. With the SQLite
+        backend the block also runs in a single transaction.
+        """
+        transaction = self.store.transaction() if self.store is not None else nullcontext()
+        with transaction:
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._dirty = False
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._write_metadata()
+
+    @property
+    def file_index(self):
+        """Path to key_files entry lookup, rebuilt when key_files is replaced."""
+        key_files = self.metadata['key_files']
+        if (self._file_index is None or self._indexed_files is not key_files
+                or len(self._file_index) != len(key_files)):
+            self._file_index = {entry['path']: entry for entry in key_files}
+            self._indexed_files = key_files
+        return self._file_index
+
+    def scan_project(self, refresh=False):
+        """Walk the project once and reuse the result for ignore rules, the file
+        list and the directory tree until refresh is requested."""
+        if self._scan is None or refresh:
+            self._scan = scan_project(self.project_dir)
+            if self._ignore_patterns is None:
+                self._ignore_matcher = None
+        return self._scan
+
+    def project_files(self):
+        """Set of the scanned project paths, for resolving imports locally."""
+        scan = self.scan_project()
+        if self._project_files_scan is not scan:
+            self._project_files = frozenset(path.replace(os.sep, '/') for path in scan.files)
+            self._project_files_scan = scan
+        return self._project_files
+
+    @property
+    def ignore_patterns(self):
+        if self._ignore_patterns is None:
+            self._ignore_patterns = self.get_ignore_patterns()
+        return self._ignore_patterns
+
+    @ignore_patterns.setter
+    def ignore_patterns(self, patterns):
+        self._ignore_patterns = patterns
+        self._ignore_matcher = None
+
+    @property
+    def ignore_matcher(self):
+        if self._ignore_matcher is None:
+            if self._ignore_patterns is None:
+                self._ignore_matcher = self.scan_project().matcher
+            else:
+                # Explicitly assigned patterns replace the defaults and .gitignore rules
+                self._ignore_matcher = IgnoreMatcher(self._ignore_patterns)
+        return self._ignore_matcher
 
     def get_ignore_patterns(self):
-        patterns = [
-            '**/.git/**', '**/node_modules/**', '**/dist/**', '**/build/**',
-            '**/__pycache__/**', '**/.venv/**', '**/.idea/**', '**/.vscode/**'
-        ]
-
-        for root, _, files in os.walk(self.project_dir):
-            if '.gitignore' in files:
-                gitignore_path = os.path.join(root, '.gitignore')
-                rel_root = os.path.relpath(root, self.project_dir)
-                with open(gitignore_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            if rel_root == '.':
-                                patterns.append(line)
-                            else:
-                                patterns.append(os.path.join(rel_root, line))
-
-        return patterns
+        return list(self.scan_project().ignore_patterns)
 
     def should_ignore(self, path):
         try:
@@ -82,53 +278,90 @@ class ProjectMetadataManager:
             if rel_path.startswith('..'):
                 return True
 
-            for pattern in self.ignore_patterns:
-                if pattern.endswith('/'):
-                    # It's a directory pattern
-                    if rel_path.startswith(pattern) or rel_path.startswith(pattern[:-1]):
-                        return True
-                elif fnmatch.fnmatch(rel_path, pattern):
-                    return True
-            return False
+            return self.ignore_matcher.is_ignored(rel_path, os.path.isdir(abs_path))
         except Exception as e:
             print_warning(f"Error in should_ignore for path {path}: {str(e)}")
             return True
 
     def get_directory_structure(self, start_path):
-        structure = {}
-        for root, dirs, files in os.walk(start_path):
-            if self.should_ignore(root):
-                continue
-            path = os.path.relpath(root, start_path)
-            if path == '.':
-                structure['files'] = [
-                    f for f in files if not self.should_ignore(os.path.join(root, f))]
-                structure['directories'] = []
-            else:
-                parts = path.split(os.sep)
-                current = structure
-                for part in parts[:-1]:
-                    if 'directories' not in current:
-                        current['directories'] = []
-                    if part not in current['directories']:
-                        current['directories'].append(part)
-                    current = current.setdefault(part, {})
-                if parts[-1] not in current:
-                    current['directories'] = current.get('directories', [])
-                    current['directories'].append(parts[-1])
-                    current[parts[-1]] = {
-                        'files': [f for f in files if not self.should_ignore(os.path.join(root, f))]}
-        return structure
+        if os.path.abspath(start_path) == self.project_dir:
+            return self.scan_project().directory_structure
+        return scan_project(start_path).directory_structure
 
     def is_binary_file(self, file_path):
         _, extension = os.path.splitext(file_path)
         if extension.lower() in self.binary_extensions or extension.lower() in self.image_extensions:
             return True
 
+        # The content is authoritative when the file can be read
+        head = read_head(file_path)
+        if head is not None:
+            return looks_binary(head)
+
         mime_type, _ = mimetypes.guess_type(file_path)
         return mime_type and not mime_type.startswith('text') and not mime_type.endswith('json')
 
-    async def analyze_file(self, file_path):
+    def generated_file_info(self, file_path):
+        """Entry for a lockfile, minified bundle or generated source, or None.
+
+        Such files are large, say little about the project and are not worth
+        an LLM call, so they are described from their name alone.
+        """
+        reason = generated_reason(file_path, read_head(file_path))
+        if reason is None:
+            return None
+        return {
+            "path": os.path.relpath(file_path, self.project_dir),
+            "type": guess_file_type(file_path),
+            "summary": f"Generated file ({reason})",
+            "exports": [],
+            "imports": [],
+            "generated": True
+        }
+
+    @property
+    def rate_limiter(self):
+        # Per-provider limits can be set in a "rate_limits" section of drd.json
+        return get_rate_limiter(self.metadata.get('rate_limits'))
+
+    async def call_llm(self, prompt):
+        # Cache hits are answered before taking a rate limiter slot, so they
+        # cost no request or token budget
+        cache, cache_key, cached_response = get_cached_response(prompt, None)
+        if cached_response is not None:
+            return cached_response
+        response = await self.rate_limiter.call(
+            async_call_dravid_api_with_pagination, prompt,
+            include_context=True, use_cache=False, tokens=estimate_tokens(prompt))
+        if cache is not None:
+            cache.set(cache_key, response)
+        return response
+
+    async def request_file_metadata(self, prompt):
+        response = await self.call_llm(prompt)
+        return ET.fromstring(response).find('metadata')
+
+    def add_external_dependencies(self, dependencies):
+        for dep in dependencies:
+            if dep not in self.metadata['external_dependencies']:
+                self.metadata['external_dependencies'].append(dep)
+
+    def analysis_context(self):
+        """(project context, folder structure) for file analysis prompts.
+
+        Neither depends on the file being described, so a run renders them
+        once and passes them to every analyze_file and analyze_batch call.
+        """
+        return self.get_project_context(), json.dumps(self.metadata['directory_structure'])
+
+    async def analyze_file(self, file_path, fast=False, context=None):
+        """Describe one file for key_files.
+
+        Type, exports and imports come from a local extractor when one is
+        registered for the file, leaving only the summary to the LLM. With
+        fast=True the LLM is never called. context is analysis_context(),
+        rendered here when not given.
+        """
         rel_path = os.path.relpath(file_path, self.project_dir)
 
         if self.is_binary_file(file_path):
@@ -143,59 +376,221 @@ class ProjectMetadataManager:
         if file_path.endswith('.md'):
             return None  # Skip markdown files
 
+        generated = self.generated_file_info(file_path)
+        if generated is not None:
+            return generated
+
+        local_info = None
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            # Files over MAX_ANALYSIS_BYTES are cut down to head, outline and tail
+            content, excerpted = read_for_analysis(file_path)
+
+            if not excerpted:
+                local_info = extract_file_info(rel_path, content, self.project_files())
+            if local_info is not None:
+                self.add_external_dependencies(
+                    local_info.get('external_dependencies', []))
+
+            if fast:
+                local_info = local_info or {}
+                return {
+                    "path": rel_path,
+                    "type": local_info.get('type') or guess_file_type(rel_path),
+                    "summary": local_info.get('summary', ''),
+                    "exports": local_info.get('exports', []),
+                    "imports": local_info.get('imports', []),
+                    # Marks entries a later full run should still summarize
+                    "analysis": "local"
+                }
+
+            project_context, folder_structure = context or self.analysis_context()
+            if local_info is not None:
+                prompt = get_file_summary_prompt(
+                    rel_path, content, project_context, folder_structure)
+                metadata = await self.request_file_metadata(prompt)
+                return {
+                    "path": rel_path,
+                    "type": local_info['type'],
+                    "summary": metadata.find('summary').text,
+                    "exports": local_info['exports'],
+                    "imports": local_info['imports']
+                }
+
+            prompt = get_file_metadata_prompt(
+                rel_path, content, project_context, folder_structure)
+            metadata = await self.request_file_metadata(prompt)
+            file_info = self.file_info_from_metadata(rel_path, metadata)
 
-            prompt = get_file_metadata_prompt(rel_path, content, json.dumps(
-                self.metadata), json.dumps(self.metadata['directory_structure']))
-            response = call_dravid_api_with_pagination(
-                prompt, include_context=True)
+        except Exception as e:
+            print_warning(f"Error analyzing file {file_path}: {str(e)}")
+            file_info = self.failed_file_info(rel_path, local_info)
 
-            root = ET.fromstring(response)
-            metadata = root.find('metadata')
+        return file_info
 
-            file_info = {
-                "path": rel_path,
-                "type": metadata.find('type').text,
-                "summary": metadata.find('summary').text,
-                "exports": metadata.find('exports').text.split(',') if metadata.find('exports').text != 'None' else [],
-                "imports": metadata.find('imports').text.split(',') if metadata.find('imports').text != 'None' else []
-            }
+    def file_info_from_metadata(self, rel_path, metadata, local_info=None):
+        file_info = {
+            "path": rel_path,
+            "type": metadata.find('type').text,
+            "summary": metadata.find('summary').text,
+            "exports": metadata.find('exports').text.split(',') if metadata.find('exports').text != 'None' else [],
+            "imports": metadata.find('imports').text.split(',') if metadata.find('imports').text != 'None' else []
+        }
+        if local_info is not None:
+            file_info.update(type=local_info['type'], exports=local_info['exports'],
+                             imports=local_info['imports'])
+
+        dependencies = metadata.find('external_dependencies')
+        if dependencies is not None:
+            self.add_external_dependencies(
+                dep.text for dep in dependencies.findall('dependency'))
+        return file_info
+
+    def failed_file_info(self, rel_path, local_info=None):
+        local_info = local_info or {}
+        return {
+            "path": rel_path,
+            "type": local_info.get('type', "unknown"),
+            "summary": ANALYSIS_ERROR_SUMMARY,
+            "exports": local_info.get('exports', []),
+            "imports": local_info.get('imports', [])
+        }
 
-            dependencies = metadata.find('external_dependencies')
-            if dependencies is not None:
-                for dep in dependencies.findall('dependency'):
-                    self.metadata['external_dependencies'].append(dep.text)
+    def can_batch(self, file_path):
+        return (not self.is_binary_file(file_path) and not file_path.endswith('.md')
+                and generated_reason(file_path, read_head(file_path)) is None)
 
+    async def analyze_batch(self, file_paths, context=None):
+        """Describe several small files with one LLM call.
+
+        Returns one entry per path, in order. Files the response leaves out are
+        retried on their own with analyze_file.
+        """
+        files = []
+        local_infos = {}
+        for file_path in file_paths:
+            rel_path = os.path.relpath(file_path, self.project_dir)
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            local_info = extract_file_info(rel_path, content, self.project_files())
+            if local_info is not None:
+                self.add_external_dependencies(
+                    local_info.get('external_dependencies', []))
+            local_infos[rel_path] = local_info
+            files.append((rel_path, content))
+
+        try:
+            project_context, folder_structure = context or self.analysis_context()
+            prompt = get_files_metadata_prompt(files, project_context, folder_structure)
+            response = await self.call_llm(prompt)
+            described = split_batch_response(extract_and_parse_xml(response))
         except Exception as e:
-            print_warning(f"Error analyzing file {file_path}: {str(e)}")
-            file_info = {
-                "path": rel_path,
-                "type": "unknown",
-                "summary": "Error occurred during analysis",
-                "exports": [],
-                "imports": []
-            }
+            print_warning(
+                f"Error analyzing batch of {len(files)} files: {str(e)}")
+            return [self.failed_file_info(rel_path, local_infos[rel_path])
+                    for rel_path, _ in files]
+
+        results = []
+        for file_path, (rel_path, _) in zip(file_paths, files):
+            metadata = described.get(os.path.normpath(rel_path))
+            try:
+                if metadata is None:
+                    raise LookupError("missing from batch response")
+                results.append(self.file_info_from_metadata(
+                    rel_path, metadata, local_infos[rel_path]))
+            except Exception:
+                results.append(await self.analyze_file(file_path, context=context))
+        return results
+
+    def stamp_file_fingerprint(self, file_entry, file_path, content_hash=None):
+        stat = os.stat(file_path)
+        file_entry['hash'] = content_hash or compute_file_hash(file_path)
+        file_entry['size'] = stat.st_size
+        file_entry['mtime'] = stat.st_mtime
+        return file_entry
+
+    def is_unchanged(self, file_entry, file_path):
+        """Return (unchanged, content_hash) for a previously analyzed file.
+
+        A matching size and mtime is trusted without reading the file; otherwise
+        the content hash decides, so touched-but-identical files are not re-sent.
+        """
+        if file_entry is None or 'hash' not in file_entry:
+            return False, None
+        stat = os.stat(file_path)
+        if file_entry.get('size') == stat.st_size and file_entry.get('mtime') == stat.st_mtime:
+            return True, file_entry['hash']
+        content_hash = compute_file_hash(file_path)
+        return content_hash == file_entry['hash'], content_hash
+
+    async def build_metadata(self, loader, fast=False, checkpoint=False):
+        """Describe every file in the project into key_files.
+
+        Unchanged files keep their previous entries. With checkpoint=True each
+        newly described file is also appended to the journal as it completes.
+        """
+        scan = self.scan_project()
+        total_files = len(scan.files)
+        reused_files = 0
+
+        previous_entries = dict(self.file_index)
+
+        key_files = []
+        content_hashes = {}
+        pending = []
+        for rel_path in scan.files:
+            file_path = os.path.join(self.project_dir, rel_path)
+            previous = previous_entries.get(rel_path)
+            if previous is not None and previous.get('analysis') == 'local' and not fast:
+                # Entries from a --fast run have no LLM summary yet
+                previous = None
+            unchanged, content_hashes[file_path] = self.is_unchanged(
+                previous, file_path)
+            if unchanged:
+                reused_files += 1
+                key_files.append(self.stamp_file_fingerprint(
+                    previous, file_path, content_hashes[file_path]))
+            else:
+                pending.append(file_path)
+        processed_files = reused_files
 
-        return file_info
+        if fast:
+            groups = [[file_path] for file_path in pending]
+        else:
+            batchable = [p for p in pending if self.can_batch(p)]
+            groups = [[p] for p in pending if not self.can_batch(p)]
+            groups += pack_batches(batchable, estimate_file_tokens)
 
-    async def build_metadata(self, loader):
-        total_files = sum([len(files) for root, _, files in os.walk(
-            self.project_dir) if not self.should_ignore(root)])
-        processed_files = 0
-
-        for root, _, files in os.walk(self.project_dir):
-            if self.should_ignore(root):
-                continue
-            for file in files:
-                file_path = os.path.join(root, file)
-                if not self.should_ignore(file_path):
-                    file_info = await self.analyze_file(file_path)
-                    if file_info:
-                        self.metadata['key_files'].append(file_info)
-                    processed_files += 1
-                    loader.message = f"Analyzing files ({processed_files}/{total_files})"
+        context = None if fast or not pending else self.analysis_context()
+
+        async def process_group(file_paths):
+            if len(file_paths) == 1:
+                results = [await self.analyze_file(file_paths[0], fast=fast, context=context)]
+            else:
+                results = await self.analyze_batch(file_paths, context=context)
+            for file_path, file_info in zip(file_paths, results):
+                content_hash = content_hashes.pop(file_path)
+                if file_info and file_info['summary'] != ANALYSIS_ERROR_SUMMARY:
+                    self.stamp_file_fingerprint(file_info, file_path, content_hash)
+                    if checkpoint:
+                        self.journal.record_file(file_info)
+            return results
+
+        # File contents are read inside the workers, so only as many files as
+        # there are concurrent requests are held in memory at a time.
+        workers = self.rate_limiter.max_concurrency
+        async for _, results in run_worker_pool(groups, process_group, workers):
+            key_files.extend(file_info for file_info in results if file_info)
+            processed_files += len(results)
+            loader.message = f"Analyzing files ({processed_files}/{total_files})"
+
+        key_files.sort(key=lambda entry: entry['path'])
+        removed_files = len(set(previous_entries) -
+                            {entry['path'] for entry in key_files})
+        self.metadata['key_files'] = key_files
+        self._version += 1
+        if previous_entries:
+            print_info(
+                f"Reused metadata for {reused_files} unchanged file(s), removed {removed_files} deleted file(s)")
 
         # Determine languages
         all_languages = set(file['type'] for file in self.metadata['key_files']
@@ -210,17 +605,128 @@ class ProjectMetadataManager:
 
         return self.metadata
 
+    async def refresh_files(self, rel_paths):
+        """Bring the entries for rel_paths in line with the files on disk.
+
+        Changed files are described again, files that are gone or now ignored
+        are dropped (a removed directory drops everything below it) and
+        unchanged files are left alone. Returns the paths whose entry changed.
+        """
+        updated = []
+        pending = []
+        with self.batch():
+            for rel_path in rel_paths:
+                file_path = os.path.join(self.project_dir, rel_path)
+                if not os.path.isfile(file_path) or self.should_ignore(file_path):
+                    prefix = rel_path + os.sep
+                    for entry in self.find_files():
+                        if entry['path'] == rel_path or entry['path'].startswith(prefix):
+                            self.remove_file_metadata(entry['path'])
+                            updated.append(entry['path'])
+                    continue
+                unchanged, _ = self.is_unchanged(
+                    self.get_file_metadata(rel_path), file_path)
+                if not unchanged:
+                    pending.append(file_path)
+
+            context = self.analysis_context() if pending else None
+
+            async def analyze(file_path):
+                return await self.analyze_file(file_path, context=context)
+
+            workers = self.rate_limiter.max_concurrency
+            async for _, file_info in run_worker_pool(pending, analyze, workers):
+                if not file_info or file_info['summary'] == ANALYSIS_ERROR_SUMMARY:
+                    # Left as it was, so the next change retries it
+                    continue
+                self.update_file_metadata(
+                    file_info['path'], file_info['type'], None,
+                    file_info['summary'], file_info['exports'], file_info['imports'])
+                updated.append(file_info['path'])
+        return updated
+
+    def _touch(self):
+        now = datetime.now().isoformat()
+        if self._reads_from_store():
+            self.store.update_section('project_info', {'last_updated': now})
+        else:
+            self.metadata['project_info']['last_updated'] = now
+
     def remove_file_metadata(self, filename):
-        self.metadata['project_info']['last_updated'] = datetime.now().isoformat()
-        self.metadata['key_files'] = [
-            f for f in self.metadata['key_files'] if f['path'] != filename]
+        self._touch()
+        if self.store is not None:
+            self.store.delete_file(filename)
+        if self._metadata is not None:
+            file_entry = self.file_index.pop(filename, None)
+            if file_entry is not None:
+                self.metadata['key_files'].remove(file_entry)
         self.save_metadata()
 
     def get_file_metadata(self, filename):
-        return next((f for f in self.metadata['key_files'] if f['path'] == filename), None)
-
-    def get_project_context(self):
-        return json.dumps(self.metadata, indent=2)
+        if self._reads_from_store():
+            return self.store.get_file(filename)
+        return self.file_index.get(filename)
+
+    def find_files(self, file_type=None, export=None):
+        """Entries matching a file type and/or an exported name."""
+        if self._reads_from_store():
+            if export is not None:
+                files = self.store.find_exporting(export)
+                return [f for f in files if file_type is None or f.get('type') == file_type]
+            return self.store.get_files(file_type)
+        return [f for f in self.metadata['key_files']
+                if (file_type is None or f.get('type') == file_type)
+                and (export is None or export in [e.strip() for e in f.get('exports') or []])]
+
+    def get_project_context(self, query=None, max_tokens=None, paths=None):
+        """Project metadata for prompts, compacted to fit max_tokens.
+
+        Files whose path, exports or summary match words of the query are
+        detailed first; the rest are detailed while the budget lasts. With
+        paths, only those files are detailed. The query-independent
+        serialization is reused until the metadata changes. With the SQLite
+        backend, only the rows that can be detailed are read.
+        """
+        if self._reads_from_store():
+            return ProjectContext.from_store(
+                self.store, query, max_tokens, paths).render(query, max_tokens, paths)
+        key = self._metadata_key()
+        if self._context_key != key:
+            self._context = ProjectContext(self.metadata)
+            self._context_key = key
+        return self._context.render(query, max_tokens, paths)
+
+    def find_relevant_files(self, query, limit=None):
+        """Paths of key_files ranked against query by the local BM25 index."""
+        key = self._metadata_key()
+        if self._index_key != key:
+            self.search_index.sync(self.metadata['key_files'])
+            self._index_key = key
+        return [path for path, _ in self.search_index.search(query, limit or FILE_CANDIDATES)]
+
+    def resolve_file(self, reference, min_confidence=None):
+        """Project-relative path an inexact file reference most likely means.
+
+        Matches against the scanned file list and the exports in key_files,
+        without calling the LLM; returns None unless the match is at least
+        min_confidence sure and the file exists.
+        """
+        scan = self.scan_project()
+        key = (self._metadata_key(), id(scan))
+        if self._resolver_key != key:
+            self._resolver = FileResolver.from_project(scan.files, self.metadata['key_files'])
+            self._resolver_key = key
+        path, confidence = self._resolver.resolve(
+            normalize_reference(reference, self.project_dir))
+        threshold = RESOLVE_CONFIDENCE if min_confidence is None else min_confidence
+        if path is None or confidence < threshold:
+            return None
+        if not os.path.exists(os.path.join(self.project_dir, path)):
+            return None
+        return path
+
+    def _metadata_key(self):
+        return (self._version, id(self.metadata), len(self.metadata['key_files']))
 
     def add_external_dependency(self, dependency):
         if dependency not in self.metadata['external_dependencies']:
@@ -237,18 +743,24 @@ class ProjectMetadataManager:
         self.save_metadata()
 
     def update_file_metadata(self, filename, file_type, content, description=None, exports=None, imports=None):
-        self.metadata['project_info']['last_updated'] = datetime.now().isoformat()
-        file_entry = next(
-            (f for f in self.metadata['key_files'] if f['path'] == filename), None)
+        self._touch()
+        file_entry = self.get_file_metadata(filename)
         if file_entry is None:
             file_entry = {'path': filename}
-            self.metadata['key_files'].append(file_entry)
+            if not self._reads_from_store():
+                self.metadata['key_files'].append(file_entry)
+                self.file_index[filename] = file_entry
         file_entry.update({
             'type': file_type,
             'summary': description or file_entry.get('summary', ''),
             'exports': exports or [],
             'imports': imports or []
         })
+        file_path = os.path.join(self.project_dir, filename)
+        if os.path.isfile(file_path):
+            self.stamp_file_fingerprint(file_entry, file_path)
+        if self.store is not None:
+            self.store.put_file(file_entry)
         self.save_metadata()
 
     def update_metadata_from_file(self):
@@ -265,8 +777,8 @@ class ProjectMetadataManager:
                     if key != 'files':  # We'll handle files separately
                         self.metadata[key] = value
                 # Update file metadata
-                if 'files' in new_metadata:
-                    for file_entry in new_metadata['files']:
+                with self.batch():
+                    for file_entry in new_metadata.get('files', []):
                         filename = file_entry['filename']
                         file_type = file_entry.get(
                             'type', filename.split('.')[-1])
@@ -276,7 +788,7 @@ class ProjectMetadataManager:
                         imports = file_entry.get('imports', [])
                         self.update_file_metadata(
                             filename, file_type, file_content, description, exports, imports)
-                self.save_metadata()
+                    self.save_metadata()
                 return True
             except json.JSONDecodeError:
                 print(f"Error: Invalid JSON content in {self.metadata_file}")
@@ -1,92 +1,245 @@
-import functools
-import sys
+import os
 import asyncio
 import time
-from ..api.main import call_dravid_api_with_pagination
-from ..utils.parser import extract_and_parse_xml
-from ..prompts.file_metada_desc_prompts import get_file_metadata_prompt
-from ..utils.utils import print_info, print_error, print_success, print_warning
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from ..api.main import get_llm_type
+from .batching import estimate_tokens
+from ..utils.utils import print_warning
 
-MAX_CONCURRENT_REQUESTS = 10
+MAX_CONCURRENT_REQUESTS = int(
+    os.getenv('DRAVID_MAX_CONCURRENT_REQUESTS', '10'))
 MAX_CALLS_PER_MINUTE = 100
 RATE_LIMIT_PERIOD = 60  # seconds
+MAX_RETRIES = int(os.getenv('DRAVID_RATE_LIMIT_RETRIES', '3'))
+MAX_BACKOFF = 60  # seconds
+
+# 429 is a rate limit; 503/529 are how providers report being overloaded
+THROTTLE_STATUS_CODES = {429, 503, 529}
+
+
+def get_throttle_delay(error):
+    """Return (throttled, retry_after) for an exception raised by an API call.
+
+    retry_after is the server's Retry-After hint in seconds, or None.
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(
+        response, 'status_code', None)
+    if status not in THROTTLE_STATUS_CODES:
+        return False, None
+    headers = getattr(response, 'headers', None) or {}
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return True, max(0.0, float(value) * scale)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                return True, max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return True, None
 
 
 class RateLimiter:
-    def __init__(self, max_calls, period):
+    """Keeps API calls under request and token budgets per period.
+
+    Both budgets are sliding windows over the last `period` seconds. The number
+    of calls allowed in flight adapts AIMD-style: it grows by about one per
+    window of successful calls and halves whenever the provider throttles us,
+    in which case new calls also wait out the provider's Retry-After.
+    """
+
+    def __init__(self, max_calls, period, max_tokens=None,
+                 max_concurrency=MAX_CONCURRENT_REQUESTS, max_retries=MAX_RETRIES):
         self.max_calls = max_calls
         self.period = period
-        self.calls = asyncio.Queue(maxsize=max_calls)
-        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.max_tokens = max_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.max_retries = max_retries
+        self.calls = deque()
+        self.tokens = deque()
+        self.token_total = 0
+        self.in_flight = 0
+        self.blocked_until = 0
+        self._waiters = []
+
+    def _prune(self, now):
+        while self.calls and now - self.calls[0] >= self.period:
+            self.calls.popleft()
+        while self.tokens and now - self.tokens[0][0] >= self.period:
+            self.token_total -= self.tokens.popleft()[1]
+
+    def _window_delay(self, tokens):
+        now = time.monotonic()
+        self._prune(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if len(self.calls) >= self.max_calls:
+            return self.calls[0] + self.period - now
+        # A request bigger than the whole budget still goes once the window is empty
+        if self.max_tokens and self.tokens and self.token_total + tokens > self.max_tokens:
+            return self.tokens[0][0] + self.period - now
+        return 0
+
+    async def _wait(self, timeout=None):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            self._waiters.remove(waiter)
+
+    def _wake(self):
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def record_tokens(self, tokens, now=None):
+        if tokens:
+            self.tokens.append((now or time.monotonic(), tokens))
+            self.token_total += tokens
 
-    async def acquire(self):
+    async def acquire(self, tokens=0):
+        """Wait until one more call of about `tokens` tokens fits the budgets."""
         while True:
-            if self.calls.full():
-                oldest_call = await self.calls.get()
-                time_since_oldest_call = time.time() - oldest_call
-                if time_since_oldest_call < self.period:
-                    await asyncio.sleep(self.period - time_since_oldest_call)
-            await self.calls.put(time.time())
-            return
+            delay = self._window_delay(tokens)
+            if delay <= 0:
+                break
+            await self._wait(delay)
+        now = time.monotonic()
+        self.calls.append(now)
+        self.record_tokens(tokens, now)
 
+    @asynccontextmanager
+    async def slot(self, tokens=0):
+        while self.in_flight >= int(self.concurrency):
+            await self._wait()
+        self.in_flight += 1
+        try:
+            await self.acquire(tokens)
+            yield self
+        finally:
+            self.in_flight -= 1
+            self._wake()
 
-rate_limiter = RateLimiter(MAX_CALLS_PER_MINUTE, RATE_LIMIT_PERIOD)
+    def on_success(self):
+        self.concurrency = min(self.max_concurrency,
+                               self.concurrency + 1 / self.concurrency)
 
+    def on_throttle(self, retry_after, attempt):
+        self.concurrency = max(1.0, self.concurrency / 2)
+        delay = retry_after if retry_after is not None else min(
+            MAX_BACKOFF, 2 ** attempt)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        print_warning(
+            f"Rate limited by the LLM provider, retrying in {delay:.1f}s with up to {int(self.concurrency)} concurrent request(s)")
 
-def to_thread(func, *args, **kwargs):
-    if sys.version_info >= (3, 9):
-        return asyncio.to_thread(func, *args, **kwargs)
-    else:
-        loop = asyncio.get_event_loop()
-        return loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    async def call(self, func, *args, tokens=0, **kwargs):
+        """Run an API coroutine within the budgets, retrying when throttled."""
+        for attempt in range(self.max_retries + 1):
+            async with self.slot(tokens):
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    throttled, retry_after = get_throttle_delay(e)
+                    if not throttled or attempt >= self.max_retries:
+                        raise
+                    # Back off before the slot is released to waiting calls
+                    self.on_throttle(retry_after, attempt)
+                    continue
+            self.on_success()
+            if isinstance(result, str):
+                # Output tokens count against the budget too
+                self.record_tokens(estimate_tokens(result))
+            return result
 
 
-async def process_single_file(filename, content, project_context, folder_structure):
-    metadata_query = get_file_metadata_prompt(
-        filename, content, project_context, folder_structure)
+_limiters = {}
+
+
+def get_rate_limit_config(provider, overrides=None):
+    """Limits for one provider: DRAVID_<PROVIDER>_<SETTING> or DRAVID_<SETTING>
+    from the environment, then the drd.json "rate_limits" section, then defaults.
+    """
+    section = (overrides or {}).get(provider) or {}
+    defaults = {
+        'requests_per_minute': MAX_CALLS_PER_MINUTE,
+        'tokens_per_minute': 0,
+        'max_concurrent_requests': MAX_CONCURRENT_REQUESTS,
+    }
+    config = {}
+    for name, default in defaults.items():
+        value = os.getenv(f"DRAVID_{provider.upper()}_{name.upper()}") or os.getenv(
+            f"DRAVID_{name.upper()}")
+        if value is None:
+            value = section.get(name, default)
+        config[name] = int(value)
+    return config
+
+
+def get_rate_limiter(overrides=None):
+    """Shared limiter for the configured LLM provider.
+
+    overrides is the "rate_limits" section of drd.json, keyed by provider.
+    """
+    provider = get_llm_type()
+    config = get_rate_limit_config(provider, overrides)
+    key = (provider,) + tuple(sorted(config.items()))
+    if key not in _limiters:
+        _limiters[key] = RateLimiter(
+            config['requests_per_minute'], RATE_LIMIT_PERIOD,
+            max_tokens=config['tokens_per_minute'] or None,
+            max_concurrency=config['max_concurrent_requests'])
+    return _limiters[key]
+
+
+async def run_worker_pool(items, worker, workers=MAX_CONCURRENT_REQUESTS):
+    """Run worker over items with a fixed number of tasks pulling from them.
+
+    items may be any iterable, including a generator; it is advanced only
+    when a worker is free, so at most `workers` items are in memory at once.
+    A slow item only holds up its own worker. Yields (item, result) pairs in
+    completion order; an exception raised by worker, or by items, stops the
+    pool and is re-raised.
+    """
+    items = iter(items)
+    finished = asyncio.Queue()
+
+    async def run():
+        while True:
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            except Exception as e:
+                finished.put_nowait((None, None, e))
+                break
+            try:
+                finished.put_nowait((item, await worker(item), None))
+            except Exception as e:
+                finished.put_nowait((item, None, e))
+        # Tells the consumer this worker has run out of items
+        finished.put_nowait(None)
+
+    tasks = [asyncio.create_task(run()) for _ in range(max(1, workers))]
+    running = len(tasks)
     try:
-        async with rate_limiter.semaphore:
-            await rate_limiter.acquire()
-            response = await to_thread(call_dravid_api_with_pagination, metadata_query, include_context=True)
-        root = extract_and_parse_xml(response)
-        type_elem = root.find('.//type')
-        summary_elem = root.find('.//summary')
-        exports_elem = root.find('.//exports')
-        imports_elem = root.find('.//imports')  # Added imports_elem
-        file_type = type_elem.text.strip(
-        ) if type_elem is not None and type_elem.text else "unknown"
-        summary = summary_elem.text.strip(
-        ) if summary_elem is not None and summary_elem.text else "No summary available"
-        exports = exports_elem.text.strip(
-        ) if exports_elem is not None and exports_elem.text else ""
-        imports = imports_elem.text.strip(
-        ) if imports_elem is not None and imports_elem.text else ""  # Added imports
-        print_success(f"Processed: {filename}")
-        # Added imports to return tuple
-        return filename, file_type, summary, exports, imports
-    except Exception as e:
-        print_error(f"Error processing {filename}: {e}")
-        # Added empty string for imports in error case
-        return filename, "unknown", f"Error: {e}", "", ""
-
-
-async def process_files(files, project_context, folder_structure):
-    total_files = len(files)
-    print_info(
-        f"Processing {total_files} files to construct metadata per file")
-    print_info(f"LLM calls to be made: {total_files}")
-
-    async def process_batch(batch):
-        tasks = [process_single_file(filename, content, project_context, folder_structure)
-                 for filename, content in batch]
-        return await asyncio.gather(*tasks)
-
-    batch_size = MAX_CONCURRENT_REQUESTS
-    results = []
-    for i in range(0, total_files, batch_size):
-        batch = files[i:i+batch_size]
-        batch_results = await process_batch(batch)
-        results.extend(batch_results)
-        print_info(f"Progress: {len(results)}/{total_files} files processed")
-
-    return results
+        while running:
+            entry = await finished.get()
+            if entry is None:
+                running -= 1
+                continue
+            item, result, error = entry
+            if error is not None:
+                raise error
+            yield item, result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,85 @@
+import os
+from .ignore import IgnoreMatcher, DEFAULT_IGNORE_PATTERNS
+
+
+class ProjectScan:
+    """Everything learned from one walk over a project directory.
+
+    files holds the relative paths of every non-ignored file, directories those
+    of every visited directory ('' for the root), directory_structure the
+    nested dict used in drd.json and folder_structure the indented text tree
+    used in prompts.
+    """
+
+    def __init__(self, project_dir, matcher=None):
+        self.project_dir = project_dir
+        self.matcher = matcher or IgnoreMatcher()
+        self.files = []
+        self.directories = []
+        self.gitignore_files = []
+        self.ignore_patterns = list(DEFAULT_IGNORE_PATTERNS)
+        self.directory_structure = {}
+        self.tree_lines = []
+
+    @property
+    def folder_structure(self):
+        return '\n'.join(self.tree_lines)
+
+    def should_ignore(self, rel_path, is_dir=False):
+        return self.matcher.is_ignored(rel_path, is_dir)
+
+    def add_gitignore(self, rel_root):
+        gitignore_path = os.path.join(self.project_dir, rel_root, '.gitignore')
+        self.gitignore_files.append(os.path.join(rel_root, '.gitignore'))
+        self.matcher.add_gitignore(gitignore_path, rel_root)
+        # Flattened, human-readable view of the rules (scoping is kept by the matcher)
+        rule_set = self.matcher.scopes.get(self.matcher._normalize(rel_root))
+        for rule in rule_set.rules if rule_set else []:
+            self.ignore_patterns.append(
+                os.path.join(rel_root, rule.pattern) if rel_root else rule.pattern)
+
+    def add_directory(self, rel_root, files):
+        self.directories.append(rel_root)
+        self.files.extend(os.path.join(rel_root, f) for f in files)
+
+        if not rel_root:
+            self.directory_structure['files'] = list(files)
+            self.directory_structure['directories'] = []
+            level = 0
+            folder_name = os.path.basename(self.project_dir)
+        else:
+            parts = rel_root.split(os.sep)
+            current = self.directory_structure
+            for part in parts[:-1]:
+                current = current.setdefault(part, {})
+            current.setdefault('directories', []).append(parts[-1])
+            current[parts[-1]] = {'files': list(files)}
+            level = len(parts)
+            folder_name = parts[-1]
+
+        indent = ' ' * 4 * level
+        sub_indent = ' ' * 4 * (level + 1)
+        self.tree_lines.append(f"{indent}{folder_name}/")
+        self.tree_lines.extend(f"{sub_indent}{f}" for f in files)
+
+
+def scan_project(project_dir, matcher=None):
+    """Walk project_dir once, pruning ignored directories as they are found.
+
+    .gitignore files are read as their directory is visited, so their patterns
+    apply to everything below them without a separate pass.
+    """
+    project_dir = os.path.abspath(project_dir)
+    scan = ProjectScan(project_dir, matcher)
+    for root, dirs, files in os.walk(project_dir):
+        rel_root = os.path.relpath(root, project_dir)
+        rel_root = '' if rel_root == '.' else rel_root
+
+        if '.gitignore' in files:
+            scan.add_gitignore(rel_root)
+
+        dirs[:] = [d for d in dirs if not scan.should_ignore(
+            os.path.join(rel_root, d), is_dir=True)]
+        scan.add_directory(rel_root, [f for f in files if not scan.should_ignore(
+            os.path.join(rel_root, f))])
+    return scan
@@ -0,0 +1,136 @@
+import os
+import json
+import math
+import hashlib
+import tempfile
+from collections import Counter
+from .context import tokenize
+from ..utils.file_utils import match_file_mode
+
+INDEX_VERSION = 1
+# Files ranked locally before (or instead of) asking the LLM which files a query touches
+FILE_CANDIDATES = int(os.getenv('DRAVID_FILE_CANDIDATES', '15'))
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Fields are weighted by repeating their terms
+FIELD_WEIGHTS = (('path', 3), ('exports', 2), ('summary', 1), ('imports', 1))
+
+
+def entry_terms(entry):
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        value = entry.get(field) or ''
+        if isinstance(value, list):
+            value = ' '.join(str(item).split(':')[-1] for item in value)
+        for term in tokenize(value.replace(os.sep, ' ')):
+            terms[term] += weight
+    return terms
+
+
+def entry_signature(entry):
+    fields = [entry.get(field) for field, _ in FIELD_WEIGHTS]
+    return hashlib.md5(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+class SearchIndex:
+    """BM25 index over key_files paths, summaries, exports and imports.
+
+    Term frequencies are persisted per file next to drd.json; sync() only
+    re-tokenizes entries whose indexed fields changed, and the inverted
+    postings are rebuilt in memory on load.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+        self._loaded = False
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        for path, doc in data.get('docs', {}).items():
+            self._add(path, doc)
+
+    def _add(self, path, doc):
+        self.docs[path] = doc
+        self.total_length += doc['length']
+        for term, count in doc['terms'].items():
+            self.postings.setdefault(term, {})[path] = count
+
+    def _remove(self, path):
+        doc = self.docs.pop(path)
+        self.total_length -= doc['length']
+        for term in doc['terms']:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self.postings[term]
+
+    def sync(self, key_files):
+        """Bring the index in line with key_files; returns True if anything changed."""
+        self.load()
+        changed = False
+        current = set()
+        for entry in key_files:
+            path = entry['path']
+            current.add(path)
+            signature = entry_signature(entry)
+            doc = self.docs.get(path)
+            if doc is not None and doc['signature'] == signature:
+                continue
+            if doc is not None:
+                self._remove(path)
+            terms = entry_terms(entry)
+            self._add(path, {'signature': signature, 'length': sum(terms.values()),
+                             'terms': dict(terms)})
+            changed = True
+        for path in set(self.docs) - current:
+            self._remove(path)
+            changed = True
+        if changed:
+            self.save()
+        return changed
+
+    def save(self):
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.drd.index.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': INDEX_VERSION, 'docs': self.docs},
+                          f, separators=(',', ':'))
+            match_file_mode(tmp_path, self.path)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def search(self, query, limit=10):
+        """Return up to limit (path, score) pairs, best first."""
+        self.load()
+        if not self.docs:
+            return []
+        average_length = self.total_length / len(self.docs) or 1
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for path, count in postings.items():
+                length = self.docs[path]['length']
+                scores[path] += idf * count * (K1 + 1) / (
+                    count + K1 * (1 - B + B * length / average_length))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
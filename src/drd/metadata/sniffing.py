@@ -0,0 +1,122 @@
+import os
+import re
+from collections import deque
+
+# Bytes read from the start of a file to decide whether it is binary or generated
+SNIFF_BYTES = int(os.getenv('DRAVID_SNIFF_BYTES', '8192'))
+# Files larger than this are described from a head/outline/tail excerpt
+MAX_ANALYSIS_BYTES = int(os.getenv('DRAVID_MAX_ANALYSIS_BYTES', '64000'))
+EXCERPT_LINES = int(os.getenv('DRAVID_EXCERPT_LINES', '80'))
+OUTLINE_LINES = int(os.getenv('DRAVID_OUTLINE_LINES', '200'))
+# Average line length above which a file is treated as minified
+MINIFIED_LINE_LENGTH = int(os.getenv('DRAVID_MINIFIED_LINE_LENGTH', '300'))
+
+GENERATED_NAMES = {
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'poetry.lock', 'pipfile.lock', 'cargo.lock', 'gemfile.lock', 'composer.lock',
+    'go.sum', 'mix.lock', 'pubspec.lock', 'bun.lockb'
+}
+GENERATED_SUFFIXES = (
+    '.min.js', '.min.css', '.map', '_pb2.py', '_pb2_grpc.py', '.pb.go',
+    '.pb.h', '.pb.cc', '.g.dart', '.designer.cs'
+)
+GENERATED_MARKERS = re.compile(
+    r'@generated|do not edit|code generated by|auto-?generated|'
+    r'generated by the protocol buffer compiler', re.I)
+
+OUTLINE_PATTERN = re.compile(
+    r'^\s*(?:export\s+|public\s+|private\s+|protected\s+|static\s+|async\s+|pub\s+)*'
+    r'(?:def|class|function|func|fn|interface|type|struct|enum|trait|impl|module|'
+    r'create\s+table|create\s+view|create\s+function)\b', re.I)
+
+
+def read_head(path, size=None):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(size or SNIFF_BYTES)
+    except OSError:
+        return None
+
+
+def looks_binary(head):
+    """Guess from the first bytes of a file whether it holds text."""
+    if not head:
+        return False
+    if b'\0' in head:
+        return True
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the sniff window is still text
+        if e.start < len(head) - 3:
+            return True
+    control = sum(1 for byte in head if byte < 32 and byte not in b'\t\n\r\f\b')
+    return control / len(head) > 0.1
+
+
+def generated_reason(path, head):
+    """Return why a file looks generated or minified, or None."""
+    name = os.path.basename(path).lower()
+    if name in GENERATED_NAMES:
+        return "lockfile"
+    if name.endswith(GENERATED_SUFFIXES):
+        return "generated or minified by its name"
+    if not head:
+        return None
+    text = head.decode('utf-8', errors='replace')
+    if GENERATED_MARKERS.search('\n'.join(text.splitlines()[:10])):
+        return "marked as generated"
+    lines = text.splitlines() or ['']
+    longest = max(len(line) for line in lines)
+    if len(head) >= 1000 and (len(text) / len(lines) > MINIFIED_LINE_LENGTH
+                              or longest > MINIFIED_LINE_LENGTH * 10):
+        return "minified"
+    return None
+
+
+def excerpt_lines(lines):
+    """Reduce an iterable of lines to head, outline and tail sections.
+
+    Only EXCERPT_LINES lines at each end plus up to OUTLINE_LINES definition
+    lines from the middle are kept, so the whole file is never held in memory.
+    """
+    head = []
+    outline = []
+    tail = deque(maxlen=EXCERPT_LINES)
+    total = 0
+    for line in lines:
+        total += 1
+        if len(head) < EXCERPT_LINES:
+            head.append(line)
+            continue
+        if tail and len(tail) == tail.maxlen:
+            dropped = tail[0]
+            if len(outline) < OUTLINE_LINES and OUTLINE_PATTERN.match(dropped):
+                outline.append(f"{total - EXCERPT_LINES}: {dropped.rstrip()}\n")
+        tail.append(line)
+
+    omitted = total - len(head) - len(tail)
+    if omitted <= 0:
+        return ''.join(head) + ''.join(tail)
+    parts = [''.join(head)]
+    parts.append(
+        f"\n... [{omitted} lines omitted; file has {total} lines] ...\n")
+    if outline:
+        parts.append("[Outline of omitted lines]\n" + ''.join(outline))
+    parts.append(f"... [last {len(tail)} lines] ...\n" + ''.join(tail))
+    return ''.join(parts)
+
+
+def read_for_analysis(path):
+    """Return (content, excerpted) for a text file, excerpting large ones."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        if os.fstat(f.fileno()).st_size <= MAX_ANALYSIS_BYTES:
+            return f.read(), False
+        return excerpt_lines(f), True
+
+
+def excerpt_text(content):
+    """Same as read_for_analysis, for content that is already in memory."""
+    if len(content) <= MAX_ANALYSIS_BYTES:
+        return content, False
+    return excerpt_lines(content.splitlines(keepends=True)), True
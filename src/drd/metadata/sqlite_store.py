@@ -0,0 +1,220 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    type TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_type ON files(type);
+CREATE TABLE IF NOT EXISTS exports (
+    name TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS exports_name ON exports(name);
+CREATE INDEX IF NOT EXISTS exports_path ON exports(path);
+"""
+
+# Marks where key_files sits among the top-level keys, so exports keep drd.json's layout
+FILES_SECTION = 'key_files'
+
+
+class SqliteMetadataStore:
+    """Project metadata kept in SQLite, one row per file.
+
+    Top-level sections (project_info, environment, ...) are stored as JSON
+    values; key_files entries live in their own table with indexes on path,
+    type and exported names so single lookups never load the whole project.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            # Writers share one connection guarded by _lock
+            self._conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one SQLite transaction; nested calls join the outer one."""
+        with self._lock:
+            if not self._depth:
+                self.conn.execute('BEGIN')
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if not self._depth:
+                    self.conn.execute('ROLLBACK')
+                raise
+            self._depth -= 1
+            if not self._depth:
+                self.conn.execute('COMMIT')
+
+    def is_empty(self):
+        with self._lock:
+            return self.conn.execute('SELECT 1 FROM sections LIMIT 1').fetchone() is None
+
+    def get_sections(self):
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT name, value FROM sections WHERE name != ? ORDER BY position',
+                (FILES_SECTION,)).fetchall()
+        return {name: json.loads(value) for name, value in rows}
+
+    def set_sections(self, metadata):
+        with self.transaction():
+            self.conn.execute('DELETE FROM sections')
+            self.conn.executemany(
+                'INSERT INTO sections (name, position, value) VALUES (?, ?, ?)',
+                [(name, position, None if name == FILES_SECTION else json.dumps(value))
+                 for position, (name, value) in enumerate(metadata.items())])
+
+    def update_section(self, name, values):
+        with self.transaction():
+            row = self.conn.execute(
+                'SELECT value FROM sections WHERE name = ?', (name,)).fetchone()
+            section = json.loads(row[0]) if row and row[0] else {}
+            section.update(values)
+            if row:
+                self.conn.execute('UPDATE sections SET value = ? WHERE name = ?',
+                                  (json.dumps(section), name))
+            else:
+                self.conn.execute(
+                    'INSERT INTO sections (name, position, value) '
+                    'VALUES (?, (SELECT COUNT(*) FROM sections), ?)',
+                    (name, json.dumps(section)))
+
+    def get_file(self, path):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT entry FROM files WHERE path = ?', (path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_files(self, file_type=None):
+        query = 'SELECT entry FROM files'
+        params = ()
+        if file_type is not None:
+            query += ' WHERE type = ?'
+            params = (file_type,)
+        with self._lock:
+            rows = self.conn.execute(query + ' ORDER BY path', params).fetchall()
+        return [json.loads(entry) for entry, in rows]
+
+    def find_exporting(self, name):
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT DISTINCT files.entry FROM exports JOIN files ON files.path = exports.path '
+                'WHERE exports.name = ? ORDER BY files.path', (name.strip(),)).fetchall()
+        return [json.loads(entry) for entry, in rows]
+
+    def get_files_by_path(self, paths):
+        """Entries for paths, in the order given; unknown paths are skipped."""
+        entries = {}
+        paths = list(paths)
+        with self._lock:
+            # Stay below SQLite's limit on bound parameters
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                rows = self.conn.execute(
+                    'SELECT path, entry FROM files WHERE path IN (%s)' % ','.join('?' * len(chunk)),
+                    chunk).fetchall()
+                entries.update((path, json.loads(entry)) for path, entry in rows)
+        return [entries[path] for path in paths if path in entries]
+
+    def list_paths(self):
+        with self._lock:
+            return [path for path, in self.conn.execute('SELECT path FROM files ORDER BY path')]
+
+    def rank_paths(self, words, limit, weights=(3, 2, 1)):
+        """Up to limit paths, best match for words first, the rest in path order.
+
+        A word scores weights[0] in the path, weights[1] in an exported name
+        and weights[2] anywhere else in the entry; scoring runs in SQLite so
+        no entry is loaded.
+        """
+        path_weight, export_weight, entry_weight = weights
+        terms, params = [], []
+        for word in sorted(words):
+            pattern = f'%{word}%'
+            terms.append('CASE WHEN files.path LIKE ? THEN ? '
+                         'WHEN EXISTS (SELECT 1 FROM exports WHERE exports.path = files.path '
+                         'AND exports.name LIKE ?) THEN ? '
+                         'WHEN files.entry LIKE ? THEN ? ELSE 0 END')
+            params += [pattern, path_weight, pattern, export_weight, pattern, entry_weight]
+        order = f"{' + '.join(terms)} DESC, path" if terms else 'path'
+        with self._lock:
+            rows = self.conn.execute(
+                f'SELECT path FROM files ORDER BY {order} LIMIT ?',
+                params + [limit]).fetchall()
+        return [path for path, in rows]
+
+    def count_files(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def put_file(self, entry):
+        with self.transaction():
+            self.conn.execute(
+                'INSERT OR REPLACE INTO files (path, type, entry) VALUES (?, ?, ?)',
+                (entry['path'], entry.get('type'), json.dumps(entry)))
+            self.conn.execute('DELETE FROM exports WHERE path = ?', (entry['path'],))
+            self.conn.executemany(
+                'INSERT INTO exports (name, path) VALUES (?, ?)',
+                [(name.strip(), entry['path'])
+                 for name in entry.get('exports') or [] if name and name.strip()])
+
+    def delete_file(self, path):
+        with self.transaction():
+            self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+            self.conn.execute('DELETE FROM exports WHERE path = ?', (path,))
+
+    def replace_files(self, entries):
+        with self.transaction():
+            self.conn.execute('DELETE FROM files')
+            self.conn.execute('DELETE FROM exports')
+            for entry in entries:
+                self.put_file(entry)
+
+    def import_metadata(self, metadata):
+        with self.transaction():
+            self.set_sections(metadata)
+            self.replace_files(metadata.get(FILES_SECTION, []))
+
+    def export_metadata(self):
+        """Rebuild the drd.json dictionary, with key_files in its original position."""
+        with self._lock:
+            names = [name for name, in self.conn.execute(
+                'SELECT name FROM sections ORDER BY position')]
+            sections = self.get_sections()
+            metadata = {}
+            for name in names:
+                metadata[name] = self.get_files() if name == FILES_SECTION else sections[name]
+            metadata.setdefault(FILES_SECTION, self.get_files())
+        return metadata
@@ -0,0 +1,236 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from .scanner import scan_project
+from .project_metadata import ProjectMetadataManager
+from ..utils.utils import print_info, print_success, print_warning, print_error
+from ..api.async_client import run_async
+
+# Quiet period that ends a burst of changes before metadata is refreshed
+WATCH_DEBOUNCE = float(os.getenv('DRAVID_WATCH_DEBOUNCE', '1.0'))
+# How often the polling fallback rescans the project
+WATCH_POLL_INTERVAL = float(os.getenv('DRAVID_WATCH_POLL_INTERVAL', '2.0'))
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Reports changed paths using Linux inotify, one watch per directory.
+
+    Directories are watched as the ignore rules allow, so node_modules and
+    friends never cost a watch. poll() returns the relative paths touched
+    since the last call, or None when the kernel queue overflowed and the
+    caller should rescan everything.
+    """
+
+    def __init__(self, project_dir, is_ignored):
+        self.project_dir = project_dir
+        self.is_ignored = is_ignored
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for rel_dir in scan_project(project_dir).directories:
+            self._add_watch(rel_dir)
+
+    def _add_watch(self, rel_dir):
+        path = os.path.join(self.project_dir, rel_dir)
+        wd = self.libc.inotify_add_watch(self.fd, path.encode(), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached")
+            return
+        self.watches[wd] = rel_dir
+
+    def _watch_new_directory(self, rel_dir):
+        """Watch a directory created after start-up and report what is already in it."""
+        changed = set()
+        for root, dirs, files in os.walk(os.path.join(self.project_dir, rel_dir)):
+            rel_root = os.path.relpath(root, self.project_dir)
+            dirs[:] = [d for d in dirs if not self.is_ignored(
+                os.path.join(rel_root, d), True)]
+            self._add_watch(rel_root)
+            changed.update(os.path.join(rel_root, f) for f in files
+                           if not self.is_ignored(os.path.join(rel_root, f), False))
+        return changed
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            rel_dir = self.watches.get(wd)
+            if rel_dir is None or not name:
+                continue
+            rel_path = os.path.join(rel_dir, name)
+            is_dir = bool(mask & IN_ISDIR)
+            if self.is_ignored(rel_path, is_dir):
+                continue
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                changed |= self._watch_new_directory(rel_path)
+            else:
+                # Deleted directories are reported too, so their entries are dropped
+                changed.add(rel_path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: rescans and compares size and mtime."""
+
+    def __init__(self, project_dir, interval=None):
+        self.project_dir = project_dir
+        self.interval = interval or WATCH_POLL_INTERVAL
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for rel_path in scan_project(self.project_dir).files:
+            try:
+                stat = os.stat(os.path.join(self.project_dir, rel_path))
+            except OSError:
+                continue
+            snapshot[rel_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(max(timeout, self.interval))
+        snapshot = self._snapshot()
+        changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                   if snapshot.get(path) != self.snapshot.get(path)}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(project_dir, is_ignored):
+    try:
+        return InotifyWatcher(project_dir, is_ignored)
+    except (OSError, AttributeError, TypeError) as e:
+        # No inotify on this platform, or the watch limit is too low for the project
+        print_info(f"Watching for changes by polling ({e})")
+        return PollingWatcher(project_dir)
+
+
+class MetadataWatcher:
+    """Keeps drd.json in step with the files on disk.
+
+    Changes are collected until the project has been quiet for `debounce`
+    seconds, then only the touched files are re-described, through the same
+    rate-limited pipeline as --meta-init.
+    """
+
+    def __init__(self, project_dir, debounce=None, manager=None, on_refresh=None):
+        self.project_dir = os.path.abspath(project_dir)
+        self.debounce = WATCH_DEBOUNCE if debounce is None else debounce
+        self.manager = manager or ProjectMetadataManager(self.project_dir)
+        # Called from the watcher thread with the paths whose metadata changed
+        self.on_refresh = on_refresh
+        self.watcher = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def is_ignored(self, rel_path, is_dir=False):
+        return self.manager.ignore_matcher.is_ignored(rel_path, is_dir)
+
+    def collect(self):
+        """Block until a burst of changes has settled; return the changed paths."""
+        changed = set()
+        while not self.stop_event.is_set():
+            paths = self.watcher.poll(self.debounce if changed else 0.5)
+            if paths is None:
+                # Lost track of events; every known and current file is a candidate
+                changed |= set(scan_project(self.project_dir).files)
+                changed |= {entry['path'] for entry in self.manager.find_files()}
+            elif paths:
+                changed |= paths
+            elif changed:
+                return changed
+        return changed
+
+    def refresh(self, paths):
+        # drd.json may have been changed by another drd command meanwhile
+        self.manager.reload()
+        if any(os.path.basename(path) == '.gitignore' for path in paths):
+            self.manager.scan_project(refresh=True)
+        updated = run_async(self.manager.refresh_files(sorted(paths)))
+        if updated:
+            print_success(
+                f"Metadata refreshed for {len(updated)} file(s): {', '.join(updated)}")
+            if self.on_refresh:
+                self.on_refresh(updated)
+        return updated
+
+    def run(self):
+        self.watcher = self.watcher or create_watcher(self.project_dir, self.is_ignored)
+        try:
+            while not self.stop_event.is_set():
+                paths = self.collect()
+                if paths and not self.stop_event.is_set():
+                    try:
+                        self.refresh(paths)
+                    except Exception as e:
+                        print_error(f"Error refreshing metadata: {str(e)}")
+        finally:
+            self.watcher.close()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def watch_project_metadata(project_dir):
+    watcher = MetadataWatcher(project_dir)
+    if watcher.manager.store is None and not os.path.exists(watcher.manager.metadata_file):
+        print_warning("No drd.json found. Run 'drd --meta-init' first.")
+        return
+    print_info("👓 Watching project files to keep drd.json up to date. Press Ctrl+C to stop.")
+    watcher.stop_event.clear()
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print_info("Stopped watching project files.")
@@ -73,3 +73,74 @@ examples:
 
 Respond strictly only with the XML response as it will be used for parsing, no other extra words. 
 """
+
+
+def get_file_summary_prompt(filename, content, project_context, folder_structure):
+    return f"""
+{project_context}
+Current folder structure:
+{folder_structure}
+File: {filename}
+Content:
+{content}
+
+You're the project context maintainer. The file's type, exports and imports are already known,
+please only write a concise description of the file's main purpose based on the file content,
+project context, and the current folder structure.
+
+Respond with an XML structure containing the summary:
+
+<response>
+  <metadata>
+    <summary>summary based on the file's contents, project context, and folder structure</summary>
+  </metadata>
+</response>
+
+Respond strictly only with the XML response as it will be used for parsing, no other extra words.
+"""
+
+
+def get_files_metadata_prompt(files, project_context, folder_structure):
+    file_sections = "\n".join(
+        f"File: {filename}\nContent:\n{content}\n" for filename, content in files)
+    return f"""
+{project_context}
+Current folder structure:
+{folder_structure}
+
+{file_sections}
+You're the project context maintainer. Your role is to keep relevant meta info about the entire project
+so it can be used by an AI coding assistant in future for reference.
+
+Based on each file's content, project context, and the current folder structure,
+please generate appropriate metadata for every file above, one <metadata> block per file.
+
+Guidelines:
+1. 'path' must be exactly the file path given above, it is used to match the metadata to the file.
+2. 'type' should be the programming language or file type (e.g., "typescript", "python", "json").
+3. 'summary' should be a concise description of the file's main purpose.
+4. 'exports' should list the exported items with their types (fun: for functions, class: for classes, var: for variables etc).
+5. 'imports' should list imports from other project files, including the path and imported item.
+6. 'external_dependencies' should list external dependencies for dependency management files if the file appears to
+be deps management file (package.json, requirements.txt, Cargo.toml etc), otherwise omit the tag.
+7. If there are no exports, use <exports>None</exports> instead of an empty tag.
+8. If there are no imports, use <imports>None</imports> instead of an empty tag.
+
+Respond with an XML structure containing the metadata:
+
+<response>
+  <metadata>
+    <path>path/of/first/file</path>
+    <type>file_type</type>
+    <summary>summary based on the file's contents, project context, and folder structure</summary>
+    <exports>fun:functionName,class:ClassName,var:variableName</exports>
+    <imports>path/to/file</imports>
+  </metadata>
+  <metadata>
+    <path>path/of/second/file</path>
+    ...
+  </metadata>
+</response>
+
+Respond strictly only with the XML response as it will be used for parsing, no other extra words.
+"""
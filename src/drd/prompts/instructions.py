@@ -124,4 +124,6 @@ For eg, if you need to install python, use something like pyenv and related lib.
 19. When you create new project or new files that are non-existent, never give UPDATE step.
 20. Ensure you create the dependent files also if they don't exists. Eg, when creating a sample.html and having a dependent sample.css, you need to 
 include steps to create sample.html and for creating sample.css
+21. Independent steps may be run at the same time. If a step needs an earlier step that it does not share a file with,
+add <depends_on>step numbers, counted from 1, comma separated</depends_on> to it, e.g. <depends_on>2</depends_on>
 """
@@ -0,0 +1,127 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Memory held by cached file contents (raw and line-numbered text together)
+CONTENT_CACHE_MB = float(os.getenv('DRAVID_CONTENT_CACHE_MB', '32'))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def number_lines(text):
+    """Prefix every line with its 1-based number, as prompts quote files."""
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return "\n".join(f"{i+1}:{line.rstrip()}" for i, line in enumerate(lines))
+
+
+class CachedContent:
+    __slots__ = ('signature', 'raw', '_numbered', 'stored_size')
+
+    def __init__(self, signature, raw):
+        self.signature = signature
+        self.raw = raw
+        self._numbered = None
+        self.stored_size = 0
+
+    @property
+    def numbered(self):
+        if self._numbered is None:
+            self._numbered = number_lines(self.raw)
+        return self._numbered
+
+    @property
+    def size(self):
+        return len(self.raw) + (len(self._numbered) if self._numbered else 0)
+
+
+class FileContentCache:
+    """In-memory LRU cache of file contents, shared by one drd process.
+
+    Entries are keyed by absolute path and validated against the file's
+    mtime, size and inode on every lookup, so edits made by drd itself or
+    by anyone else are picked up on the next read. Once the cached text
+    exceeds max_bytes the least recently used files are dropped.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = int(CONTENT_CACHE_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _lookup(self, path):
+        """Return (entry, cached) for the current version of path."""
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            # Not on disk (or just removed); open() below reports why
+            signature = None
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry is not None and signature is not None and entry.signature == signature:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry, True
+            self._discard(path)
+            self.misses += 1
+        with open(path, 'r') as f:
+            return CachedContent(signature, f.read()), False
+
+    def _store(self, path, entry):
+        if entry.signature is None or entry.size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(path)
+            entry.stored_size = entry.size
+            self.entries[path] = entry
+            self.size += entry.stored_size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.stored_size
+
+    def _discard(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.size -= entry.stored_size
+
+    def read(self, path):
+        """Raw text of path; raises OSError like open() if it cannot be read."""
+        path = os.path.abspath(path)
+        entry, cached = self._lookup(path)
+        if not cached:
+            self._store(path, entry)
+        return entry.raw
+
+    def numbered(self, path):
+        """Line-numbered text of path, rendered once per file version."""
+        path = os.path.abspath(path)
+        entry, cached = self._lookup(path)
+        rendered = entry._numbered is None
+        text = entry.numbered
+        if rendered or not cached:
+            # Stored again so the rendering counts towards the memory cap
+            self._store(path, entry)
+        return text
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self.entries.clear()
+                self.size = 0
+            else:
+                self._discard(os.path.abspath(path))
+
+
+def get_content_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FileContentCache()
+    return _cache
@@ -0,0 +1,132 @@
+import os
+import re
+from ..metadata.context import words
+from ..metadata.sniffing import OUTLINE_PATTERN
+from .content_cache import get_content_cache
+from .file_utils import clean_path
+
+# Files with fewer lines are always quoted whole
+EXCERPT_MIN_LINES = int(os.getenv('DRAVID_EXCERPT_MIN_LINES', '400'))
+# Lines kept on each side of a stack-trace or keyword line
+CONTEXT_LINES = int(os.getenv('DRAVID_EXCERPT_CONTEXT_LINES', '20'))
+# Longest definition kept from a matching symbol
+MAX_SYMBOL_LINES = 120
+# Imports and module docstrings usually live here
+HEADER_LINES = 15
+MAX_KEYWORD_ANCHORS = 8
+
+# Python: File "app.py", line 12 / Node, Go, Rust and most others: app.js:12:5
+TRACE_PATTERNS = (
+    re.compile(r'File "(?P<path>[^"]+)", line (?P<line>\d+)'),
+    re.compile(r'(?P<path>[\w./\\@~-]+\.\w+):(?P<line>\d+)'),
+)
+
+
+def trace_line_numbers(trace, path):
+    """Line numbers of path mentioned in a stack trace or error output."""
+    numbers = set()
+    if not trace:
+        return numbers
+    target = os.path.normpath(path).replace('\\', '/')
+    for pattern in TRACE_PATTERNS:
+        for match in pattern.finditer(trace):
+            mentioned = os.path.normpath(match.group('path')).replace('\\', '/')
+            if mentioned == target or mentioned.endswith('/' + target) or target.endswith('/' + mentioned):
+                numbers.add(int(match.group('line')))
+    return numbers
+
+
+def block_end(lines, start):
+    """Index just past the definition that starts at lines[start]."""
+    indent = len(lines[start]) - len(lines[start].lstrip())
+    end = start + 1
+    limit = min(len(lines), start + MAX_SYMBOL_LINES)
+    while end < limit:
+        line = lines[end]
+        if line.strip() and len(line) - len(line.lstrip()) <= indent and OUTLINE_PATTERN.match(line):
+            break
+        end += 1
+    return end
+
+
+def symbol_windows(lines, symbols):
+    names = {str(name).split(':')[-1].strip() for name in symbols or []}
+    names.discard('')
+    if not names:
+        return []
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(name) for name in names) + r')\b')
+    return [(i, block_end(lines, i)) for i, line in enumerate(lines)
+            if OUTLINE_PATTERN.match(line) and pattern.search(line)]
+
+
+def keyword_anchors(lines, query):
+    """Lines sharing the most words with query, definitions first."""
+    query_words = words(query)
+    if not query_words:
+        return []
+    scored = []
+    for i, line in enumerate(lines):
+        score = len(query_words & words(line))
+        if score:
+            scored.append((-score, not OUTLINE_PATTERN.match(line), i))
+    return [i for _, _, i in sorted(scored)[:MAX_KEYWORD_ANCHORS]]
+
+
+def merge_windows(windows):
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def relevant_windows(lines, path, query=None, symbols=None, trace=None):
+    """Half-open line index ranges of lines worth quoting, or None for all."""
+    if len(lines) < EXCERPT_MIN_LINES:
+        return None
+    windows = symbol_windows(lines, symbols)
+    anchors = [number - 1 for number in trace_line_numbers(trace, path)
+               if 0 < number <= len(lines)]
+    if not windows and not anchors:
+        anchors = keyword_anchors(lines, query)
+    windows += [(max(0, i - CONTEXT_LINES), min(len(lines), i + CONTEXT_LINES + 1))
+                for i in anchors]
+    if not windows:
+        return None
+    return merge_windows(windows + [(0, min(HEADER_LINES, len(lines)))])
+
+
+def render_windows(lines, windows):
+    """Number the lines of each window with their position in the whole file."""
+    parts = []
+    previous_end = 0
+    for start, end in windows:
+        if start > previous_end:
+            parts.append(f"... [lines {previous_end + 1}-{start} omitted] ...")
+        parts.extend(f"{i+1}:{lines[i].rstrip()}" for i in range(start, end))
+        previous_end = end
+    if previous_end < len(lines):
+        parts.append(f"... [lines {previous_end + 1}-{len(lines)} omitted] ...")
+    return "\n".join(parts)
+
+
+def get_file_excerpt(fname, query=None, symbols=None, trace=None):
+    """Like get_file_content, but large files are cut to the relevant windows.
+
+    Windows come from line numbers of the file in trace, definitions of
+    symbols and, failing both, lines matching words of query. Lines keep
+    their numbers in the whole file, so line edits apply unchanged.
+    """
+    filename = clean_path(fname)
+    if not os.path.exists(filename):
+        return None
+    cache = get_content_cache()
+    lines = cache.read(filename).split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    windows = relevant_windows(lines, filename, query, symbols, trace)
+    if windows is None:
+        return cache.numbered(filename)
+    return render_windows(lines, windows)
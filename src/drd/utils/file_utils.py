@@ -1,7 +1,9 @@
 import os
 import base64
+import hashlib
 import mimetypes
 from .utils import print_info
+from .content_cache import get_content_cache
 
 
 def clean_path(path):
@@ -13,14 +15,41 @@ def clean_path(path):
 def get_file_content(fname):
     filename = clean_path(fname)
     if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-            numbered_lines = [
-                f"{i+1}:{line.rstrip()}" for i, line in enumerate(lines)]
-            return "\n".join(numbered_lines)
+        return get_content_cache().numbered(filename)
     return None
 
 
+def compute_file_hash(path, chunk_size=65536):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _current_umask():
+    # os.umask can only be read by setting it, so do it once at import time
+    # rather than racing other threads that are creating files
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _current_umask()
+
+
+def match_file_mode(tmp_path, path):
+    """Give a temp file the mode path has, or a new file would get, before it replaces path.
+
+    mkstemp creates files readable by the owner only, and os.replace keeps that mode.
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_path, mode)
+
+
 def fetch_project_guidelines(project_dir):
     guidelines_path = os.path.join(project_dir, 'project_guidelines.txt')
     project_guidelines = ""
@@ -27,6 +27,21 @@ def extract_and_parse_xml(response: str) -> etree.Element:
         raise
 
 
+def parse_step(step) -> Dict[str, Any]:
+    command = {}
+    for tag in ['type', 'operation', 'filename', 'content', 'changes', 'command', 'depends_on']:
+        element = step.find(tag)
+        if element is not None:
+            if tag in ['content', 'changes']:
+                # Use tostring to preserve CDATA and nested elements
+                command[tag] = etree.tostring(
+                    element, encoding='unicode', method='text').strip()
+            else:
+                command[tag] = element.text.strip(
+                ) if element.text else ''
+    return command
+
+
 def parse_dravid_response(response: str) -> List[Dict[str, Any]]:
     try:
         root = extract_and_parse_xml(response)
@@ -48,17 +63,7 @@ def parse_dravid_response(response: str) -> List[Dict[str, Any]]:
             })
         # Extract steps
         for step in root.findall('.//step'):
-            command = {}
-            for tag in ['type', 'operation', 'filename', 'content', 'changes', 'command']:
-                element = step.find(tag)
-                if element is not None:
-                    if tag in ['content', 'changes']:
-                        # Use tostring to preserve CDATA and nested elements
-                        command[tag] = etree.tostring(
-                            element, encoding='unicode', method='text').strip()
-                    else:
-                        command[tag] = element.text.strip(
-                        ) if element.text else ''
+            command = parse_step(step)
             if command:
                 commands.append(command)
 
@@ -70,6 +75,87 @@ def parse_dravid_response(response: str) -> List[Dict[str, Any]]:
         return []
 
 
+class StreamingResponseParser:
+    """Turns a response into commands while it is still being received.
+
+    feed() returns the explanation, requires_restart and step commands whose
+    closing tag has arrived, in the same form as parse_dravid_response. A
+    </step> inside a CDATA section is file content, not the end of the step.
+    """
+
+    STEP_START = re.compile(r'<\s*step\s*>', re.IGNORECASE)
+    STEP_END = re.compile(r'<\s*/\s*step\s*>', re.IGNORECASE)
+    TOP_LEVEL = re.compile(
+        r'<\s*(explanation|requires_restart)\s*>(.*?)<\s*/\s*\1\s*>', re.DOTALL | re.IGNORECASE)
+    CDATA_START = '<![CDATA['
+    CDATA_END = ']]>'
+
+    def __init__(self):
+        self.buffer = ''
+        self.in_step = False
+        # How far into the current step the buffer has been searched, and
+        # whether that position is inside an unfinished CDATA section
+        self.scanned = 0
+        self.in_cdata = False
+        self.parser = etree.XMLParser(recover=True, strip_cdata=False)
+
+    def _step_end(self):
+        """The closing tag of the current step outside CDATA, or None if not received yet."""
+        pos = self.scanned
+        while True:
+            if self.in_cdata:
+                end = self.buffer.find(self.CDATA_END, pos)
+                if end < 0:
+                    # "]]>" may be split across chunks
+                    self.scanned = max(pos, len(self.buffer) - len(self.CDATA_END) + 1)
+                    return None
+                pos = end + len(self.CDATA_END)
+                self.in_cdata = False
+            cdata = self.buffer.find(self.CDATA_START, pos)
+            step_end = self.STEP_END.search(
+                self.buffer, pos, cdata if cdata >= 0 else len(self.buffer))
+            if step_end:
+                self.scanned = 0
+                return step_end
+            if cdata < 0:
+                # A closing tag or CDATA opener may be cut off at the end
+                last_tag = self.buffer.rfind('<', pos)
+                self.scanned = last_tag if last_tag >= 0 else len(self.buffer)
+                return None
+            pos = cdata + len(self.CDATA_START)
+            self.in_cdata = True
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.buffer += chunk
+        commands = []
+        while True:
+            if not self.in_step:
+                step_start = self.STEP_START.search(self.buffer)
+                top_level = self.TOP_LEVEL.search(
+                    self.buffer, 0, step_start.start() if step_start else len(self.buffer))
+                if top_level:
+                    if top_level.group(2).strip():
+                        commands.append({'type': top_level.group(1).lower(),
+                                         'content': top_level.group(2).strip()})
+                    self.buffer = self.buffer[top_level.end():]
+                    continue
+                if not step_start:
+                    break
+                self.in_step = True
+                self.buffer = self.buffer[step_start.end():]
+            step_end = self._step_end()
+            if not step_end:
+                break
+            step_xml = f"<step>{self.buffer[:step_end.start()]}</step>"
+            self.buffer = self.buffer[step_end.end():]
+            self.in_step = False
+            step = etree.fromstring(step_xml.encode('utf-8'), parser=self.parser)
+            command = parse_step(step) if step is not None else None
+            if command:
+                commands.append(command)
+        return commands
+
+
 def parse_file_list_response(response: str):
     try:
         root = extract_and_parse_xml(response)
@@ -6,7 +6,7 @@ import time
 from .utils import print_error, print_success, print_info, print_warning, create_confirmation_box
 from .diff import preview_file_changes
 from .apply_file_changes import apply_changes
-from ..metadata.common_utils import get_ignore_patterns, get_folder_structure
+from ..metadata.scanner import scan_project
 
 
 class Executor:
@@ -21,6 +21,8 @@ class Executor:
             'sudo', 'su', 'chown', 'chmod'
         ]
         self.env = os.environ.copy()
+        # scans by directory; dropped whenever a step may have changed the tree
+        self._scans = {}
 
     def is_safe_path(self, path):
         full_path = os.path.abspath(path)
@@ -50,6 +52,7 @@ class Executor:
         return not any(cmd in self.disallowed_commands for cmd in command_parts)
 
     def perform_file_operation(self, operation, filename, content=None, force=False):
+        self._scans.clear()
         full_path = os.path.abspath(os.path.join(self.current_dir, filename))
 
         if not self.is_safe_path(full_path):
@@ -157,11 +160,15 @@ class Executor:
             print_error(f"Error merging JSON content: {str(e)}")
             return None
 
-    def get_folder_structure(self):
-        ignore_patterns, _ = get_ignore_patterns(self.current_dir)
-        return get_folder_structure(self.current_dir, ignore_patterns)
+    def get_folder_structure(self, metadata_manager=None):
+        # Reuse the metadata manager's scan when it covers the same directory
+        if metadata_manager is not None and metadata_manager.project_dir == os.path.abspath(self.current_dir):
+            return metadata_manager.scan_project().folder_structure
+        if self.current_dir not in self._scans:
+            self._scans[self.current_dir] = scan_project(self.current_dir)
+        return self._scans[self.current_dir].folder_structure
 
-    def execute_shell_command(self, command, timeout=300):  # 5 minutes timeout
+    def confirm_shell_command(self, command):
         if not self.is_safe_command(command):
             print_warning(f"Please verify the command once: {command}")
 
@@ -169,7 +176,13 @@ class Executor:
             command, "execute this command")
         print(confirmation_box)
 
-        if not click.confirm("Confirm execution"):
+        return click.confirm("Confirm execution")
+
+    def execute_shell_command(self, command, timeout=300, confirmed=False, echo=True):  # 5 minutes timeout
+        # confirmed: the user already agreed through confirm_shell_command
+        # echo=False: output is only returned, for commands run off the main thread
+        self._scans.clear()
+        if not confirmed and not self.confirm_shell_command(command):
             print_info("Command execution cancelled by user.")
             return 'Skipping this step...'
 
@@ -178,9 +191,9 @@ class Executor:
         elif command.strip().startswith(('source', '.')):
             return self._handle_source_command(command)
         else:
-            return self._execute_single_command(command, timeout)
+            return self._execute_single_command(command, timeout, echo)
 
-    def _execute_single_command(self, command, timeout):
+    def _execute_single_command(self, command, timeout, echo=True):
         output = []
         try:
             process = subprocess.Popen(
@@ -201,12 +214,14 @@ class Executor:
                 if time.time() - start_time > timeout:
                     process.terminate()
                     error_message = f"Command timed out after {timeout} seconds: {command}"
-                    print_error(error_message)
+                    if echo:
+                        print_error(error_message)
                     raise Exception(error_message)
 
                 line = process.stdout.readline()
                 if line:
-                    print(line.strip())
+                    if echo:
+                        print(line.strip())
                     output.append(line)
 
                 time.sleep(0.1)
@@ -216,17 +231,20 @@ class Executor:
 
             if return_code != 0:
                 error_message = f"Command failed with return code {return_code}\nError output: {stderr}"
-                print_error(error_message)
+                if echo:
+                    print_error(error_message)
                 raise Exception(error_message)
 
             self._update_env_from_command(command)
 
-            print_success("Command executed successfully.")
+            if echo:
+                print_success("Command executed successfully.")
             return ''.join(output)
 
         except Exception as e:
             error_message = f"Error executing command '{command}': {str(e)}"
-            print_error(error_message)
+            if echo:
+                print_error(error_message)
             raise Exception(error_message)
 
     def _handle_source_command(self, command):
@@ -4,7 +4,9 @@ from drd.api.main import (
     stream_dravid_api,
     call_dravid_api,
     call_dravid_vision_api,
-    get_api_functions
+    get_api_functions,
+    get_async_api_functions,
+    call_dravid_api_with_pagination
 )
 
 
@@ -84,3 +86,43 @@ class TestDravidAPI(unittest.TestCase):
             "test query", "image.jpg", False, None)
         mock_parse_response.assert_called_once_with(
             "<response><step><type>shell</type><command>echo 'test'</command></step></response>")
+
+    @patch('drd.api.main.get_model_name', return_value='test-model')
+    @patch('drd.api.main.get_response_cache')
+    @patch('drd.api.main.get_api_functions')
+    def test_call_dravid_api_with_pagination_uses_cache(self, mock_get_api_functions, mock_get_cache, mock_model):
+        mock_call_api = MagicMock(return_value="<response>fresh</response>")
+        mock_get_api_functions.return_value = (mock_call_api, None, None)
+        cache = MagicMock()
+        cache.get.return_value = None
+        mock_get_cache.return_value = cache
+
+        result = call_dravid_api_with_pagination("test query")
+
+        self.assertEqual(result, "<response>fresh</response>")
+        cache.set.assert_called_once_with(
+            cache.make_key.return_value, "<response>fresh</response>")
+
+        cache.get.return_value = "<response>cached</response>"
+        result = call_dravid_api_with_pagination("test query")
+
+        self.assertEqual(result, "<response>cached</response>")
+        mock_call_api.assert_called_once()
+
+    @patch.dict('os.environ', {'DRAVID_LLM': 'claude'})
+    def test_get_async_api_functions_claude(self):
+        call_api, call_vision_api, stream_response = get_async_api_functions()
+        self.assertEqual(call_api.__name__,
+                         'async_call_claude_api_with_pagination')
+        self.assertEqual(stream_response.__name__,
+                         'async_stream_claude_response')
+
+    @patch.dict('os.environ', {'DRAVID_LLM': 'ollama'})
+    def test_get_async_api_functions_openai_compatible(self):
+        call_api, _, _ = get_async_api_functions()
+        self.assertEqual(call_api.__name__, 'async_call_api_with_pagination')
+
+    @patch.dict('os.environ', {'DRAVID_LLM': 'unknown'})
+    def test_get_async_api_functions_unsupported(self):
+        with self.assertRaises(ValueError):
+            get_async_api_functions()
@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from drd.api.async_client import get_loop_client, run_async, _loop_clients
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def test_run_async_closes_loop_clients(self):
+        httpx_client = MagicMock(aclose=AsyncMock())
+        sdk_client = MagicMock(spec=['close'], close=AsyncMock())
+
+        async def work():
+            first = get_loop_client('claude', lambda: httpx_client)
+            self.assertIs(get_loop_client('claude', MagicMock()), first)
+            get_loop_client('openai', lambda: sdk_client)
+            return 'done'
+
+        self.assertEqual(run_async(work()), 'done')
+        httpx_client.aclose.assert_awaited_once()
+        sdk_client.close.assert_awaited_once()
+        self.assertEqual(len(_loop_clients), 0)
+
+    def test_clients_are_closed_when_the_coroutine_fails(self):
+        client = MagicMock(aclose=AsyncMock())
+
+        async def work():
+            get_loop_client('claude', lambda: client)
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            run_async(work())
+        client.aclose.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import time
+import tempfile
+import shutil
+
+from drd.api.cache import (
+    ResponseCache,
+    configure_cache,
+    is_cache_enabled,
+)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        configure_cache(None)
+
+    def test_make_key_depends_on_all_parts(self):
+        key = ResponseCache.make_key('claude', 'model', 'system', 'query')
+        self.assertEqual(key, ResponseCache.make_key(
+            'claude', 'model', 'system', 'query'))
+        self.assertNotEqual(key, ResponseCache.make_key(
+            'openai', 'model', 'system', 'query'))
+        self.assertNotEqual(key, ResponseCache.make_key(
+            'claude', 'other-model', 'system', 'query'))
+        self.assertNotEqual(key, ResponseCache.make_key(
+            'claude', 'model', None, 'query'))
+        self.assertNotEqual(key, ResponseCache.make_key(
+            'claude', 'model', 'system', 'other query'))
+
+    def test_get_set_counts_hits_and_misses(self):
+        key = ResponseCache.make_key('claude', 'model', None, 'query')
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, '<response>cached</response>')
+        self.assertEqual(self.cache.get(key), '<response>cached</response>')
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(self.cache_dir, ttl=10)
+        cache.set('key', 'response')
+        path = os.path.join(self.cache_dir, 'key.json')
+        with open(path, 'w') as f:
+            json.dump({'created': time.time() - 20, 'response': 'response'}, f)
+
+        self.assertIsNone(cache.get('key'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_evicts_least_recently_used_entries(self):
+        entry_size = len(json.dumps(
+            {'created': time.time(), 'response': 'x' * 100}))
+        cache = ResponseCache(self.cache_dir, max_size=entry_size * 2 + 10)
+        cache.set('first', 'x' * 100)
+        cache.set('second', 'x' * 100)
+        old = time.time() - 100
+        os.utime(os.path.join(self.cache_dir, 'first.json'), (old, old))
+        os.utime(os.path.join(self.cache_dir, 'second.json'),
+                 (old + 1, old + 1))
+        # Touching "first" makes "second" the least recently used entry
+        cache.get('first')
+        cache.set('third', 'x' * 100)
+
+        self.assertTrue(os.path.exists(
+            os.path.join(self.cache_dir, 'first.json')))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.cache_dir, 'second.json')))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.cache_dir, 'third.json')))
+
+    @patch.dict(os.environ, {'DRAVID_CACHE': '1'})
+    def test_no_cache_overrides_env(self):
+        self.assertTrue(is_cache_enabled())
+        configure_cache(enabled=False)
+        self.assertFalse(is_cache_enabled())
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_cache_is_opt_in(self):
+        self.assertFalse(is_cache_enabled())
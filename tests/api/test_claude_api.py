@@ -1,4 +1,6 @@
 import unittest
+import json
+import httpx
 from unittest.mock import patch, MagicMock
 import os
 import xml.etree.ElementTree as ET
@@ -7,11 +9,18 @@ from io import BytesIO
 from drd.api.claude_api import (
     get_api_key,
     get_headers,
+    get_session,
     make_api_call,
     parse_response,
     call_claude_api_with_pagination,
     call_claude_vision_api_with_pagination,
     stream_claude_response,
+    async_call_claude_api_with_pagination,
+    async_stream_claude_response,
+    API_URL,
+    POOL_SIZE,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
 )
 
 
@@ -37,19 +46,27 @@ class TestApiUtils(unittest.TestCase):
         self.assertEqual(headers['Content-Type'], 'application/json')
         self.assertEqual(headers['Anthropic-Version'], '2023-06-01')
 
-    @patch('requests.post')
-    def test_make_api_call(self, mock_post):
+    @patch('drd.api.claude_api.get_session')
+    def test_make_api_call(self, mock_get_session):
         mock_response = MagicMock()
-        mock_post.return_value = mock_response
+        mock_get_session.return_value.post.return_value = mock_response
         data = {"key": "value"}
         headers = {"header": "value"}
 
         response = make_api_call(data, headers)
 
-        mock_post.assert_called_once_with(
-            'https://api.anthropic.com/v1/messages', json=data, headers=headers, stream=False)
+        mock_get_session.return_value.post.assert_called_once_with(
+            'https://api.anthropic.com/v1/messages', json=data, headers=headers, stream=False,
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         self.assertEqual(response, mock_response)
 
+    @patch('drd.api.claude_api._session', None)
+    def test_get_session_is_shared(self):
+        session = get_session()
+        self.assertIs(get_session(), session)
+        adapter = session.get_adapter(API_URL)
+        self.assertEqual(adapter._pool_maxsize, POOL_SIZE)
+
     def test_parse_response_valid_xml(self):
         xml_response = "<response><content>Test content</content></response>"
         parsed = parse_response(xml_response)
@@ -129,3 +146,46 @@ class TestApiUtils(unittest.TestCase):
 
         result = list(stream_claude_response(self.query))
         self.assertEqual(result, ["Test", " stream"])
+        mock_response.close.assert_called_once()
+
+
+class TestAsyncClaudeApi(unittest.IsolatedAsyncioTestCase):
+
+    @patch('drd.api.claude_api.get_api_key', return_value="test_api_key")
+    @patch('drd.api.claude_api.get_async_client')
+    async def test_async_call_claude_api_with_pagination(self, mock_get_async_client, mock_get_api_key):
+        responses = iter([
+            {'content': [{'text': "<response>Part one"}],
+             'stop_reason': 'max_tokens'},
+            {'content': [{'text': " part two</response>"}],
+             'stop_reason': 'end_turn'},
+        ])
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, json=next(responses))
+
+        mock_get_async_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+
+        response = await async_call_claude_api_with_pagination("Test query")
+
+        self.assertEqual(response, "<response>Part one part two</response>")
+        self.assertEqual(len(requests_seen), 2)
+        self.assertEqual(requests_seen[1]['messages'][-1]['content'],
+                         'Please continue.')
+
+    @patch('drd.api.claude_api.get_api_key', return_value="test_api_key")
+    @patch('drd.api.claude_api.get_async_client')
+    async def test_async_stream_claude_response(self, mock_get_async_client, mock_get_api_key):
+        body = (
+            b'data: {"type": "content_block_delta", "delta": {"text": "Test"}}\n\n'
+            b'data: {"type": "content_block_delta", "delta": {"text": " stream"}}\n\n'
+            b'data: {"type": "message_stop"}\n\n'
+        )
+        mock_get_async_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+
+        result = [chunk async for chunk in async_stream_claude_response("Test query")]
+        self.assertEqual(result, ["Test", " stream"])
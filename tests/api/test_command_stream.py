@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import patch
+import threading
+
+from drd.api.command_stream import CommandStream
+
+
+class TestCommandStream(unittest.TestCase):
+
+    def test_steps_are_available_before_the_response_ends(self):
+        first_step_seen = threading.Event()
+
+        def chunks():
+            yield "<response><steps><step><type>shell</type><command>npm install</command></step>"
+            # The rest is only generated once the first step has been handed out
+            self.assertTrue(first_step_seen.wait(5))
+            yield "<step><type>shell</type><command>npm test</command></step></steps></response>"
+
+        stream = CommandStream(chunks())
+        received = []
+        for command in stream:
+            received.append(command['command'])
+            first_step_seen.set()
+
+        self.assertEqual(received, ['npm install', 'npm test'])
+        self.assertEqual(stream.commands, [{'type': 'shell', 'command': 'npm install'},
+                                           {'type': 'shell', 'command': 'npm test'}])
+        self.assertTrue(stream.response.endswith("</response>"))
+
+    def test_drain_after_partial_iteration(self):
+        stream = CommandStream(iter([
+            "<response><explanation>Two steps</explanation><steps>",
+            "<step><type>shell</type><command>ls</command></step>",
+            "<step><type>shell</type><command>pwd</command></step></steps></response>"]))
+        with patch('drd.api.command_stream.click.echo') as mock_echo:
+            self.assertEqual(next(iter(stream))['type'], 'explanation')
+            commands = stream.drain()
+        self.assertEqual([c.get('command') for c in commands], [None, 'ls', 'pwd'])
+        mock_echo.assert_any_call(" Two steps")
+
+    def test_stream_errors_are_raised_after_received_steps(self):
+        def chunks():
+            yield "<response><steps><step><type>shell</type><command>ls</command></step>"
+            raise ConnectionError("stream interrupted")
+
+        stream = CommandStream(chunks())
+        received = []
+        with self.assertRaises(ConnectionError):
+            for command in stream:
+                received.append(command)
+        self.assertEqual(received, [{'type': 'shell', 'command': 'ls'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+import json
+import httpx
 import requests
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import os
 from openai import OpenAI, AzureOpenAI
 
@@ -12,6 +14,8 @@ from drd.api.openai_api import (
     call_api_with_pagination,
     call_vision_api_with_pagination,
     stream_response,
+    async_call_api_with_pagination,
+    async_stream_response,
     DEFAULT_MODEL
 )
 
@@ -255,5 +259,60 @@ class TestOpenAIApiUtils(unittest.TestCase):
             list(stream_response(self.query))
 
 
+class TestAsyncOpenAIApi(unittest.IsolatedAsyncioTestCase):
+
+    @patch('drd.api.openai_api.get_async_client')
+    @patch('drd.api.openai_api.get_model')
+    @patch.dict(os.environ, {"DRAVID_LLM": "openai"})
+    async def test_async_call_api_with_pagination(self, mock_get_model, mock_get_async_client):
+        mock_get_model.return_value = DEFAULT_MODEL
+        truncated = MagicMock()
+        truncated.choices[0].message.content = "<response>Part one"
+        truncated.choices[0].finish_reason = 'length'
+        finished = MagicMock()
+        finished.choices[0].message.content = " part two</response>"
+        finished.choices[0].finish_reason = 'stop'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=[truncated, finished])
+        mock_get_async_client.return_value = mock_client
+
+        response = await async_call_api_with_pagination("Test query")
+
+        self.assertEqual(
+            response, "<response>Part one part two</response>")
+        self.assertEqual(mock_client.chat.completions.create.await_count, 2)
+        messages = mock_client.chat.completions.create.call_args[1]['messages']
+        self.assertEqual(messages[-1]['content'], "Please continue.")
+
+    @patch('drd.api.ollama_api.get_async_ollama_client')
+    @patch.dict(os.environ, {"DRAVID_LLM": "ollama", "DRAVID_LLM_MODEL": "starcoder"})
+    async def test_async_call_api_with_pagination_ollama(self, mock_get_client):
+        def handler(request):
+            self.assertEqual(json.loads(request.content), {
+                "model": "starcoder",
+                "prompt": "Test query",
+                "system": "",
+                "stream": False
+            })
+            return httpx.Response(200, json={"response": "<response>Ollama</response>"})
+
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+
+        response = await async_call_api_with_pagination("Test query")
+        self.assertEqual(response, "<response>Ollama</response>")
+
+    @patch('drd.api.ollama_api.get_async_ollama_client')
+    @patch.dict(os.environ, {"DRAVID_LLM": "ollama", "DRAVID_LLM_MODEL": "starcoder"})
+    async def test_async_stream_response_ollama(self, mock_get_client):
+        body = b'{"response":"Test"}\n{"response":" stream"}\n{"done":true}\n'
+        mock_get_client.return_value = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+
+        result = [chunk async for chunk in async_stream_response("Test query")]
+        self.assertEqual(result, ["Test", " stream"])
+
+
 if __name__ == '__main__':
     unittest.main()
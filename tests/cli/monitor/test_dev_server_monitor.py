@@ -27,6 +27,32 @@ class TestDevServerMonitor(unittest.TestCase):
             self.test_command, self.project_dir)
         mock_output_monitor.return_value.start.assert_called_once()
 
+    @patch('drd.cli.monitor.server_monitor.MetadataWatcher')
+    @patch('drd.cli.monitor.server_monitor.ProjectMetadataManager')
+    @patch('drd.cli.monitor.server_monitor.start_process')
+    @patch('drd.cli.monitor.server_monitor.OutputMonitor')
+    @patch.object(DevServerMonitor, '_main_loop', return_value=None)
+    def test_start_with_metadata_watcher(self, mock_main_loop, mock_output_monitor, mock_start_process,
+                                         mock_metadata_manager, mock_metadata_watcher):
+        monitor = DevServerMonitor(
+            self.project_dir, self.error_handlers, self.test_command, watch_meta=True)
+        monitor.start()
+        mock_metadata_watcher.assert_called_once()
+        self.assertNotIn('manager', mock_metadata_watcher.call_args.kwargs)
+        mock_metadata_watcher.return_value.start.assert_called_once()
+
+        # A refresh on the watcher thread makes the monitor reload before its next use
+        manager = mock_metadata_manager.return_value
+        self.assertIs(monitor.get_metadata_manager(), manager)
+        manager.reload.assert_not_called()
+        mock_metadata_watcher.call_args.kwargs['on_refresh'](['main.py'])
+        monitor.get_metadata_manager()
+        monitor.get_metadata_manager()
+        manager.reload.assert_called_once()
+
+        monitor.stop()
+        mock_metadata_watcher.return_value.stop.assert_called_once()
+
     @patch('drd.cli.monitor.server_monitor.ProjectMetadataManager')
     @patch('drd.cli.monitor.server_monitor.start_process')
     def test_stop(self, mock_start_process, mock_metadata_manager):
@@ -8,17 +8,17 @@ class TestErrorResolver(unittest.TestCase):
         self.error = Exception("Test error")
         self.line = "Error line from server output"
         self.monitor = MagicMock()
-        self.monitor.metadata_manager.get_project_context.return_value = "Test project context"
+        self.monitor.get_metadata_manager.return_value.get_project_context.return_value = "Test project context"
 
     @patch('drd.cli.monitor.error_resolver.call_dravid_api')
     @patch('drd.cli.monitor.error_resolver.Executor')
     @patch('drd.cli.monitor.error_resolver.get_files_to_modify')
-    @patch('drd.cli.monitor.error_resolver.get_file_content')
+    @patch('drd.cli.monitor.error_resolver.get_file_excerpt')
     @patch('drd.cli.monitor.error_resolver.confirm_with_user')
-    def test_monitoring_handle_error_with_dravid_apply_fix_with_restart(self, mock_confirm, mock_get_file_content, mock_get_files_to_modify, mock_executor, mock_call_api):
+    def test_monitoring_handle_error_with_dravid_apply_fix_with_restart(self, mock_confirm, mock_get_file_excerpt, mock_get_files_to_modify, mock_executor, mock_call_api):
         # Setup mocks
         mock_get_files_to_modify.return_value = ['test_file.py']
-        mock_get_file_content.return_value = "Test file content"
+        mock_get_file_excerpt.return_value = "Test file content"
         mock_call_api.return_value = [
             {'type': 'explanation', 'content': 'Test explanation'},
             {'type': 'requires_restart', 'content': 'true'},
@@ -44,12 +44,12 @@ class TestErrorResolver(unittest.TestCase):
     @patch('drd.cli.monitor.error_resolver.call_dravid_api')
     @patch('drd.cli.monitor.error_resolver.Executor')
     @patch('drd.cli.monitor.error_resolver.get_files_to_modify')
-    @patch('drd.cli.monitor.error_resolver.get_file_content')
+    @patch('drd.cli.monitor.error_resolver.get_file_excerpt')
     @patch('drd.cli.monitor.error_resolver.confirm_with_user')
-    def test_monitoring_handle_error_with_dravid_apply_fix_without_restart(self, mock_confirm, mock_get_file_content, mock_get_files_to_modify, mock_executor, mock_call_api):
+    def test_monitoring_handle_error_with_dravid_apply_fix_without_restart(self, mock_confirm, mock_get_file_excerpt, mock_get_files_to_modify, mock_executor, mock_call_api):
         # Setup mocks
         mock_get_files_to_modify.return_value = ['test_file.py']
-        mock_get_file_content.return_value = "Test file content"
+        mock_get_file_excerpt.return_value = "Test file content"
         mock_call_api.return_value = [
             {'type': 'explanation', 'content': 'Test explanation'},
             {'type': 'requires_restart', 'content': 'false'},
@@ -70,11 +70,11 @@ class TestErrorResolver(unittest.TestCase):
 
     @patch('drd.cli.monitor.error_resolver.call_dravid_api')
     @patch('drd.cli.monitor.error_resolver.get_files_to_modify')
-    @patch('drd.cli.monitor.error_resolver.get_file_content')
-    def test_monitoring_handle_error_with_dravid_parse_error(self, mock_get_file_content, mock_get_files_to_modify, mock_call_api):
+    @patch('drd.cli.monitor.error_resolver.get_file_excerpt')
+    def test_monitoring_handle_error_with_dravid_parse_error(self, mock_get_file_excerpt, mock_get_files_to_modify, mock_call_api):
         # Setup mocks
         mock_get_files_to_modify.return_value = ['test_file.py']
-        mock_get_file_content.return_value = "Test file content"
+        mock_get_file_excerpt.return_value = "Test file content"
         mock_call_api.side_effect = ValueError("Parse error")
 
         # Call the function
@@ -88,12 +88,12 @@ class TestErrorResolver(unittest.TestCase):
     @patch('drd.cli.monitor.error_resolver.call_dravid_api')
     @patch('drd.cli.monitor.error_resolver.Executor')
     @patch('drd.cli.monitor.error_resolver.get_files_to_modify')
-    @patch('drd.cli.monitor.error_resolver.get_file_content')
+    @patch('drd.cli.monitor.error_resolver.get_file_excerpt')
     @patch('drd.cli.monitor.error_resolver.confirm_with_user')
-    def test_monitoring_handle_error_with_dravid_apply_fix_restart_declined(self, mock_confirm, mock_get_file_content, mock_get_files_to_modify, mock_executor, mock_call_api):
+    def test_monitoring_handle_error_with_dravid_apply_fix_restart_declined(self, mock_confirm, mock_get_file_excerpt, mock_get_files_to_modify, mock_executor, mock_call_api):
         # Setup mocks
         mock_get_files_to_modify.return_value = ['test_file.py']
-        mock_get_file_content.return_value = "Test file content"
+        mock_get_file_excerpt.return_value = "Test file content"
         mock_call_api.return_value = [
             {'type': 'explanation', 'content': 'Test explanation'},
             {'type': 'requires_restart', 'content': 'true'},
@@ -51,6 +51,7 @@ class TestFileOperations(unittest.TestCase):
                                                   mock_metadata_manager, mock_exists):
         mock_exists.side_effect = [False, True]
         mock_metadata_manager.return_value.get_project_context.return_value = "Project metadata"
+        mock_metadata_manager.return_value.resolve_file.return_value = None
         mock_call_api.return_value = "<response><file>suggested_file.py</file></response>"
         mock_parse_response.return_value = "suggested_file.py"
 
@@ -73,6 +74,7 @@ class TestFileOperations(unittest.TestCase):
                                                  mock_metadata_manager, mock_exists):
         mock_exists.return_value = False
         mock_metadata_manager.return_value.get_project_context.return_value = "Project metadata"
+        mock_metadata_manager.return_value.resolve_file.return_value = None
         mock_call_api.return_value = "<response></response>"
         mock_parse_response.return_value = None
 
@@ -83,3 +85,18 @@ class TestFileOperations(unittest.TestCase):
         mock_call_api.assert_called_once()
         mock_print_error.assert_called_with(
             "Dravid couldn't suggest an alternative file.")
+
+    @patch('os.path.exists', return_value=False)
+    @patch('drd.cli.query.file_operations.ProjectMetadataManager')
+    @patch('drd.cli.query.file_operations.call_dravid_api_with_pagination')
+    @patch('drd.cli.query.file_operations.print_info')
+    def test_find_file_with_dravid_resolves_locally(self, mock_print_info, mock_call_api,
+                                                    mock_metadata_manager, mock_exists):
+        mock_metadata_manager.return_value.resolve_file.return_value = 'src/utils.py'
+
+        result = find_file_with_dravid('src/utlis.py', self.project_context)
+
+        self.assertEqual(result, 'src/utils.py')
+        mock_call_api.assert_not_called()
+        mock_metadata_manager.return_value.resolve_file.assert_called_once_with('src/utlis.py')
+        mock_print_info.assert_called_once_with("Resolved src/utlis.py to src/utils.py")
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from drd.cli.query.prompt_budget import (
+    PromptAssembler, prompt_budget, truncate_lines,
+    REQUIRED, MAIN_FILE, DEPENDENCIES, REFERENCES, METADATA
+)
+from drd.cli.query.main import construct_full_query
+
+
+def numbered(count, width=40):
+    return "\n".join(f"{i + 1}:{'x' * width}" for i in range(count))
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    def test_budget_follows_model(self):
+        with patch('drd.cli.query.prompt_budget.PROMPT_TOKENS', 0), \
+                patch('drd.cli.query.prompt_budget.MAX_PROMPT_TOKENS', 60000):
+            self.assertEqual(prompt_budget('gpt-4-0613'), 8192 - 4096)
+            self.assertEqual(prompt_budget('claude-3-5-sonnet-20240620'), 60000)
+        with patch('drd.cli.query.prompt_budget.PROMPT_TOKENS', 5000):
+            self.assertEqual(prompt_budget('gpt-4o'), 5000)
+
+    def test_truncate_lines_keeps_head_and_tail(self):
+        text = numbered(500)
+        result = truncate_lines(text, 1000)
+        self.assertLessEqual(len(result), 4000)
+        lines = result.splitlines()
+        self.assertTrue(lines[0].startswith("1:"))
+        self.assertTrue(lines[-1].startswith("500:"))
+        self.assertIn("lines omitted to fit the prompt", result)
+        self.assertEqual(truncate_lines("short", 10), "short")
+
+    def test_lower_tiers_give_way_first(self):
+        prompt = PromptAssembler(max_tokens=3000)
+        prompt.add("metadata", numbered(200), METADATA)
+        prompt.add("main", numbered(100), MAIN_FILE)
+        prompt.add("dependency", numbered(100), DEPENDENCIES)
+        prompt.add("reference", numbered(200), REFERENCES)
+        prompt.add("query", "User query: fix it")
+        result = prompt.assemble()
+
+        statuses = {section.name: section.status for section in prompt.sections}
+        self.assertEqual(statuses, {'metadata': 'dropped', 'main': 'full', 'dependency': 'full',
+                                    'reference': 'truncated', 'query': 'full'})
+        self.assertLessEqual(prompt.used_tokens, 3000)
+        # Original section order is kept
+        self.assertLess(result.index("1:"), result.index("User query"))
+
+    def test_summarize_is_used_before_truncating(self):
+        prompt = PromptAssembler(max_tokens=500)
+        summarize = MagicMock(return_value="short context")
+        prompt.add("project context", numbered(200), METADATA, summarize)
+        self.assertEqual(prompt.assemble(), "short context")
+        summarize.assert_called_once_with(500)
+        self.assertIn("project context [metadata]: ~4 of", prompt.report()[1])
+
+    def test_required_sections_are_never_cut(self):
+        prompt = PromptAssembler(max_tokens=10)
+        prompt.add("query", numbered(50), REQUIRED)
+        self.assertEqual(prompt.assemble(), numbered(50))
+
+
+class TestConstructFullQuery(unittest.TestCase):
+
+    @patch('drd.cli.query.main.print_debug')
+    @patch('drd.cli.query.main.print_info')
+    @patch('drd.cli.query.main.fetch_project_guidelines', return_value="Be nice")
+    @patch('drd.cli.query.main.is_directory_empty', return_value=False)
+    @patch('drd.cli.query.main.get_file_content')
+    @patch('drd.cli.query.main.get_file_excerpt')
+    def test_budgeted_query(self, mock_get_excerpt, mock_get_content, mock_is_empty, mock_guidelines,
+                            mock_print_info, mock_print_debug):
+        contents = {'main.py': numbered(50), 'dep.py': numbered(50), 'ref.md': numbered(2000)}
+        mock_get_excerpt.side_effect = lambda file, **kwargs: contents.get(file)
+        mock_get_content.side_effect = contents.get
+        executor = MagicMock(current_dir='/project')
+        files_info = {'main_file': 'main.py', 'dependencies': [], 'new_files': [],
+                      'file_contents_to_load': ['main.py', 'dep.py']}
+
+        result = construct_full_query("Add logging", executor, "CONTEXT", files_info,
+                                      ['ref.md'], debug=True, max_tokens=4000)
+
+        self.assertTrue(result.startswith("CONTEXT\n\nProject Guidelines:\nBe nice"))
+        self.assertIn(f"Current content of main.py:\n{contents['main.py']}", result)
+        self.assertIn(f"Current content of dep.py:\n{contents['dep.py']}", result)
+        self.assertIn("User query: Add logging\n\nReference files:\nReference file ref.md:", result)
+        self.assertIn("lines omitted to fit the prompt", result)
+        mock_get_excerpt.assert_any_call('main.py', query="Add logging", symbols=None)
+        reported = [call.args[0] for call in mock_print_debug.call_args_list]
+        self.assertTrue(reported[0].startswith("Prompt tokens: ~"))
+        self.assertTrue(any(line.startswith("ref.md [references]") and "(truncated)" in line
+                            for line in reported))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -170,6 +170,114 @@ class TestExecuteDravidCommand(unittest.TestCase):
         mock_print_error.assert_called_with(
             "An unexpected error occurred: API connection error")
 
+    @patch('drd.cli.query.main.Executor')
+    @patch('drd.cli.query.main.ProjectMetadataManager')
+    @patch('drd.cli.query.main.stream_dravid_api')
+    @patch('drd.cli.query.main.execute_commands')
+    @patch('drd.cli.query.main.get_files_to_modify')
+    @patch('drd.cli.query.main.is_directory_empty', return_value=False)
+    @patch('drd.cli.query.main.run_with_loader')
+    def test_file_selection_modes(self, mock_run_with_loader, mock_is_directory_empty, mock_get_files,
+                                  mock_execute_commands, mock_stream_api, mock_metadata_manager, mock_executor):
+        mock_executor.return_value = self.executor
+        mock_metadata_manager.return_value = self.metadata_manager
+        self.metadata_manager.get_project_context.side_effect = lambda query=None, paths=None: (
+            f"Context of {paths}" if paths else "Full context")
+        self.metadata_manager.find_relevant_files.return_value = ['src/billing/invoice.py']
+        mock_get_files.return_value = ['src/billing/invoice.py']
+        mock_stream_api.return_value = "<response><steps></steps></response>"
+        mock_run_with_loader.side_effect = lambda f, *args, **kwargs: f()
+
+        with patch('drd.cli.query.main.FILE_SELECTION', 'hybrid'):
+            execute_dravid_command(self.query, None, False, None)
+        mock_get_files.assert_called_once_with(
+            self.query, "Context of ['src/billing/invoice.py']")
+
+        mock_get_files.reset_mock()
+        with patch('drd.cli.query.main.FILE_SELECTION', 'local'):
+            execute_dravid_command(self.query, None, False, None)
+        mock_get_files.assert_not_called()
+
+        with patch('drd.cli.query.main.FILE_SELECTION', 'llm'):
+            execute_dravid_command(self.query, None, False, None)
+        mock_get_files.assert_called_once_with(self.query, "Full context")
+
+    @patch('drd.cli.query.main.Executor')
+    @patch('drd.cli.query.main.ProjectMetadataManager')
+    @patch('drd.cli.query.main.stream_dravid_api')
+    @patch('drd.cli.query.main.execute_commands')
+    @patch('drd.cli.query.main.get_files_to_modify')
+    @patch('drd.cli.query.main.get_file_excerpt')
+    @patch('drd.cli.query.main.fetch_project_guidelines', return_value="")
+    @patch('drd.cli.query.main.is_directory_empty', return_value=False)
+    @patch('drd.cli.query.main.run_with_loader')
+    def test_selected_file_list_is_loaded(self, mock_run_with_loader, mock_is_directory_empty,
+                                          mock_guidelines, mock_get_excerpt, mock_get_files,
+                                          mock_execute_commands, mock_stream_api,
+                                          mock_metadata_manager, mock_executor):
+        mock_executor.return_value = self.executor
+        mock_metadata_manager.return_value = self.metadata_manager
+        self.metadata_manager.get_project_context.return_value = "Test project context"
+        self.metadata_manager.find_relevant_files.return_value = ['src/invoice.py', 'src/mail.py']
+        mock_get_files.return_value = ['src/mail.py']
+        self.metadata_manager.get_file_metadata.side_effect = lambda file: {
+            'path': file, 'exports': ['fun:send_invoice', 'class:Ledger']}
+        mock_get_excerpt.side_effect = lambda file, **kwargs: f"1:# {file}"
+        query = "Send the invoice by mail"
+        mock_stream_api.return_value = "<response><steps></steps></response>"
+        mock_run_with_loader.side_effect = lambda f, *args, **kwargs: f()
+
+        with patch('drd.cli.query.main.FILE_SELECTION', 'local'):
+            execute_dravid_command(query, None, False, None)
+        full_query = mock_stream_api.call_args.args[0]
+        self.assertIn("Current content of src/invoice.py:\n1:# src/invoice.py", full_query)
+        self.assertLess(full_query.index("src/invoice.py:\n"), full_query.index("src/mail.py:\n"))
+        # Large files are cut around the exports the query mentions
+        mock_get_excerpt.assert_any_call(
+            'src/invoice.py', query=query, symbols=['fun:send_invoice'])
+
+        # The LLM's selection has the same shape
+        with patch('drd.cli.query.main.FILE_SELECTION', 'llm'):
+            execute_dravid_command(query, None, False, None)
+        full_query = mock_stream_api.call_args.args[0]
+        self.assertIn("Current content of src/mail.py:\n1:# src/mail.py", full_query)
+        self.assertNotIn("src/invoice.py", full_query)
+
+    @patch('drd.cli.query.main.Executor')
+    @patch('drd.cli.query.main.ProjectMetadataManager')
+    @patch('drd.cli.query.main.stream_dravid_commands')
+    @patch('drd.cli.query.main.stream_dravid_api')
+    @patch('drd.cli.query.main.execute_commands')
+    @patch('drd.cli.query.main.handle_error_with_dravid', return_value=True)
+    @patch('drd.cli.query.main.get_files_to_modify', return_value=[])
+    @patch('drd.cli.query.main.is_directory_empty', return_value=False)
+    @patch('drd.cli.query.main.run_with_loader')
+    @patch('drd.cli.query.main.PIPELINE_STEPS', True)
+    def test_pipelined_steps(self, mock_run_with_loader, mock_is_directory_empty, mock_get_files,
+                             mock_handle_error, mock_execute_commands, mock_stream_api,
+                             mock_stream_commands, mock_metadata_manager, mock_executor):
+        mock_executor.return_value = self.executor
+        mock_metadata_manager.return_value = self.metadata_manager
+        self.metadata_manager.get_project_context.return_value = "Test project context"
+        self.metadata_manager.find_relevant_files.return_value = []
+        mock_run_with_loader.side_effect = lambda f, *args, **kwargs: f()
+        commands = [{'type': 'shell', 'command': 'npm install'},
+                    {'type': 'shell', 'command': 'npm test'}]
+        stream = mock_stream_commands.return_value
+        stream.drain.return_value = commands
+        mock_execute_commands.side_effect = [
+            (False, 1, "npm install failed", "Error output"),
+            (True, 1, None, "Remaining output")]
+
+        execute_dravid_command(self.query, None, False, None)
+
+        mock_stream_api.assert_not_called()
+        # Steps are executed straight from the stream
+        self.assertIs(mock_execute_commands.call_args_list[0].args[0], stream)
+        mock_handle_error.assert_called_once()
+        self.assertEqual(mock_handle_error.call_args.args[1], commands[0])
+        self.assertEqual(mock_execute_commands.call_args_list[1].args[0], commands[1:])
+
 
 if __name__ == '__main__':
     unittest.main()
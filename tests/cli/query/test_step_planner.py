@@ -0,0 +1,170 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import threading
+
+from drd.cli.query.step_planner import StepPlanner, shell_effects, step_effects, runs_in_background
+from drd.cli.query.dynamic_command_handler import execute_commands, execute_commands_in_parallel
+
+
+def shell(command, **extra):
+    return dict(type='shell', command=command, **extra)
+
+
+def create(filename):
+    return {'type': 'file', 'operation': 'CREATE', 'filename': filename, 'content': 'x'}
+
+
+class TestStepPlanner(unittest.TestCase):
+
+    def plan(self, commands):
+        planner = StepPlanner()
+        return [planner.add(cmd)[0] for cmd in commands]
+
+    def test_independent_steps(self):
+        self.assertEqual(self.plan([
+            {'type': 'explanation', 'content': 'Setup'},
+            shell('npm install lodash'),
+            shell('pip install requests'),
+            create('src/App.js'),
+            create('src/index.js'),
+        ]), [[], [], [], [], []])
+
+    def test_conflicting_paths(self):
+        self.assertEqual(self.plan([
+            shell('npm install lodash'),
+            shell('yarn add react'),
+            create('package.json'),
+            shell('mkdir -p src/components'),
+            create('src/components/Button.js'),
+            create('README.md'),
+        ]), [[], [0], [0, 1], [], [3], []])
+
+    def test_barriers_and_unknown_commands(self):
+        self.assertEqual(self.plan([
+            create('a.py'),
+            shell('cd app'),
+            create('b.py'),
+            shell('python manage.py migrate'),
+            create('c.py'),
+        ]), [[], [0], [1], [0, 1, 2], [1, 3]])
+        self.assertTrue(shell_effects('export PATH="/opt/bin:$PATH"').barrier)
+        self.assertTrue(shell_effects('echo hi && echo there').barrier)
+        self.assertTrue(step_effects({'type': 'unknown'}).barrier)
+
+    def test_only_shell_steps_leave_the_main_thread(self):
+        for cmd, expected in [(shell('npm install lodash'), True), (shell('cd app'), False),
+                              (create('src/App.js'), False)]:
+            self.assertEqual(runs_in_background(cmd, step_effects(cmd)), expected)
+
+    def test_depends_on(self):
+        self.assertEqual(self.plan([
+            {'type': 'explanation', 'content': 'Two installs'},
+            shell('npm install lodash'),
+            shell('pip install requests', depends_on='1'),
+        ]), [[], [], [1]])
+
+
+class FakeExecutor:
+    """Runs shell commands by name; 'slow' ones block until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+        self.confirmed = []
+        self.files = []
+        self.lock = threading.Lock()
+
+    def confirm_shell_command(self, command):
+        self.confirmed.append(command)
+        return 'cancel' not in command
+
+    def execute_shell_command(self, command, timeout=300, confirmed=False, echo=True):
+        with self.lock:
+            self.started.append(command)
+        if 'slow' in command:
+            assert self.release.wait(5)
+        if 'fail' in command:
+            raise Exception(f"Command failed: {command}")
+        return f"ran {command}"
+
+    def perform_file_operation(self, operation, filename, content=None, force=False):
+        self.files.append(filename)
+        # The file step runs while the slow install is still going
+        self.release.set()
+        return True
+
+
+@patch('drd.cli.query.dynamic_command_handler.click.echo')
+@patch('drd.cli.query.dynamic_command_handler.print_success')
+@patch('drd.cli.query.dynamic_command_handler.print_info')
+@patch('drd.cli.query.dynamic_command_handler.print_error')
+@patch('drd.cli.query.dynamic_command_handler.update_file_metadata')
+class TestParallelExecution(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = FakeExecutor()
+        self.metadata_manager = MagicMock()
+
+    def test_overlaps_independent_steps_with_ordered_output(self, *mocks):
+        commands = [
+            {'type': 'explanation', 'content': 'Install and create'},
+            shell('npm install slow-package'),
+            create('src/App.js'),
+            shell('pip install requests'),
+        ]
+        success, steps, error, output = execute_commands_in_parallel(
+            commands, self.executor, self.metadata_manager, workers=2)
+
+        self.assertTrue(success)
+        self.assertEqual(steps, 4)
+        self.assertEqual(self.executor.confirmed, ['npm install slow-package', 'pip install requests'])
+        lines = [line for line in output.split("\n") if line.startswith("Step")]
+        self.assertEqual([line.split(":")[0] for line in lines],
+                         ["Step 1/4", "Step 2/4", "Step 3/4", "Step 4/4"])
+        self.assertIn("Output: ran npm install slow-package", output)
+
+    def test_failure_stops_and_marks_finished_steps(self, *mocks):
+        commands = [
+            shell('npm install slow-fail'),
+            shell('pip install requests'),
+            create('src/App.js'),
+            shell('cargo build'),
+        ]
+        success, step, error, output = execute_commands_in_parallel(
+            commands, self.executor, self.metadata_manager, workers=2)
+
+        self.assertFalse(success)
+        self.assertEqual(step, 1)
+        self.assertIn("Command failed: npm install slow-fail", error)
+        # cargo build conflicts with everything, so it never started
+        self.assertNotIn('cargo build', self.executor.started)
+        self.assertTrue(commands[1].get('completed'))
+        self.assertTrue(commands[2].get('completed'))
+        self.assertNotIn('completed', commands[3])
+
+        # Retrying the remaining steps skips the ones that already ran
+        self.executor.started.clear()
+        success, _, _, output = execute_commands(
+            commands[step:], self.executor, self.metadata_manager)
+        self.assertTrue(success)
+        self.assertEqual(self.executor.started, ['cargo build'])
+        self.assertIn("Step 1/3: Already completed", output)
+
+    def test_cancelled_and_streamed_steps(self, *mocks):
+        commands = iter([shell('npm install cancel-me'), shell('pip install requests')])
+        success, steps, _, output = execute_commands_in_parallel(
+            commands, self.executor, self.metadata_manager, workers=2)
+        self.assertTrue(success)
+        self.assertEqual(steps, 2)
+        self.assertIn("Step 1: Skipping this step...", output)
+        self.assertEqual(self.executor.started, ['pip install requests'])
+
+    def test_workers_setting_selects_parallel_mode(self, *mocks):
+        with patch('drd.cli.query.dynamic_command_handler.STEP_WORKERS', 3), \
+                patch('drd.cli.query.dynamic_command_handler.execute_commands_in_parallel') as mock_parallel:
+            execute_commands([], self.executor, self.metadata_manager)
+        mock_parallel.assert_called_once_with([], self.executor, self.metadata_manager, False, False)
+
+
+if __name__ == '__main__':
+    unittest.main()
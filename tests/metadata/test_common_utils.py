@@ -1,7 +1,6 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
-import re
 import xml.etree.ElementTree as ET
 
 from drd.metadata.common_utils import (
@@ -12,6 +11,7 @@ from drd.metadata.common_utils import (
     generate_file_description,
     find_file_with_dravid
 )
+from drd.metadata.ignore import IgnoreMatcher
 
 
 class TestCommonUtils(unittest.TestCase):
@@ -38,35 +38,25 @@ project/
     def test_parse_gitignore(self, path_exists):
         with patch('builtins.open', mock_open(read_data=self.gitignore_content)):
             patterns = parse_gitignore('fake/.gitignore')
-            print("patterns", patterns)
 
-        print(f"Parsed patterns: {patterns}")  # Debug print
-
-        self.assertEqual(len(patterns), 3,
-                         f"Expected 3 patterns, got {len(patterns)}")
-
-        # Test each pattern individually
-        self.assertTrue(any(pattern.search('file.pyc')
-                        for pattern in patterns), "*.pyc pattern not found")
-        self.assertTrue(any(pattern.search('node_modules/file.js')
-                        for pattern in patterns), "/node_modules/ pattern not found")
-        self.assertTrue(any(pattern.search('build/output.txt')
-                        for pattern in patterns), "build/ pattern not found")
-
-        # Print out each compiled pattern
-        for i, pattern in enumerate(patterns):
-            print(f"Pattern {i + 1}: {pattern.pattern}")
+        self.assertEqual([rule.pattern for rule in patterns.scopes[''].rules],
+                         ['*.pyc', '/node_modules/', 'build/'])
+        self.assertTrue(should_ignore('src/file.pyc', patterns))
+        self.assertTrue(should_ignore('node_modules', patterns, is_dir=True))
+        self.assertFalse(should_ignore('src/node_modules', patterns, is_dir=True))
+        self.assertTrue(should_ignore('src/build/output.txt', patterns))
+        self.assertFalse(should_ignore('build', patterns))
+        # Only the file's own rules apply
+        self.assertFalse(should_ignore('.git', patterns, is_dir=True))
 
     def test_should_ignore(self):
-        patterns = [
-            re.compile(r'.*\.pyc'),
-            re.compile(r'^node_modules/.*'),
-            re.compile(r'.*build/.*')
-        ]
+        patterns = IgnoreMatcher([])
+        patterns.add_patterns(['*.pyc', '/node_modules/', 'build/', '!keep.pyc'])
 
         self.assertTrue(should_ignore('file.pyc', patterns))
         self.assertTrue(should_ignore('node_modules/file.js', patterns))
         self.assertTrue(should_ignore('path/to/build/output.txt', patterns))
+        self.assertFalse(should_ignore('src/keep.pyc', patterns))
         self.assertFalse(should_ignore('src/main.py', patterns))
 
     @patch('os.walk')
@@ -77,7 +67,8 @@ project/
             ('/project/tests', [], ['test_main.py'])
         ]
 
-        ignore_patterns = [re.compile(r'.*\.gitignore')]
+        ignore_patterns = IgnoreMatcher(['.gitignore'])
+        ignore_patterns.gitignore_files.append('/project/.gitignore')
         structure = get_folder_structure('/project', ignore_patterns)
 
         self.assertIn('project/', structure)
@@ -93,13 +84,15 @@ project/
         with patch('builtins.open', mock_open(read_data=self.gitignore_content)):
             patterns, message = get_ignore_patterns('/fake/path')
 
-        self.assertEqual(len(patterns), 4)  # 3 from .gitignore + 1 for .git
+        self.assertTrue(patterns.is_ignored('lib/cache.pyc'))
+        self.assertTrue(patterns.is_ignored('.git', is_dir=True))
         self.assertIn("Using .gitignore patterns for file exclusion.", message)
 
         mock_exists.return_value = False
         patterns, message = get_ignore_patterns('/fake/path')
 
-        self.assertEqual(len(patterns), 6)  # Default patterns
+        self.assertFalse(patterns.is_ignored('lib/cache.pyc'))
+        self.assertTrue(patterns.is_ignored('node_modules', is_dir=True))
         self.assertIn(
             "No .gitignore found. Using default ignore patterns.", message)
 
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import shutil
+import tempfile
+
+from drd.metadata.context import ProjectContext, compact_entry, words
+from drd.metadata.project_metadata import ProjectMetadataManager
+
+
+def entry(path, summary, exports=()):
+    return {'path': path, 'type': 'python', 'summary': summary,
+            'exports': list(exports), 'imports': [], 'hash': 'abc', 'size': 10, 'mtime': 1.0}
+
+
+def sample_metadata():
+    key_files = [entry(f'src/widgets/widget{i}.py', f'Renders widget number {i} on the dashboard')
+                 for i in range(40)]
+    key_files += [
+        entry('src/auth/login.py', 'Handles user login', ['fun:authenticate_user']),
+        entry('src/billing/invoice.py', 'Creates invoices', ['class:InvoiceBuilder']),
+    ]
+    return {
+        'project_info': {'name': 'demo', 'description': 'Demo app'},
+        'environment': {'primary_language': 'python'},
+        'key_files': key_files,
+        'external_dependencies': ['flask'],
+        'dev_server': {'start_command': 'flask run'}
+    }
+
+
+class TestProjectContext(unittest.TestCase):
+
+    def test_words_split_identifiers(self):
+        self.assertEqual(words('fix the InvoiceBuilder in billing_utils.py'),
+                         {'fix', 'invoice', 'builder', 'billing', 'utils'})
+
+    def test_compact_entry_drops_internal_fields(self):
+        self.assertEqual(compact_entry(entry('a.py', 'A')), {'t': 'python', 's': 'A'})
+
+    def test_small_project_is_fully_detailed(self):
+        context = ProjectContext(sample_metadata()).render()
+        parsed = json.loads(context)
+
+        self.assertNotIn('\n', context)
+        self.assertEqual(parsed['project_info']['name'], 'demo')
+        self.assertEqual(parsed['files']['src/auth'], ['login.py'])
+        self.assertEqual(len(parsed['details']), 42)
+        self.assertEqual(parsed['details']['src/auth/login.py'],
+                         {'t': 'python', 's': 'Handles user login', 'e': ['fun:authenticate_user']})
+
+    def test_budget_keeps_relevant_files(self):
+        context = ProjectContext(sample_metadata())
+
+        rendered = context.render('Fix the invoice builder rounding', max_tokens=600)
+        parsed = json.loads(rendered)
+
+        self.assertLessEqual(len(rendered) // 4, 600)
+        details = list(parsed['details'])
+        self.assertEqual(details[0], 'src/billing/invoice.py')
+        self.assertLess(len(details), 42)
+        self.assertEqual(parsed['files']['src/billing'], ['invoice.py'])
+
+    def test_listing_collapses_irrelevant_directories(self):
+        parsed = json.loads(ProjectContext(sample_metadata()).render('login', max_tokens=300))
+
+        self.assertEqual(parsed['files']['src/widgets'], '40 files')
+        self.assertEqual(parsed['files']['src/auth'], ['login.py'])
+        self.assertIn('src/auth/login.py', parsed['details'])
+
+
+    def test_volatile_fields_are_left_out(self):
+        metadata = sample_metadata()
+        metadata['project_info']['last_updated'] = '2024-01-01T00:00:00'
+        first = ProjectContext(metadata).render('login')
+        metadata['project_info']['last_updated'] = '2024-06-01T12:00:00'
+        self.assertEqual(ProjectContext(metadata).render('login'), first)
+        self.assertNotIn('last_updated', first)
+        self.assertIn('"name":"demo"', first)
+
+
+class TestProjectContextCache(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.project_dir, 'drd.json'), 'w') as f:
+            json.dump(sample_metadata(), f)
+        self.manager = ProjectMetadataManager(self.project_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_serialization_is_reused_until_metadata_changes(self):
+        with patch('drd.metadata.project_metadata.ProjectContext',
+                   wraps=ProjectContext) as mock_context:
+            first = self.manager.get_project_context('login')
+            self.assertIs(self.manager.get_project_context('login'), first)
+            self.manager.get_project_context('invoice')
+            self.assertEqual(mock_context.call_count, 1)
+
+            self.manager.update_file_metadata(
+                'src/auth/login.py', 'python', None, 'Handles login and logout')
+            updated = self.manager.get_project_context('login')
+
+        self.assertEqual(mock_context.call_count, 2)
+        self.assertIn('Handles login and logout', updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
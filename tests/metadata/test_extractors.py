@@ -0,0 +1,132 @@
+import unittest
+
+from drd.metadata.extractors import (
+    extract_file_info, get_extractor, register_extractor, guess_file_type, EXTRACTORS
+)
+
+
+class TestExtractors(unittest.TestCase):
+
+    def test_python(self):
+        content = '''"""Helpers for the API layer.
+
+More detail here.
+"""
+import os
+from . import cache
+from ..utils.parser import parse_xml
+
+API_URL = "https://example.com"
+_private = 1
+
+
+class Client:
+    pass
+
+
+async def fetch(url):
+    import json
+    return url
+
+
+def _helper():
+    pass
+'''
+        info = extract_file_info('src/api/client.py', content)
+
+        self.assertEqual(info['type'], 'python')
+        self.assertEqual(info['exports'], ['var:API_URL', 'class:Client', 'fun:fetch'])
+        self.assertEqual(info['imports'], ['os', '.', '..utils.parser', 'json'])
+        self.assertEqual(info['summary'], 'Helpers for the API layer.')
+
+    def test_python_imports_limited_to_project_modules(self):
+        content = '''import os
+import requests
+import utils
+from drd.api import main
+from .models import User
+from app.views import index
+'''
+        project_files = {'src/drd/api/main.py', 'src/drd/api/__init__.py',
+                         'tools/utils.py', 'app/views.py'}
+        info = extract_file_info('tools/run.py', content, project_files)
+        self.assertEqual(info['imports'], ['utils', 'drd.api', '.models', 'app.views'])
+        # Without the file list nothing can be told apart
+        self.assertEqual(len(extract_file_info('tools/run.py', content)['imports']), 6)
+
+    def test_python_respects_dunder_all(self):
+        content = "__all__ = ['run', 'VERSION']\n\ndef run(): pass\n\ndef other(): pass\n"
+        info = extract_file_info('pkg/__init__.py', content)
+        self.assertEqual(info['exports'], ['fun:run', 'var:VERSION'])
+
+    def test_python_syntax_error_falls_back(self):
+        self.assertIsNone(extract_file_info('broken.py', 'def broken(:\n'))
+
+    def test_javascript_and_typescript(self):
+        content = '''import React from 'react';
+import { helper } from "./utils";
+const fs = require('fs');
+export default function Layout() {}
+export const PAGE_SIZE = 10;
+export class Store {}
+export interface Props {}
+export { helper as util, other };
+export * from './types';
+'''
+        info = extract_file_info('src/Layout.tsx', content)
+
+        self.assertEqual(info['type'], 'typescript')
+        self.assertEqual(info['exports'], [
+            'fun:Layout', 'class:Store', 'var:PAGE_SIZE', 'type:Props', 'var:util', 'var:other'])
+        self.assertEqual(info['imports'], ['react', './utils', 'fs', './types'])
+        self.assertEqual(extract_file_info('index.js', 'module.exports.run = 1')['exports'],
+                         ['var:run'])
+
+    def test_go(self):
+        content = '''package server
+
+import (
+    "fmt"
+    "net/http"
+)
+
+type Server struct{}
+
+func (s *Server) Start() {}
+func helper() {}
+func New() *Server { return nil }
+'''
+        info = extract_file_info('server.go', content)
+        self.assertEqual(info['exports'], ['fun:Start', 'fun:New', 'type:Server'])
+        self.assertEqual(info['imports'], ['fmt', 'net/http'])
+
+    def test_dependency_manifests(self):
+        package = extract_file_info(
+            'package.json', '{"description": "Web app", "dependencies": {"react": "^18.2.0"}}')
+        self.assertEqual(package['external_dependencies'], ['react@^18.2.0'])
+        self.assertEqual(package['summary'], 'Web app')
+
+        requirements = extract_file_info(
+            'requirements.txt', 'requests==2.31.0  # http\n-e .\n\nclick\n')
+        self.assertEqual(requirements['external_dependencies'], ['requests==2.31.0', 'click'])
+
+    def test_data_files_and_unknown_extensions(self):
+        self.assertEqual(extract_file_info('config.yml', 'a: 1'),
+                         {'type': 'yaml', 'exports': [], 'imports': []})
+        self.assertIsNone(extract_file_info('main.rb', 'puts 1'))
+        self.assertEqual(guess_file_type('main.rb'), 'rb')
+
+    def test_register_extractor(self):
+        @register_extractor('.rb')
+        def extract_ruby(path, content, project_files=None):
+            return {'type': 'ruby', 'exports': [], 'imports': []}
+
+        try:
+            self.assertIs(get_extractor('lib/main.RB'), extract_ruby)
+            self.assertEqual(extract_file_info('main.rb', '')['type'], 'ruby')
+        finally:
+            del EXTRACTORS['.rb']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from drd.metadata.file_resolver import FileResolver, AMBIGUOUS, RESOLVE_CONFIDENCE, normalize_reference
+from drd.metadata.project_metadata import ProjectMetadataManager
+
+FILES = [
+    'src/auth/login.py',
+    'src/billing/invoice.py',
+    'src/billing/utils.py',
+    'src/ui/utils.py',
+    'README.md',
+]
+KEY_FILES = [
+    {'path': 'src/billing/invoice.py', 'exports': ['class:InvoiceBuilder']},
+    {'path': 'src/auth/login.py', 'exports': ['fun:authenticate_user']},
+]
+
+
+class TestFileResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = FileResolver.from_project(FILES, KEY_FILES)
+
+    def test_exact_and_case_insensitive(self):
+        self.assertEqual(self.resolver.resolve('src/auth/login.py'), ('src/auth/login.py', 1.0))
+        path, confidence = self.resolver.resolve('SRC/Auth/Login.py')
+        self.assertEqual(path, 'src/auth/login.py')
+        self.assertGreaterEqual(confidence, RESOLVE_CONFIDENCE)
+
+    def test_moved_file_found_by_basename(self):
+        path, confidence = self.resolver.resolve('auth/invoice.py')
+        self.assertEqual(path, 'src/billing/invoice.py')
+        self.assertGreaterEqual(confidence, RESOLVE_CONFIDENCE)
+
+    def test_ambiguous_basename_uses_directories(self):
+        path, confidence = self.resolver.resolve('lib/ui/utils.py')
+        self.assertEqual(path, 'src/ui/utils.py')
+        self.assertGreaterEqual(confidence, RESOLVE_CONFIDENCE)
+
+        _, confidence = self.resolver.resolve('utils.py')
+        self.assertEqual(confidence, AMBIGUOUS)
+
+    def test_export_symbol(self):
+        path, confidence = self.resolver.resolve('InvoiceBuilder.py')
+        self.assertEqual(path, 'src/billing/invoice.py')
+        self.assertGreaterEqual(confidence, RESOLVE_CONFIDENCE)
+
+    def test_fuzzy_match(self):
+        path, confidence = self.resolver.resolve('src/billing/invioce.py')
+        self.assertEqual(path, 'src/billing/invoice.py')
+        self.assertGreaterEqual(confidence, RESOLVE_CONFIDENCE)
+
+    def test_weak_match_has_low_confidence(self):
+        _, confidence = self.resolver.resolve('src/payments.py')
+        self.assertLess(confidence, RESOLVE_CONFIDENCE)
+        self.assertEqual(self.resolver.resolve('completely_unrelated.txt'), (None, 0.0))
+
+    def test_normalize_reference(self):
+        self.assertEqual(normalize_reference(' ./src/app.py '), 'src/app.py')
+        self.assertEqual(normalize_reference('/project/src/app.py', '/project'), 'src/app.py')
+
+
+class TestResolveFile(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        for rel_path in FILES:
+            path = os.path.join(self.project_dir, rel_path)
+            os.makedirs(os.path.dirname(path) or self.project_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('pass\n')
+        self.manager = ProjectMetadataManager(self.project_dir)
+        self.manager.metadata['key_files'] = [dict(entry) for entry in KEY_FILES]
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_resolves_against_project_files(self):
+        self.assertEqual(self.manager.resolve_file('src/billing/invioce.py'), 'src/billing/invoice.py')
+        self.assertEqual(self.manager.resolve_file(
+            os.path.join(self.project_dir, 'src/Auth/login.py')), 'src/auth/login.py')
+        self.assertIsNone(self.manager.resolve_file('utils.py'))
+
+    def test_skips_stale_metadata_entries(self):
+        self.manager.metadata['key_files'].append(
+            {'path': 'src/old/report.py', 'exports': []})
+        self.assertIsNone(self.manager.resolve_file('report.py'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import patch, mock_open
+
+from drd.metadata.ignore import IgnoreMatcher, IgnoreRuleSet, translate_pattern
+
+
+class TestTranslatePattern(unittest.TestCase):
+
+    def test_skips_blank_lines_and_comments(self):
+        self.assertIsNone(translate_pattern('\n'))
+        self.assertIsNone(translate_pattern('# comment\n'))
+        self.assertEqual(translate_pattern('\\#literal\n').pattern, '\\#literal')
+
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        rule = translate_pattern('*.log')
+        self.assertTrue(rule.matches('app.log'))
+        self.assertTrue(rule.matches('logs/deep/app.log'))
+        self.assertFalse(rule.matches('app.log.txt'))
+
+    def test_slash_anchors_pattern(self):
+        rule = translate_pattern('/build')
+        self.assertTrue(rule.matches('build', is_dir=True))
+        self.assertFalse(rule.matches('src/build', is_dir=True))
+        self.assertTrue(translate_pattern('docs/*.md').matches('docs/index.md'))
+        self.assertFalse(translate_pattern('docs/*.md').matches('src/docs/index.md'))
+
+    def test_directory_only_pattern(self):
+        rule = translate_pattern('tmp/')
+        self.assertTrue(rule.matches('a/tmp', is_dir=True))
+        self.assertFalse(rule.matches('a/tmp'))
+
+    def test_double_star(self):
+        self.assertTrue(translate_pattern('**/foo').matches('foo'))
+        self.assertTrue(translate_pattern('**/foo').matches('a/b/foo'))
+        self.assertTrue(translate_pattern('a/**/b').matches('a/b'))
+        self.assertTrue(translate_pattern('a/**/b').matches('a/x/y/b'))
+        inside = translate_pattern('abc/**')
+        self.assertTrue(inside.matches('abc/x/y.txt'))
+        self.assertFalse(inside.matches('abc', is_dir=True))
+        self.assertFalse(translate_pattern('*.py').matches('a/b', is_dir=True))
+
+    def test_character_classes(self):
+        rule = translate_pattern('file[0-9].txt')
+        self.assertTrue(rule.matches('file1.txt'))
+        self.assertFalse(rule.matches('filea.txt'))
+        self.assertTrue(translate_pattern('file[!0-9].txt').matches('filea.txt'))
+
+
+class TestIgnoreRuleSet(unittest.TestCase):
+
+    def test_last_matching_rule_wins(self):
+        rules = IgnoreRuleSet(translate_pattern(p)
+                              for p in ['*.log', '!important.log', 'debug/important.log'])
+        self.assertTrue(rules.match('app.log'))
+        self.assertFalse(rules.match('important.log'))
+        self.assertTrue(rules.match('debug/important.log'))
+        self.assertIsNone(rules.match('main.py'))
+
+
+class TestIgnoreMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = IgnoreMatcher()
+
+    def test_default_patterns(self):
+        self.assertTrue(self.matcher.is_ignored('node_modules', is_dir=True))
+        self.assertTrue(self.matcher.is_ignored('web/node_modules/react/index.js'))
+        self.assertTrue(self.matcher.is_ignored('venv', is_dir=True))
+        self.assertTrue(self.matcher.is_ignored('.drd.json.a1b2c3.tmp'))
+        self.assertTrue(self.matcher.is_ignored('.drd.index.a1b2c3.tmp'))
+        self.assertTrue(self.matcher.is_ignored('drd.json'))
+        self.assertFalse(self.matcher.is_ignored('src/drd.json'))
+        self.assertFalse(self.matcher.is_ignored('src/modules.py'))
+
+    def test_nested_gitignore_is_scoped_to_its_directory(self):
+        self.matcher.add_patterns(['*.tmp'], base='sub')
+        self.assertTrue(self.matcher.is_ignored('sub/a.tmp'))
+        self.assertTrue(self.matcher.is_ignored('sub/deep/a.tmp'))
+        self.assertFalse(self.matcher.is_ignored('a.tmp'))
+        self.assertFalse(self.matcher.is_ignored('other/a.tmp'))
+
+    def test_deeper_gitignore_overrides_parent(self):
+        self.matcher.add_patterns(['*.log'])
+        self.matcher.add_patterns(['!keep.log'], base='sub')
+        self.assertTrue(self.matcher.is_ignored('app.log'))
+        self.assertFalse(self.matcher.is_ignored('sub/keep.log'))
+        self.assertTrue(self.matcher.is_ignored('sub/other.log'))
+
+    def test_cannot_reinclude_file_inside_ignored_directory(self):
+        self.matcher.add_patterns(['logs/', '!logs/keep.log'])
+        self.assertTrue(self.matcher.is_ignored('logs', is_dir=True))
+        self.assertTrue(self.matcher.is_ignored('logs/keep.log'))
+
+    def test_directory_decisions_are_cached_and_invalidated(self):
+        self.assertFalse(self.matcher.is_ignored('out', is_dir=True))
+        self.assertIn('out', self.matcher._dir_cache)
+        self.matcher.add_patterns(['out/'])
+        self.assertTrue(self.matcher.is_ignored('out', is_dir=True))
+
+    def test_project_rules_can_reinclude_default_patterns(self):
+        self.matcher.add_patterns(['!build/'])
+        self.assertFalse(self.matcher.is_ignored('build', is_dir=True))
+
+    def test_add_gitignore_reads_each_file_once(self):
+        with patch('builtins.open', mock_open(read_data='*.tmp\n')) as mocked:
+            self.matcher.add_gitignore('/project/.gitignore')
+            self.matcher.add_gitignore('/project/.gitignore')
+        mocked.assert_called_once()
+        self.assertTrue(self.matcher.is_ignored('a.tmp'))
+        self.assertEqual(self.matcher.gitignore_files, ['/project/.gitignore'])
+
+
+if __name__ == '__main__':
+    unittest.main()
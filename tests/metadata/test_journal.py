@@ -0,0 +1,54 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from drd.metadata.journal import MetadataJournal
+
+
+class TestMetadataJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.journal = MetadataJournal(
+            os.path.join(self.tmp_dir, 'drd.journal.jsonl'))
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip_later_records_win(self):
+        self.journal.record_sections({'project_info': {'name': 'demo'}})
+        self.journal.record_file({'path': 'a.py', 'summary': 'old'})
+        self.journal.record_file({'path': 'b.py', 'summary': 'B'})
+        self.journal.record_file({'path': 'a.py', 'summary': 'new'})
+
+        sections, entries = MetadataJournal(self.journal.path).load()
+
+        self.assertEqual(sections, {'project_info': {'name': 'demo'}})
+        self.assertEqual(list(entries), ['a.py', 'b.py'])
+        self.assertEqual(entries['a.py']['summary'], 'new')
+
+    def test_truncated_line_is_skipped(self):
+        self.journal.record_file({'path': 'a.py', 'summary': 'A'})
+        self.journal.close()
+        with open(self.journal.path, 'a') as f:
+            f.write('{"kind": "file", "entry": {"pa')
+
+        sections, entries = self.journal.load()
+
+        self.assertEqual(list(entries), ['a.py'])
+
+    def test_clear_removes_file(self):
+        self.assertEqual(self.journal.load(), ({}, {}))
+        self.journal.record_file({'path': 'a.py'})
+        self.assertTrue(self.journal.exists())
+
+        self.journal.clear()
+
+        self.assertFalse(self.journal.exists())
+        self.journal.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,16 @@
 import unittest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, mock_open, MagicMock, PropertyMock
 import os
 import sys
 import json
+import asyncio
+import shutil
+import tempfile
 from datetime import datetime
 
 # Assuming the project structure, adjust the import path as necessary
 from src.drd.metadata.project_metadata import ProjectMetadataManager
+from src.drd.api.cache import ResponseCache
 
 
 class TestProjectMetadataManager(unittest.TestCase):
@@ -70,7 +74,7 @@ class TestProjectMetadataManager(unittest.TestCase):
         self.assertFalse(self.manager.is_binary_file('script.py'))
         self.assertFalse(self.manager.is_binary_file('config.json'))
 
-    @patch('src.drd.metadata.project_metadata.call_dravid_api_with_pagination')
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
     @patch('builtins.open', new_callable=mock_open, read_data='print("Hello, World!")')
     async def test_analyze_file(self, mock_file, mock_api_call):
         mock_api_call.return_value = '''
@@ -110,3 +114,342 @@ class TestProjectMetadataManager(unittest.TestCase):
         self.assertEqual(metadata['environment']['primary_language'], 'python')
         self.assertEqual(len(metadata['key_files']), 1)
         self.assertEqual(metadata['key_files'][0]['path'], 'main.py')
+
+
+class TestIncrementalBuildMetadata(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        for name, content in [('main.py', 'print("main")'), ('utils.py', 'def util(): pass')]:
+            with open(os.path.join(self.project_dir, name), 'w') as f:
+                f.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def fake_analysis(self, file_path, fast=False):
+        return {
+            'path': os.path.relpath(file_path, self.project_dir),
+            'type': 'python',
+            'summary': f"Summary of {os.path.basename(file_path)}",
+            'exports': [],
+            'imports': []
+        }
+
+    async def build(self):
+        manager = ProjectMetadataManager(self.project_dir)
+        analyzed = []
+
+        def fake_analysis(file_path, fast=False, context=None):
+            analyzed.append(os.path.basename(file_path))
+            return self.fake_analysis(file_path)
+
+        with patch.object(ProjectMetadataManager, 'analyze_file', side_effect=fake_analysis), \
+                patch.object(ProjectMetadataManager, 'analyze_batch',
+                             side_effect=lambda paths, context=None: [fake_analysis(p) for p in paths]):
+            metadata = await manager.build_metadata(MagicMock())
+        manager.save_metadata()
+        return metadata, analyzed
+
+    async def test_records_fingerprints(self):
+        metadata, analyzed = await self.build()
+
+        self.assertEqual(sorted(analyzed), ['main.py', 'utils.py'])
+        entry = next(f for f in metadata['key_files']
+                     if f['path'] == 'main.py')
+        self.assertEqual(entry['size'], len('print("main")'))
+        self.assertIn('hash', entry)
+        self.assertIn('mtime', entry)
+
+    async def test_reinit_only_analyzes_changed_files(self):
+        await self.build()
+        with open(os.path.join(self.project_dir, 'utils.py'), 'w') as f:
+            f.write('def util(): return 1')
+        with open(os.path.join(self.project_dir, 'new.py'), 'w') as f:
+            f.write('NEW = True')
+        os.remove(os.path.join(self.project_dir, 'main.py'))
+
+        metadata, analyzed = await self.build()
+
+        self.assertEqual(sorted(analyzed), ['new.py', 'utils.py'])
+        self.assertEqual(sorted(f['path'] for f in metadata['key_files']), [
+                         'new.py', 'utils.py'])
+
+    async def test_touched_but_identical_file_is_reused(self):
+        await self.build()
+        path = os.path.join(self.project_dir, 'main.py')
+        os.utime(path, (0, 0))
+
+        metadata, analyzed = await self.build()
+
+        self.assertNotIn('main.py', analyzed)
+        entry = next(f for f in metadata['key_files']
+                     if f['path'] == 'main.py')
+        self.assertEqual(entry['mtime'], 0)
+
+    async def test_files_are_analyzed_concurrently(self):
+        for i in range(8):
+            with open(os.path.join(self.project_dir, f'module{i}.py'), 'w') as f:
+                f.write(f'VALUE = {i}')
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_analysis(file_path, fast=False, context=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return self.fake_analysis(file_path)
+
+        manager = ProjectMetadataManager(self.project_dir)
+        loader = MagicMock()
+        # Every file is its own LLM call when nothing counts as small
+        with patch.object(ProjectMetadataManager, 'analyze_file', side_effect=slow_analysis), \
+                patch('src.drd.metadata.batching.SMALL_FILE_TOKENS', 0):
+            metadata = await manager.build_metadata(loader)
+
+        self.assertGreater(max_in_flight, 1)
+        self.assertEqual(len(metadata['key_files']), 10)
+        self.assertEqual(loader.message, "Analyzing files (10/10)")
+
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_fast_mode_skips_llm(self, mock_api_call):
+        with open(os.path.join(self.project_dir, 'main.py'), 'w') as f:
+            f.write('import os\nimport utils\nutils.util()\n')
+        manager = ProjectMetadataManager(self.project_dir)
+        metadata = await manager.build_metadata(MagicMock(), fast=True)
+
+        mock_api_call.assert_not_called()
+        utils_entry = next(f for f in metadata['key_files'] if f['path'] == 'utils.py')
+        self.assertEqual(utils_entry['type'], 'python')
+        self.assertEqual(utils_entry['exports'], ['fun:util'])
+        self.assertEqual(utils_entry['analysis'], 'local')
+        main_entry = next(f for f in metadata['key_files'] if f['path'] == 'main.py')
+        self.assertEqual(main_entry['imports'], ['utils'])
+
+        mock_api_call.return_value = '''<response>
+          <metadata><path>main.py</path><type>python</type><summary>Entry point</summary>
+            <exports>None</exports><imports>None</imports></metadata>
+          <metadata><path>utils.py</path><type>python</type><summary>Utilities</summary>
+            <exports>None</exports><imports>None</imports></metadata>
+        </response>'''
+        metadata = await manager.build_metadata(MagicMock())
+
+        self.assertEqual(mock_api_call.await_count, 1)
+        utils_entry = next(f for f in metadata['key_files'] if f['path'] == 'utils.py')
+        self.assertEqual(utils_entry['summary'], 'Utilities')
+        self.assertNotIn('analysis', utils_entry)
+
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_small_files_share_one_llm_call(self, mock_api_call):
+        with open(os.path.join(self.project_dir, 'settings.cfg'), 'w') as f:
+            f.write('[main]\ndebug = true')
+        mock_api_call.side_effect = [
+            '''<response>
+              <metadata><path>settings.cfg</path><type>ini</type><summary>Settings</summary>
+                <exports>None</exports><imports>None</imports></metadata>
+              <metadata><path>main.py</path><type>text</type><summary>Entry point</summary>
+                <exports>None</exports><imports>None</imports></metadata>
+            </response>''',
+            '<response><metadata><summary>Utilities</summary></metadata></response>'
+        ]
+        manager = ProjectMetadataManager(self.project_dir)
+        with patch.object(manager, 'get_project_context',
+                          wraps=manager.get_project_context) as mock_context:
+            metadata = await manager.build_metadata(MagicMock())
+
+        # One batch call, plus a single-file retry for utils.py which the response skipped
+        self.assertEqual(mock_api_call.await_count, 2)
+        # Both prompts share a context rendered once for the run
+        mock_context.assert_called_once_with()
+        prompt = mock_api_call.call_args_list[0].args[0]
+        self.assertEqual(prompt.count('Current folder structure:'), 1)
+        entries = {f['path']: f for f in metadata['key_files']}
+        self.assertEqual(entries['settings.cfg']['summary'], 'Settings')
+        # Locally extracted fields win over the LLM's
+        self.assertEqual(entries['main.py']['type'], 'python')
+        self.assertEqual(entries['utils.py']['summary'], 'Utilities')
+
+    async def test_interrupted_build_is_resumed_from_journal(self):
+        manager = ProjectMetadataManager(self.project_dir)
+
+        def interrupted_analysis(file_path, fast=False, context=None):
+            if file_path.endswith('utils.py'):
+                raise RuntimeError("interrupted")
+            return self.fake_analysis(file_path)
+
+        with patch.object(ProjectMetadataManager, 'analyze_file', side_effect=interrupted_analysis), \
+                patch('src.drd.metadata.batching.SMALL_FILE_TOKENS', 0):
+            with self.assertRaises(RuntimeError):
+                await manager.build_metadata(MagicMock(), checkpoint=True)
+        manager.journal.close()
+        self.assertFalse(os.path.exists(manager.metadata_file))
+
+        # Partial results are visible to other readers while init is incomplete
+        resumed = ProjectMetadataManager(self.project_dir)
+        self.assertEqual([f['path'] for f in resumed.metadata['key_files']], ['main.py'])
+
+        analyzed = []
+
+        def fake_analysis(file_path, fast=False, context=None):
+            analyzed.append(os.path.basename(file_path))
+            return self.fake_analysis(file_path)
+
+        with patch.object(ProjectMetadataManager, 'analyze_file', side_effect=fake_analysis):
+            metadata = await resumed.build_metadata(MagicMock(), checkpoint=True)
+
+        self.assertEqual(analyzed, ['utils.py'])
+        self.assertEqual([f['path'] for f in metadata['key_files']], ['main.py', 'utils.py'])
+        resumed.journal.clear()
+
+    async def test_journal_is_not_written_without_checkpoint(self):
+        manager = ProjectMetadataManager(self.project_dir)
+        await self.build()
+        self.assertFalse(manager.journal.exists())
+
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_generated_and_binary_files_skip_llm(self, mock_api_call):
+        with open(os.path.join(self.project_dir, 'yarn.lock'), 'w') as f:
+            f.write('# yarn lockfile v1\n')
+        with open(os.path.join(self.project_dir, 'data.bin.txt'), 'wb') as f:
+            f.write(b'\0\1\2\3' * 100)
+        manager = ProjectMetadataManager(self.project_dir)
+
+        lock_entry = await manager.analyze_file(os.path.join(self.project_dir, 'yarn.lock'))
+        self.assertTrue(manager.is_binary_file(os.path.join(self.project_dir, 'data.bin.txt')))
+        self.assertFalse(manager.is_binary_file(os.path.join(self.project_dir, 'main.py')))
+
+        mock_api_call.assert_not_called()
+        self.assertEqual(lock_entry['summary'], 'Generated file (lockfile)')
+        self.assertTrue(lock_entry['generated'])
+
+    @patch('src.drd.metadata.sniffing.MAX_ANALYSIS_BYTES', 2000)
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_large_file_is_described_from_excerpt(self, mock_api_call):
+        with open(os.path.join(self.project_dir, 'big.py'), 'w') as f:
+            f.write(''.join(f"VALUE_{i} = {i}\n" for i in range(2000)))
+        mock_api_call.return_value = '''<response><metadata><type>python</type>
+          <summary>Constants</summary><exports>None</exports><imports>None</imports>
+        </metadata></response>'''
+        manager = ProjectMetadataManager(self.project_dir)
+
+        file_info = await manager.analyze_file(os.path.join(self.project_dir, 'big.py'))
+
+        prompt = mock_api_call.call_args.args[0]
+        self.assertIn('lines omitted; file has 2000 lines', prompt)
+        self.assertNotIn('VALUE_1000 = 1000', prompt)
+        self.assertEqual(file_info['summary'], 'Constants')
+
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_analyze_file_uses_async_api(self, mock_api_call):
+        mock_api_call.return_value = '''
+        <response>
+          <metadata>
+            <type>python</type>
+            <summary>Prints main</summary>
+            <exports>None</exports>
+            <imports>None</imports>
+          </metadata>
+        </response>
+        '''
+        manager = ProjectMetadataManager(self.project_dir)
+        file_info = await manager.analyze_file(os.path.join(self.project_dir, 'main.py'))
+
+        mock_api_call.assert_awaited_once()
+        self.assertEqual(file_info['path'], 'main.py')
+        self.assertEqual(file_info['summary'], 'Prints main')
+
+    @patch('src.drd.metadata.project_metadata.async_call_dravid_api_with_pagination')
+    async def test_unchanged_file_is_answered_from_cache(self, mock_api_call):
+        mock_api_call.return_value = """<response><metadata><type>python</type>
+          <summary>Prints main</summary><exports>None</exports><imports>None</imports>
+        </metadata></response>"""
+        main_path = os.path.join(self.project_dir, 'main.py')
+        cache = ResponseCache(os.path.join(self.project_dir, '.drd', 'cache'))
+        with patch('src.drd.api.main.get_response_cache', return_value=cache):
+            manager = ProjectMetadataManager(self.project_dir)
+            await manager.analyze_file(main_path)
+            manager.metadata['project_info']['last_updated'] = '2000-01-01T00:00:00'
+            manager.save_metadata()
+
+            # A later run sees another last_updated, but sends the same prompt
+            rerun = ProjectMetadataManager(self.project_dir)
+            with patch.object(ProjectMetadataManager, 'rate_limiter',
+                              new_callable=PropertyMock) as mock_limiter:
+                file_info = await rerun.analyze_file(main_path)
+
+        mock_api_call.assert_awaited_once()
+        mock_limiter.assert_not_called()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(file_info['summary'], 'Prints main')
+
+
+class TestMetadataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        self.manager = ProjectMetadataManager(self.project_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def saved_metadata(self):
+        with open(self.manager.metadata_file) as f:
+            return json.load(f)
+
+    def test_file_index_tracks_updates_and_removals(self):
+        self.manager.update_file_metadata('a.py', 'python', '', 'A')
+        self.manager.update_file_metadata('b.py', 'python', '', 'B')
+        self.manager.update_file_metadata('a.py', 'python', '', 'A2')
+
+        self.assertEqual(self.manager.get_file_metadata('a.py')['summary'], 'A2')
+        self.assertEqual(len(self.manager.metadata['key_files']), 2)
+
+        self.manager.remove_file_metadata('a.py')
+        self.assertIsNone(self.manager.get_file_metadata('a.py'))
+        self.assertEqual([f['path'] for f in self.saved_metadata()['key_files']], ['b.py'])
+
+    def test_file_index_follows_replaced_key_files(self):
+        self.manager.get_file_metadata('a.py')
+        self.manager.metadata['key_files'] = [{'path': 'c.py', 'summary': 'C'}]
+        self.assertEqual(self.manager.get_file_metadata('c.py')['summary'], 'C')
+
+    def test_batch_coalesces_saves(self):
+        with patch.object(self.manager, '_write_metadata',
+                          wraps=self.manager._write_metadata) as mock_write:
+            with self.manager.batch():
+                for i in range(5):
+                    self.manager.update_file_metadata(f"f{i}.py", 'python', '', 'x')
+                with self.manager.batch():
+                    self.manager.add_external_dependency('requests')
+                mock_write.assert_not_called()
+
+        mock_write.assert_called_once()
+        self.assertEqual(len(self.saved_metadata()['key_files']), 5)
+
+    def test_batch_does_not_write_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.update_file_metadata('a.py', 'python', '', 'A')
+                raise RuntimeError("boom")
+
+        self.assertFalse(os.path.exists(self.manager.metadata_file))
+        self.manager.save_metadata()
+        self.assertTrue(os.path.exists(self.manager.metadata_file))
+
+    def test_interrupted_save_keeps_previous_file(self):
+        self.manager.update_file_metadata('a.py', 'python', '', 'A')
+        self.manager.metadata['broken'] = object()
+
+        with self.assertRaises(TypeError):
+            self.manager.save_metadata()
+
+        self.assertEqual(self.saved_metadata()['key_files'][0]['path'], 'a.py')
+        self.assertEqual(os.listdir(self.project_dir), ['drd.json'])
+
+    def test_save_keeps_file_mode(self):
+        self.manager.update_file_metadata('a.py', 'python', '', 'A')
+        os.chmod(self.manager.metadata_file, 0o644)
+        self.manager.update_file_metadata('b.py', 'python', '', 'B')
+        self.assertEqual(os.stat(self.manager.metadata_file).st_mode & 0o777, 0o644)
@@ -1,17 +1,19 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import asyncio
 import time
 import logging
-import xml.etree.ElementTree as ET
+import httpx
 
 from drd.metadata.rate_limit_handler import (
     RateLimiter,
-    process_single_file,
-    process_files,
+    run_worker_pool,
     MAX_CONCURRENT_REQUESTS,
     MAX_CALLS_PER_MINUTE,
-    RATE_LIMIT_PERIOD
+    RATE_LIMIT_PERIOD,
+    get_throttle_delay,
+    get_rate_limit_config,
+    get_rate_limiter
 )
 
 logging.basicConfig(level=logging.DEBUG)
@@ -47,66 +49,171 @@ class TestRateLimitHandler(unittest.IsolatedAsyncioTestCase):
         # Check that the total time is at least 1 second (allowing some margin for error)
         self.assertGreater(total_time, 0.9)
 
-    @patch('drd.metadata.rate_limit_handler.call_dravid_api_with_pagination')
-    @patch('drd.metadata.rate_limit_handler.extract_and_parse_xml')
-    async def test_process_single_file(self, mock_extract_xml, mock_call_api):
-        mock_call_api.return_value = "<response><type>python</type><summary>A test file</summary><exports>test_function</exports><imports>os,sys</imports></response>"
-        mock_root = ET.fromstring(mock_call_api.return_value)
-        mock_extract_xml.return_value = mock_root
-
-        result = await process_single_file("test.py", "print('Hello')", "Test project", {"test.py": "file"})
-
-        self.assertEqual(result, ("test.py", "python",
-                         "A test file", "test_function", "os,sys"))
-        mock_call_api.assert_called_once()
-        mock_extract_xml.assert_called_once_with(mock_call_api.return_value)
-
-    @patch('drd.metadata.rate_limit_handler.call_dravid_api_with_pagination')
-    @patch('drd.metadata.rate_limit_handler.extract_and_parse_xml')
-    async def test_process_single_file_error(self, mock_extract_xml, mock_call_api):
-        mock_call_api.side_effect = Exception("API Error")
-
-        result = await process_single_file("test.py", "print('Hello')", "Test project", {"test.py": "file"})
-
-        self.assertEqual(result[0], "test.py")
-        self.assertEqual(result[1], "unknown")
-        self.assertTrue(result[2].startswith("Error:"))
-        self.assertEqual(result[3], "")
-
-    @patch('drd.metadata.rate_limit_handler.process_single_file')
-    async def test_process_files(self, mock_process_single_file):
-        mock_process_single_file.side_effect = [
-            ("file1.py", "python", "File 1", "func1"),
-            ("file2.py", "python", "File 2", "func2")
-        ]
-
-        files = [("file1.py", "content1"), ("file2.py", "content2")]
-        project_context = "Test project"
-        folder_structure = {"file1.py": "file", "file2.py": "file"}
-
-        results = await process_files(files, project_context, folder_structure)
-
-        self.assertEqual(len(results), 2)
-        self.assertEqual(results[0], ("file1.py", "python", "File 1", "func1"))
-        self.assertEqual(results[1], ("file2.py", "python", "File 2", "func2"))
-
-    @patch('drd.metadata.rate_limit_handler.process_single_file')
-    async def test_process_files_concurrency(self, mock_process_single_file):
-        async def slow_process(*args):
-            await asyncio.sleep(0.1)
-            return ("file.py", "python", "Slow file", "func")
-
-        mock_process_single_file.side_effect = slow_process
-
-        files = [("file.py", "content")] * 20  # 20 files
-        project_context = "Test project"
-        folder_structure = {"file.py": "file"}
+    async def test_slow_item_does_not_stall_other_workers(self):
+        async def worker(name):
+            await asyncio.sleep(0.3 if name == "slow.py" else 0.1)
+            return name
 
+        names = ["slow.py"] + [f"file{i}.py" for i in range(18)]
         start_time = time.time()
-        await process_files(files, project_context, folder_structure)
-        end_time = time.time()
+        completed = [result async for _, result in run_worker_pool(names, worker, workers=10)]
+        elapsed = time.time() - start_time
+
+        # Lockstep batches of 10 would need 0.3s + 0.1s
+        self.assertLess(elapsed, 0.37)
+        self.assertEqual(sorted(completed), sorted(names))
+        self.assertEqual(completed[-1], "slow.py")
+
+    async def test_worker_pool_propagates_errors(self):
+        async def worker(item):
+            if item == 2:
+                raise ValueError("boom")
+            return item
+
+        with self.assertRaises(ValueError):
+            async for _ in run_worker_pool([1, 2, 3], worker, workers=2):
+                pass
+
+    async def test_worker_pool_pulls_items_lazily(self):
+        pulled = []
+        in_flight_at_pull = []
+        in_flight = 0
+
+        def items():
+            for i in range(10):
+                pulled.append(i)
+                in_flight_at_pull.append(in_flight)
+                yield i
+
+        async def worker(item):
+            nonlocal in_flight
+            in_flight += 1
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return item * 2
+
+        results = [result async for _, result in run_worker_pool(items(), worker, workers=3)]
 
-        # With MAX_CONCURRENT_REQUESTS = 10, it should take about 0.2 seconds
-        # (2 batches of 10 files, each taking 0.1 seconds)
-        # Allow some margin for error
-        self.assertLess(end_time - start_time, 0.3)
+        self.assertEqual(sorted(results), [i * 2 for i in range(10)])
+        self.assertLessEqual(max(in_flight_at_pull), 2)
+
+
+def throttle_error(status=429, headers=None):
+    request = httpx.Request('POST', 'https://api.example.com')
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("throttled", request=request, response=response)
+
+
+class TestAdaptiveRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_token_budget_delays_calls(self):
+        limiter = RateLimiter(100, 0.3, max_tokens=100)
+        start = time.monotonic()
+        await limiter.acquire(60)
+        await limiter.acquire(60)
+        self.assertGreater(time.monotonic() - start, 0.25)
+
+    async def test_oversized_request_is_not_blocked_forever(self):
+        limiter = RateLimiter(100, 0.3, max_tokens=100)
+        start = time.monotonic()
+        await limiter.acquire(500)
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    async def test_output_tokens_count_against_budget(self):
+        limiter = RateLimiter(100, 60, max_tokens=1000)
+
+        async def respond():
+            return "x" * 400
+
+        await limiter.call(respond, tokens=10)
+        self.assertEqual(limiter.token_total, 10 + 101)
+
+    async def test_limits_calls_in_flight(self):
+        limiter = RateLimiter(100, 60, max_concurrency=2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow():
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+
+        await asyncio.gather(*[limiter.call(slow) for _ in range(6)])
+        self.assertEqual(max_in_flight, 2)
+
+    async def test_backs_off_and_halves_concurrency_when_throttled(self):
+        limiter = RateLimiter(100, 60, max_concurrency=8)
+        responses = [throttle_error(headers={'retry-after': '0.2'}), "ok"]
+
+        async def flaky():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        start = time.monotonic()
+        with patch('drd.metadata.rate_limit_handler.print_warning'):
+            result = await limiter.call(flaky)
+
+        self.assertEqual(result, "ok")
+        self.assertGreater(time.monotonic() - start, 0.15)
+        self.assertLess(limiter.concurrency, 5)
+
+        limiter.on_success()
+        self.assertGreater(limiter.concurrency, 4)
+
+    async def test_gives_up_after_max_retries(self):
+        limiter = RateLimiter(100, 60, max_retries=1)
+        calls = 0
+
+        async def always_throttled():
+            nonlocal calls
+            calls += 1
+            raise throttle_error(529, {'retry-after': '0'})
+
+        with patch('drd.metadata.rate_limit_handler.print_warning'):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await limiter.call(always_throttled)
+        self.assertEqual(calls, 2)
+
+    async def test_other_errors_are_not_retried(self):
+        limiter = RateLimiter(100, 60)
+
+        async def broken():
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            await limiter.call(broken)
+        self.assertEqual(len(limiter.calls), 1)
+
+
+class TestRateLimitConfig(unittest.TestCase):
+
+    def test_get_throttle_delay(self):
+        self.assertEqual(get_throttle_delay(
+            throttle_error(headers={'retry-after': '2'})), (True, 2.0))
+        self.assertEqual(get_throttle_delay(
+            throttle_error(headers={'retry-after-ms': '1500'})), (True, 1.5))
+        self.assertEqual(get_throttle_delay(throttle_error(503)), (True, None))
+        self.assertEqual(get_throttle_delay(throttle_error(400)), (False, None))
+        self.assertEqual(get_throttle_delay(ValueError()), (False, None))
+
+    @patch.dict('os.environ', {'DRAVID_CLAUDE_TOKENS_PER_MINUTE': '40000',
+                               'DRAVID_REQUESTS_PER_MINUTE': '50'}, clear=False)
+    def test_config_from_env_and_drd_json(self):
+        config = get_rate_limit_config('claude', {
+            'claude': {'requests_per_minute': 5, 'max_concurrent_requests': 3}})
+        self.assertEqual(config, {
+            'requests_per_minute': 50,
+            'tokens_per_minute': 40000,
+            'max_concurrent_requests': 3,
+        })
+
+    @patch.dict('os.environ', {'DRAVID_LLM': 'openai'}, clear=False)
+    def test_limiter_is_shared_per_provider_and_config(self):
+        self.assertIs(get_rate_limiter(), get_rate_limiter())
+        limited = get_rate_limiter({'openai': {'tokens_per_minute': 1000}})
+        self.assertEqual(limited.max_tokens, 1000)
+        self.assertIsNot(limited, get_rate_limiter())
@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+
+from drd.metadata.scanner import scan_project
+
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        self.write('.gitignore', '*.log\n')
+        self.write('README.md', '# readme')
+        self.write('app.log', 'log')
+        self.write('src/main.py', 'print("main")')
+        self.write('src/.gitignore', 'generated.py\n')
+        self.write('src/generated.py', 'GENERATED = True')
+        self.write('node_modules/pkg/index.js', 'module.exports = {}')
+        self.write('.git/HEAD', 'ref: refs/heads/main')
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def write(self, rel_path, content):
+        path = os.path.join(self.project_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_collects_files_and_gitignores_in_one_pass(self):
+        scan = scan_project(self.project_dir)
+
+        self.assertEqual(sorted(scan.files), [
+            '.gitignore', 'README.md',
+            os.path.join('src', '.gitignore'), os.path.join('src', 'main.py')])
+        self.assertEqual(sorted(scan.gitignore_files), [
+            '.gitignore', os.path.join('src', '.gitignore')])
+        self.assertIn(os.path.join('src', 'generated.py'),
+                      scan.ignore_patterns)
+
+    def test_prunes_ignored_directories(self):
+        visited = []
+        real_walk = os.walk
+
+        def recording_walk(top):
+            for root, dirs, files in real_walk(top):
+                visited.append(os.path.relpath(root, self.project_dir))
+                yield root, dirs, files
+
+        with patch('drd.metadata.scanner.os.walk', side_effect=recording_walk):
+            scan_project(self.project_dir)
+
+        self.assertEqual(sorted(visited), ['.', 'src'])
+
+    def test_builds_directory_structure_and_tree(self):
+        scan = scan_project(self.project_dir)
+
+        self.assertEqual(scan.directory_structure['directories'], ['src'])
+        self.assertEqual(sorted(scan.directory_structure['src']['files']), [
+                         '.gitignore', 'main.py'])
+        self.assertIn(f"{os.path.basename(self.project_dir)}/",
+                      scan.folder_structure)
+        self.assertIn('    src/', scan.folder_structure)
+        self.assertIn('        main.py', scan.folder_structure)
+        self.assertNotIn('node_modules', scan.folder_structure)
+
+    def test_nested_gitignore_can_reinclude_files(self):
+        self.write('src/.gitignore', 'generated.py\n')
+        self.write('src/keep.log', 'kept')
+        self.write('src/.gitignore', '!keep.log\n')
+
+        scan = scan_project(self.project_dir)
+
+        self.assertIn(os.path.join('src', 'keep.log'), scan.files)
+        self.assertNotIn('app.log', scan.files)
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import shutil
+import tempfile
+
+from drd.metadata.search_index import SearchIndex, entry_terms
+from drd.metadata.project_metadata import ProjectMetadataManager
+
+
+def entry(path, summary, exports=(), imports=()):
+    return {'path': path, 'type': 'python', 'summary': summary,
+            'exports': list(exports), 'imports': list(imports)}
+
+
+KEY_FILES = [
+    entry('src/auth/login.py', 'Handles user login and sessions', ['fun:authenticate_user']),
+    entry('src/billing/invoice.py', 'Creates invoices for customers', ['class:InvoiceBuilder']),
+    entry('src/billing/tax.py', 'Tax rates used by invoices', ['fun:tax_rate']),
+    entry('src/ui/dashboard.py', 'Dashboard page', imports=['src.billing.invoice']),
+]
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'drd.index.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_entry_terms_weight_fields(self):
+        terms = entry_terms(KEY_FILES[1])
+        self.assertEqual(terms['billing'], 3)
+        self.assertEqual(terms['builder'], 2)
+        self.assertEqual(terms['customers'], 1)
+
+    def test_ranks_by_relevance(self):
+        index = SearchIndex(self.path)
+        index.sync(KEY_FILES)
+
+        results = [path for path, _ in index.search('Fix rounding in the InvoiceBuilder')]
+
+        self.assertEqual(results[0], 'src/billing/invoice.py')
+        self.assertNotIn('src/auth/login.py', results)
+        self.assertEqual(index.search('kubernetes'), [])
+
+    def test_persists_and_updates_incrementally(self):
+        index = SearchIndex(self.path)
+        self.assertTrue(index.sync(KEY_FILES))
+        self.assertFalse(index.sync(KEY_FILES))
+
+        reloaded = SearchIndex(self.path)
+        with patch('drd.metadata.search_index.entry_terms', wraps=entry_terms) as mock_terms:
+            updated = KEY_FILES[:3] + [entry('src/ui/dashboard.py', 'Shows login history')]
+            self.assertTrue(reloaded.sync(updated))
+        mock_terms.assert_called_once()
+
+        self.assertEqual(reloaded.search('history')[0][0], 'src/ui/dashboard.py')
+        reloaded.sync(KEY_FILES[:1])
+        self.assertEqual(reloaded.search('invoices'), [])
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f)['docs']), ['src/auth/login.py'])
+
+    def test_corrupt_index_is_rebuilt(self):
+        with open(self.path, 'w') as f:
+            f.write('{"version": 1, "docs": ')
+        index = SearchIndex(self.path)
+        index.sync(KEY_FILES)
+        self.assertEqual(index.search('login')[0][0], 'src/auth/login.py')
+
+
+class TestFindRelevantFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        self.manager = ProjectMetadataManager(self.project_dir)
+        self.manager.metadata['key_files'] = [dict(e) for e in KEY_FILES]
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_index_follows_metadata_changes(self):
+        self.assertEqual(self.manager.find_relevant_files('user login', limit=1),
+                         ['src/auth/login.py'])
+        self.assertTrue(os.path.exists(os.path.join(self.project_dir, 'drd.index.json')))
+
+        self.manager.update_file_metadata(
+            'src/ui/dashboard.py', 'python', None, 'Charts of revenue')
+        self.assertEqual(self.manager.find_relevant_files('revenue charts'),
+                         ['src/ui/dashboard.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
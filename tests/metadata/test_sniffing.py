@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+
+from drd.metadata.sniffing import (
+    looks_binary,
+    generated_reason,
+    excerpt_lines,
+    excerpt_text,
+    read_for_analysis
+)
+
+
+class TestSniffing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_looks_binary(self):
+        self.assertTrue(looks_binary(b'\x89PNG\r\n\x1a\n\0\0\0\rIHDR'))
+        self.assertTrue(looks_binary(bytes(range(1, 32)) * 10))
+        self.assertFalse(looks_binary(b'#!/bin/sh\necho "hi"\n'))
+        self.assertFalse(looks_binary(b''))
+        # A multi-byte character cut off at the end of the sniff window
+        self.assertFalse(looks_binary('café'.encode('utf-8')[:-1]))
+        self.assertTrue(looks_binary(b'\xff\xfe' + b'abc' * 10))
+
+    def test_generated_reason(self):
+        self.assertEqual(generated_reason('web/package-lock.json', b'{}'), 'lockfile')
+        self.assertIsNotNone(generated_reason('dist/app.min.js', b''))
+        self.assertIsNotNone(generated_reason('api/user_pb2.py', b''))
+        self.assertEqual(generated_reason(
+            'api.go', b'// Code generated by protoc-gen-go. DO NOT EDIT.\npackage api\n'),
+            'marked as generated')
+        self.assertEqual(generated_reason('bundle.js', b'var a=1;' * 500), 'minified')
+        self.assertIsNone(generated_reason('app.py', b'import os\n\ndef main():\n    pass\n' * 100))
+
+    def test_excerpt_keeps_head_outline_and_tail(self):
+        lines = [f"line {i}\n" for i in range(1, 1001)]
+        lines[499] = "def middle():\n"
+
+        with patch('drd.metadata.sniffing.EXCERPT_LINES', 10):
+            excerpt = excerpt_lines(iter(lines))
+
+        self.assertTrue(excerpt.startswith(''.join(lines[:10])))
+        self.assertIn("[980 lines omitted; file has 1000 lines]", excerpt)
+        self.assertIn("500: def middle():", excerpt)
+        self.assertTrue(excerpt.endswith(''.join(lines[-10:])))
+        self.assertNotIn("line 500\n", excerpt)
+
+    def test_small_content_is_not_excerpted(self):
+        self.assertEqual(excerpt_text("short"), ("short", False))
+
+        path = os.path.join(self.tmp_dir, 'small.py')
+        with open(path, 'w') as f:
+            f.write("x = 1\n")
+        self.assertEqual(read_for_analysis(path), ("x = 1\n", False))
+
+    def test_large_file_is_excerpted(self):
+        path = os.path.join(self.tmp_dir, 'dump.sql')
+        with open(path, 'w') as f:
+            for i in range(5000):
+                f.write(f"INSERT INTO users VALUES ({i}, 'user{i}');\n")
+
+        with patch('drd.metadata.sniffing.MAX_ANALYSIS_BYTES', 10000):
+            content, excerpted = read_for_analysis(path)
+
+        self.assertTrue(excerpted)
+        self.assertLess(len(content), 10000)
+        self.assertIn("(4999, 'user4999')", content)
+
+
+if __name__ == '__main__':
+    unittest.main()
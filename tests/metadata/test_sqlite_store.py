@@ -0,0 +1,151 @@
+import unittest
+import unittest.mock
+import os
+import json
+import shutil
+import tempfile
+
+from drd.metadata.sqlite_store import SqliteMetadataStore
+from drd.metadata.project_metadata import ProjectMetadataManager
+from drd.metadata.context import ProjectContext
+
+
+def sample_metadata():
+    return {
+        "project_info": {"name": "demo", "last_updated": "2024-01-01T00:00:00"},
+        "environment": {"primary_language": "python"},
+        "directory_structure": {},
+        "key_files": [
+            {"path": "app.py", "type": "python", "summary": "App",
+             "exports": ["create_app", " run"], "imports": []},
+            {"path": "web/index.js", "type": "javascript", "summary": "Entry",
+             "exports": ["render"], "imports": []}
+        ],
+        "external_dependencies": ["flask"],
+        "dev_server": {"start_command": "flask run"}
+    }
+
+
+class TestSqliteMetadataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SqliteMetadataStore(
+            os.path.join(self.tmp_dir, '.drd', 'metadata.db'))
+        self.store.import_metadata(sample_metadata())
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trips_drd_json_layout(self):
+        exported = self.store.export_metadata()
+        self.assertEqual(exported, sample_metadata())
+        self.assertEqual(list(exported), list(sample_metadata()))
+
+    def test_indexed_lookups(self):
+        self.assertEqual(self.store.get_file('app.py')['summary'], 'App')
+        self.assertIsNone(self.store.get_file('missing.py'))
+        self.assertEqual([f['path'] for f in self.store.get_files('javascript')],
+                         ['web/index.js'])
+        self.assertEqual([f['path'] for f in self.store.find_exporting('run')],
+                         ['app.py'])
+
+    def test_put_and_delete_keep_exports_in_sync(self):
+        self.store.put_file({"path": "app.py", "type": "python", "exports": ["main"]})
+        self.assertEqual(self.store.find_exporting('create_app'), [])
+        self.assertEqual(len(self.store.find_exporting('main')), 1)
+
+        self.store.delete_file('app.py')
+        self.assertEqual(self.store.find_exporting('main'), [])
+        self.assertEqual(self.store.count_files(), 1)
+
+    def test_ranked_lookups(self):
+        self.assertEqual(self.store.rank_paths({'render'}, 10), ['web/index.js', 'app.py'])
+        self.assertEqual(self.store.rank_paths({'app'}, 1), ['app.py'])
+        self.assertEqual(self.store.rank_paths(set(), 10), ['app.py', 'web/index.js'])
+        self.assertEqual([f['path'] for f in self.store.get_files_by_path(
+            ['web/index.js', 'missing.py', 'app.py'])], ['web/index.js', 'app.py'])
+        self.assertEqual(self.store.list_paths(), ['app.py', 'web/index.js'])
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.delete_file('app.py')
+                raise RuntimeError("boom")
+        self.assertIsNotNone(self.store.get_file('app.py'))
+
+    def test_update_section(self):
+        self.store.update_section('project_info', {'last_updated': 'now'})
+        self.assertEqual(self.store.get_sections()['project_info'],
+                         {"name": "demo", "last_updated": "now"})
+
+
+class TestSqliteBackedManager(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.project_dir, 'drd.json'), 'w') as f:
+            json.dump(sample_metadata(), f)
+        self.manager = ProjectMetadataManager(self.project_dir, backend='sqlite')
+
+    def tearDown(self):
+        self.manager.store.close()
+        shutil.rmtree(self.project_dir)
+
+    def test_seeds_store_from_drd_json(self):
+        self.assertEqual(self.manager.get_file_metadata('app.py')['summary'], 'App')
+        self.assertTrue(os.path.exists(os.path.join(
+            self.project_dir, '.drd', 'metadata.db')))
+
+    def test_file_updates_do_not_load_everything(self):
+        self.manager.update_file_metadata('lib.py', 'python', '', 'Lib', ['helper'])
+        self.manager.remove_file_metadata('web/index.js')
+
+        self.assertIsNone(self.manager._metadata)
+        self.assertEqual([f['path'] for f in self.manager.find_files(export='helper')],
+                         ['lib.py'])
+
+        reopened = ProjectMetadataManager(self.project_dir, backend='sqlite')
+        self.assertEqual([f['path'] for f in reopened.metadata['key_files']],
+                         ['app.py', 'lib.py'])
+        reopened.store.close()
+
+    def test_project_context_reads_only_detailed_rows(self):
+        context = self.manager.get_project_context("render the page")
+        self.assertIsNone(self.manager._metadata)
+        self.assertEqual(context, ProjectContext(sample_metadata()).render("render the page"))
+
+        with unittest.mock.patch('drd.metadata.context.MIN_DETAIL_TOKENS', 8000):
+            context = self.manager.get_project_context("render the page")
+        # Both files are listed, only the best match is detailed
+        self.assertIn('"web":["index.js"]', context)
+        self.assertIn('".":["app.py"]', context)
+        self.assertIn('"web/index.js":{', context)
+        self.assertNotIn('"app.py":{', context)
+
+    def test_full_metadata_saves_back_to_store(self):
+        self.manager.metadata['dev_server']['start_command'] = 'gunicorn app'
+        self.manager.metadata['key_files'] = [{"path": "only.py", "type": "python"}]
+        self.manager.save_metadata()
+
+        reopened = ProjectMetadataManager(self.project_dir, backend='sqlite')
+        self.assertEqual(reopened.find_files(file_type='python'),
+                         [{"path": "only.py", "type": "python"}])
+        self.assertEqual(reopened.metadata['dev_server']['start_command'], 'gunicorn app')
+        reopened.store.close()
+
+    def test_export_writes_drd_json_format(self):
+        self.manager.update_file_metadata('lib.py', 'python', '', 'Lib')
+        out = os.path.join(self.project_dir, 'exported.json')
+        self.manager.export_metadata(out)
+
+        with open(out) as f:
+            exported = json.load(f)
+        self.assertEqual([f['path'] for f in exported['key_files']],
+                         ['app.py', 'lib.py', 'web/index.js'])
+        self.assertEqual(exported['dev_server'], sample_metadata()['dev_server'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,8 +25,6 @@ class TestMetadataUpdater(unittest.TestCase):
         }
 
     @patch('drd.metadata.updater.ProjectMetadataManager')
-    @patch('drd.metadata.updater.get_ignore_patterns')
-    @patch('drd.metadata.updater.get_folder_structure')
     @patch('drd.metadata.updater.call_dravid_api_with_pagination')
     @patch('drd.metadata.updater.extract_and_parse_xml')
     @patch('drd.metadata.updater.find_file_with_dravid')
@@ -37,13 +35,12 @@ class TestMetadataUpdater(unittest.TestCase):
     def test_update_metadata_with_dravid(self, mock_print_error, mock_print_warning,
                                          mock_print_success, mock_print_info,
                                          mock_find_file, mock_extract_xml, mock_call_api,
-                                         mock_get_folder_structure, mock_get_ignore_patterns,
                                          mock_metadata_manager):
         # Set up mocks
         mock_metadata_manager.return_value.get_project_context.return_value = self.project_context
-        mock_get_ignore_patterns.return_value = (
-            [], "No ignore patterns found")
-        mock_get_folder_structure.return_value = self.folder_structure
+        mock_scan = mock_metadata_manager.return_value.scan_project.return_value
+        mock_scan.gitignore_files = []
+        mock_scan.folder_structure = self.folder_structure
 
         mock_call_api.return_value = """
         <response>
@@ -115,8 +112,10 @@ class TestMetadataUpdater(unittest.TestCase):
 
         # Assertions
         mock_metadata_manager.assert_called_once_with(self.current_dir)
-        mock_get_ignore_patterns.assert_called_once_with(self.current_dir)
-        mock_get_folder_structure.assert_called_once_with(self.current_dir, [])
+        mock_metadata_manager.return_value.scan_project.assert_called_once_with()
+        mock_find_file.assert_any_call(
+            'src/main.py', self.project_context, self.folder_structure,
+            metadata_manager=mock_metadata_manager.return_value)
         mock_call_api.assert_called_once()
         mock_extract_xml.assert_called_once_with(mock_call_api.return_value)
 
@@ -0,0 +1,171 @@
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+import json
+import time
+import shutil
+import tempfile
+
+from drd.metadata.project_metadata import ProjectMetadataManager
+from drd.metadata.watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    MetadataWatcher,
+    create_watcher
+)
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+class WatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        write(os.path.join(self.project_dir, 'main.py'), 'print("main")')
+        write(os.path.join(self.project_dir, 'node_modules', 'lib.js'), 'x')
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def is_ignored(self, rel_path, is_dir=False):
+        return ProjectMetadataManager(self.project_dir).ignore_matcher.is_ignored(rel_path, is_dir)
+
+
+class TestPollingWatcher(WatcherTestCase):
+
+    def test_reports_created_modified_and_deleted_files(self):
+        watcher = PollingWatcher(self.project_dir, interval=0.01)
+        write(os.path.join(self.project_dir, 'src', 'app.py'), 'APP = 1')
+        write(os.path.join(self.project_dir, 'main.py'), 'print("changed")')
+        write(os.path.join(self.project_dir, 'node_modules', 'other.js'), 'y')
+
+        self.assertEqual(watcher.poll(0), {'main.py', os.path.join('src', 'app.py')})
+
+        os.remove(os.path.join(self.project_dir, 'main.py'))
+        self.assertEqual(watcher.poll(0), {'main.py'})
+        self.assertEqual(watcher.poll(0), set())
+
+
+class TestInotifyWatcher(WatcherTestCase):
+
+    def setUp(self):
+        super().setUp()
+        try:
+            self.watcher = InotifyWatcher(self.project_dir, self.is_ignored)
+        except (OSError, AttributeError) as e:
+            self.skipTest(f"inotify unavailable: {e}")
+        self.addCleanup(self.watcher.close)
+
+    def poll_until_quiet(self):
+        changed = set()
+        while True:
+            paths = self.watcher.poll(0.2)
+            if not paths:
+                return changed
+            changed |= paths
+
+    def test_reports_changes_and_skips_ignored_paths(self):
+        write(os.path.join(self.project_dir, 'main.py'), 'print("changed")')
+        write(os.path.join(self.project_dir, 'node_modules', 'other.js'), 'y')
+        write(os.path.join(self.project_dir, 'drd.json'), '{}')
+
+        self.assertEqual(self.poll_until_quiet(), {'main.py'})
+
+    def test_watches_new_directories(self):
+        write(os.path.join(self.project_dir, 'pkg', 'sub', 'mod.py'), 'X = 1')
+        self.assertIn(os.path.join('pkg', 'sub', 'mod.py'), self.poll_until_quiet())
+
+        write(os.path.join(self.project_dir, 'pkg', 'sub', 'other.py'), 'Y = 1')
+        self.assertEqual(self.poll_until_quiet(), {os.path.join('pkg', 'sub', 'other.py')})
+
+    def test_falls_back_to_polling(self):
+        with patch('drd.metadata.watcher.InotifyWatcher', side_effect=OSError(28, "limit")), \
+                patch('drd.metadata.watcher.print_info'):
+            self.assertIsInstance(create_watcher(self.project_dir, self.is_ignored), PollingWatcher)
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def poll(self, timeout):
+        return self.batches.pop(0) if self.batches else set()
+
+    def close(self):
+        pass
+
+
+class TestMetadataWatcher(WatcherTestCase):
+
+    def test_collect_waits_for_burst_to_settle(self):
+        watcher = MetadataWatcher(self.project_dir, debounce=0)
+        watcher.watcher = FakeWatcher([set(), {'a.py'}, {'b.py', 'a.py'}, set(), {'c.py'}])
+
+        self.assertEqual(watcher.collect(), {'a.py', 'b.py'})
+        self.assertEqual(watcher.collect(), {'c.py'})
+
+    def test_collect_rescans_after_overflow(self):
+        watcher = MetadataWatcher(self.project_dir, debounce=0)
+        watcher.manager.metadata['key_files'] = [{'path': 'gone.py'}]
+        watcher.watcher = FakeWatcher([None])
+
+        self.assertEqual(watcher.collect(), {'main.py', 'gone.py'})
+
+    @patch('drd.metadata.watcher.print_success')
+    def test_refresh_updates_only_touched_files(self, mock_print_success):
+        manager = ProjectMetadataManager(self.project_dir)
+        manager.metadata['key_files'] = [
+            {'path': 'main.py', 'type': 'python', 'summary': 'Old', 'exports': [], 'imports': []},
+            {'path': 'old/a.py', 'type': 'python', 'summary': 'A', 'exports': [], 'imports': []},
+            {'path': 'old/b.py', 'type': 'python', 'summary': 'B', 'exports': [], 'imports': []},
+        ]
+        manager.save_metadata()
+        write(os.path.join(self.project_dir, 'util.py'), 'def util(): pass')
+
+        def fake_analysis(file_path, fast=False, context=None):
+            rel_path = os.path.relpath(file_path, self.project_dir)
+            return {'path': rel_path, 'type': 'python', 'summary': f"New {rel_path}",
+                    'exports': [], 'imports': []}
+
+        refreshed = []
+        watcher = MetadataWatcher(self.project_dir, on_refresh=refreshed.append)
+        with patch.object(ProjectMetadataManager, 'analyze_file',
+                          AsyncMock(side_effect=fake_analysis)) as mock_analyze:
+            updated = watcher.refresh({'main.py', 'util.py', 'old'})
+            self.assertEqual(mock_analyze.await_count, 2)
+
+            # A second refresh of the same, unchanged files does nothing
+            self.assertEqual(watcher.refresh({'main.py', 'util.py'}), [])
+            self.assertEqual(mock_analyze.await_count, 2)
+
+        self.assertEqual(sorted(updated), ['main.py', 'old/a.py', 'old/b.py', 'util.py'])
+        self.assertEqual(refreshed, [updated])
+        with open(os.path.join(self.project_dir, 'drd.json')) as f:
+            saved = {entry['path']: entry for entry in json.load(f)['key_files']}
+        self.assertEqual(sorted(saved), ['main.py', 'util.py'])
+        self.assertEqual(saved['main.py']['summary'], 'New main.py')
+        self.assertIn('hash', saved['util.py'])
+
+    @patch('drd.metadata.watcher.print_error')
+    def test_run_stops_and_survives_refresh_errors(self, mock_print_error):
+        watcher = MetadataWatcher(self.project_dir, debounce=0)
+        watcher.watcher = FakeWatcher([{'main.py'}, set()])
+
+        def failing_refresh(paths):
+            watcher.stop_event.set()
+            raise RuntimeError("boom")
+
+        with patch.object(watcher, 'refresh', side_effect=failing_refresh):
+            watcher.start()
+            watcher.thread.join(timeout=5)
+
+        self.assertFalse(watcher.thread.is_alive())
+        mock_print_error.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+
+from drd.utils.content_cache import FileContentCache, number_lines
+
+
+class TestFileContentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = FileContentCache(max_bytes=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_number_lines(self):
+        self.assertEqual(number_lines("a  \nb\n"), "1:a\n2:b")
+        self.assertEqual(number_lines(""), "")
+
+    def test_reads_each_version_once(self):
+        path = self.write('app.py', "print('hi')\n")
+        with patch('builtins.open', wraps=open) as mock_open:
+            self.assertEqual(self.cache.read(path), "print('hi')\n")
+            self.assertEqual(self.cache.numbered(path), "1:print('hi')")
+            self.assertEqual(self.cache.numbered(path), "1:print('hi')")
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+        self.assertEqual(self.cache.size, len("print('hi')\n") + len("1:print('hi')"))
+
+    def test_changed_file_is_reread(self):
+        path = self.write('app.py', "old\n")
+        self.assertEqual(self.cache.numbered(path), "1:old")
+        self.write('app.py', "newer\nlines\n")
+        self.assertEqual(self.cache.numbered(path), "1:newer\n2:lines")
+
+    def test_lru_eviction(self):
+        first = self.write('a.txt', 'a' * 400)
+        second = self.write('b.txt', 'b' * 400)
+        self.cache.read(first)
+        self.cache.read(second)
+        self.cache.read(first)
+        third = self.write('c.txt', 'c' * 400)
+        self.cache.read(third)
+        self.assertEqual(list(self.cache.entries), [first, third])
+        self.assertEqual(self.cache.size, 800)
+
+        big = self.write('big.txt', 'x' * 2000)
+        self.assertEqual(len(self.cache.read(big)), 2000)
+        self.assertNotIn(big, self.cache.entries)
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.read(os.path.join(self.tmp_dir, 'missing.py'))
+
+    def test_invalidate(self):
+        path = self.write('app.py', "x\n")
+        self.cache.read(path)
+        self.cache.invalidate(path)
+        self.assertEqual((len(self.cache.entries), self.cache.size), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+
+from drd.utils.excerpts import (
+    get_file_excerpt, relevant_windows, render_windows, trace_line_numbers
+)
+from drd.utils.apply_file_changes import apply_changes
+
+
+def module_lines(count=600):
+    lines = ["import os", ""]
+    while len(lines) < count:
+        n = len(lines)
+        lines += [f"def helper_{n}(value):", f"    return value + {n}", ""]
+    lines[302:305] = ["def send_invoice(customer):",
+                      "    total = compute_total(customer)",
+                      "    return mail(customer, total)"]
+    return lines[:count]
+
+
+class TestExcerpts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'billing.py')
+        self.lines = module_lines()
+        with open(self.path, 'w') as f:
+            f.write("\n".join(self.lines) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_trace_line_numbers(self):
+        trace = ('Traceback (most recent call last):\n'
+                 '  File "/srv/app/src/billing.py", line 302, in send_invoice\n'
+                 '  File "/srv/app/src/other.py", line 5, in run\n'
+                 'at charge (src/billing.py:410:7)')
+        self.assertEqual(trace_line_numbers(trace, 'src/billing.py'), {302, 410})
+        self.assertEqual(trace_line_numbers(None, 'src/billing.py'), set())
+
+    def test_small_files_are_quoted_whole(self):
+        self.assertIsNone(relevant_windows(self.lines[:50], self.path, query="invoice"))
+
+    def test_windows_from_trace_keep_line_numbers(self):
+        trace = f'File "{self.path}", line 304, in send_invoice'
+        excerpt = get_file_excerpt(self.path, trace=trace)
+        excerpt_lines = excerpt.split("\n")
+        self.assertEqual(excerpt_lines[0], "1:import os")
+        self.assertIn("304:    total = compute_total(customer)", excerpt_lines)
+        self.assertIn("... [lines 16-283 omitted] ...", excerpt_lines)
+        self.assertEqual(excerpt_lines[-1], "... [lines 325-600 omitted] ...")
+
+    def test_windows_from_symbols_and_query(self):
+        windows = relevant_windows(self.lines, self.path, symbols=['fun:send_invoice'])
+        self.assertEqual(windows, [(0, 15), (302, 305)])
+
+        windows = relevant_windows(self.lines, self.path, query="Fix the invoice mail")
+        self.assertIn((282, 325), windows)
+        self.assertIsNone(relevant_windows(self.lines, self.path, query="unrelated words"))
+
+    def test_line_edits_apply_to_the_whole_file(self):
+        windows = relevant_windows(self.lines, self.path, symbols=['send_invoice'])
+        excerpt = render_windows(self.lines, windows)
+        self.assertIn("304:    total = compute_total(customer)", excerpt)
+        updated = apply_changes("\n".join(self.lines), "r 304:    total = 0")
+        self.assertEqual(updated.split("\n")[303], "    total = 0")
+        self.assertEqual(len(updated.split("\n")), len(self.lines))
+
+    def test_falls_back_to_the_whole_file(self):
+        with patch('drd.utils.excerpts.EXCERPT_MIN_LINES', 10000):
+            excerpt = get_file_excerpt(self.path, query="invoice")
+        self.assertEqual(len(excerpt.split("\n")), 600)
+        self.assertIsNone(get_file_excerpt(os.path.join(self.tmp_dir, 'missing.py')))
+
+
+if __name__ == '__main__':
+    unittest.main()
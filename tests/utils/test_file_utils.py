@@ -1,9 +1,12 @@
 import unittest
 from unittest.mock import patch, mock_open
 import os
+import shutil
+import tempfile
 from drd.utils.file_utils import (
     get_file_content,
-    fetch_project_guidelines
+    fetch_project_guidelines,
+    match_file_mode
 )
 
 
@@ -38,3 +41,20 @@ class TestFileOperations(unittest.TestCase):
         mock_exists.return_value = False
         result = fetch_project_guidelines("/fake/project/dir")
         self.assertEqual(result, "")
+
+    def test_match_file_mode(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=directory)
+        os.close(tmp_fd)
+        target = os.path.join(directory, 'drd.json')
+
+        with patch('drd.utils.file_utils._UMASK', 0o022):
+            match_file_mode(tmp_path, target)
+        self.assertEqual(os.stat(tmp_path).st_mode & 0o777, 0o644)
+
+        with open(target, 'w'):
+            pass
+        os.chmod(target, 0o640)
+        match_file_mode(tmp_path, target)
+        self.assertEqual(os.stat(tmp_path).st_mode & 0o777, 0o640)
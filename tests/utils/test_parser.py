@@ -7,7 +7,8 @@ from drd.utils.parser import (
     extract_and_parse_xml,
     parse_dravid_response,
     parse_file_list_response,
-    parse_find_file_response
+    parse_find_file_response,
+    StreamingResponseParser
 )
 
 
@@ -346,3 +347,57 @@ class TestDravidParser(unittest.TestCase):
         self.assertIn('- old_function()', result[1]['changes'])
         self.assertIn('+ new_function()', result[1]['changes'])
         self.assertIn('+ additional_line()', result[1]['changes'])
+
+    def test_streaming_parser_skips_step_end_in_cdata(self):
+        content = 'const xml = "<step></step>";\nconst arr = a[b[0]];\n// ]] </ step >'
+        response = f"""<response><steps>
+            <step>
+                <type>file</type>
+                <operation>CREATE</operation>
+                <filename>template.js</filename>
+                <content><![CDATA[{content}]]></content>
+            </step>
+            <step><type>shell</type><command>npm test</command></step>
+        </steps></response>"""
+        full = parse_dravid_response(response)
+        self.assertEqual(full[0]['content'], content)
+        for size in (1, 2, 3, 5, 8, len(response)):
+            parser = StreamingResponseParser()
+            streamed = []
+            for i in range(0, len(response), size):
+                streamed.extend(parser.feed(response[i:i + size]))
+            self.assertEqual(streamed, full, f"chunk size {size}")
+
+    def test_streaming_parser_matches_full_parse(self):
+        response = """<response>
+        <explanation>Install and write</explanation>
+        <steps>
+            <step>
+                <type>shell</type>
+                <command>npm install</command>
+            </step>
+            <step>
+                <type>file</type>
+                <operation>CREATE</operation>
+                <filename>app.js</filename>
+                <content><![CDATA[if (a < b) { console.log("<step>"); }]]></content>
+            </step>
+        </steps>
+        <requires_restart>false</requires_restart>
+        </response>"""
+        parser = StreamingResponseParser()
+        streamed = []
+        completed_at = []
+        for i in range(0, len(response), 7):
+            commands = parser.feed(response[i:i + 7])
+            streamed.extend(commands)
+            completed_at.extend(i for _ in commands)
+
+        self.assertEqual([c['type'] for c in streamed],
+                         ['explanation', 'shell', 'file', 'requires_restart'])
+        self.assertEqual(streamed[1], {'type': 'shell', 'command': 'npm install'})
+        self.assertEqual(streamed[2]['content'], 'if (a < b) { console.log("<step>"); }')
+        # The shell step is available long before the response ends
+        self.assertLess(completed_at[1], response.index('app.js'))
+        full = parse_dravid_response(response)
+        self.assertEqual(sorted(map(str, streamed)), sorted(map(str, full)))
@@ -70,14 +70,33 @@ class TestExecutor(unittest.TestCase):
         self.assertEqual(self.executor.merge_json(
             existing_content, new_content), expected_result)
 
-    @patch('drd.utils.step_executor.get_ignore_patterns')
-    @patch('drd.utils.step_executor.get_folder_structure')
-    def test_get_folder_structure(self, mock_get_folder_structure, mock_get_ignore_patterns):
-        mock_get_ignore_patterns.return_value = ([], None)
-        mock_get_folder_structure.return_value = {
-            'folder': {'file.txt': 'file'}}
+    @patch('drd.utils.step_executor.scan_project')
+    def test_get_folder_structure(self, mock_scan_project):
+        mock_scan_project.return_value.folder_structure = "project/\n    file.txt"
         result = self.executor.get_folder_structure()
-        self.assertEqual(result, {'folder': {'file.txt': 'file'}})
+        mock_scan_project.assert_called_once_with(self.executor.current_dir)
+        self.assertEqual(result, "project/\n    file.txt")
+
+    @patch('drd.utils.step_executor.scan_project')
+    def test_get_folder_structure_reuses_scan(self, mock_scan_project):
+        mock_scan_project.return_value.folder_structure = "project/"
+        self.executor.get_folder_structure()
+        self.executor.get_folder_structure()
+        mock_scan_project.assert_called_once_with(self.executor.current_dir)
+
+        with patch('click.confirm', return_value=False):
+            self.executor.execute_shell_command('ls')
+        self.executor.get_folder_structure()
+        self.assertEqual(mock_scan_project.call_count, 2)
+
+    @patch('drd.utils.step_executor.scan_project')
+    def test_get_folder_structure_uses_metadata_manager_scan(self, mock_scan_project):
+        manager = MagicMock()
+        manager.project_dir = os.path.abspath(self.executor.current_dir)
+        manager.scan_project.return_value.folder_structure = "project/"
+        result = self.executor.get_folder_structure(metadata_manager=manager)
+        self.assertEqual(result, "project/")
+        mock_scan_project.assert_not_called()
 
     @patch('subprocess.Popen')
     def test_execute_shell_command(self, mock_popen):